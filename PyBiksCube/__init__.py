@@ -7,20 +7,35 @@ My take at a Rubik's Cube representation and solver.
 Provides:
     1. Two representations of a Rubik's Cube, one object oriented (Cube) and 
         the other optimized for speed (CubeLookup)
+        plus an array backed version of the former (CubeArray)
+        plus a batched version of the latter for many cubes at once (CubeBatch)
+        and a representation as corner and edge coordinates (CubeCoordinates)
     2. Solver class for solving the two Cube classes
+        with an optional cache of the solutions already found (SolutionCache)
+        plus a two-phase search solver with shorter solutions (TwoPhaseSolver)
+        plus an IDA* solver with the shortest solutions of short scrambles (IDAStarSolver)
     3. Helper function to create algorithms to solve the cube via the Solver class
 
 The package includes an example script (PyBiksCube/example.py) that
 shows the creation of a Cube, scrambling, solving, and plotting.
 
 The lookup tables and solving algorithm are produced on the fly if they
-do not already exist inside of the PyBiksCube/data directory. They are 
-saved as text files.
+do not already exist inside of the PyBiksCube/data directory. The lookup 
+table is saved as a binary .npy file, with a row for every move of
+utilities.MOVE_NAMES, and the solving algorithm as a compact 
+binary file (see PyBiksCube/algorithm_io.py, which can also convert 
+algorithms saved as text by older versions).
 
 Includes a PyTest suit, in the tests directory.
 """
 __version__ = "0.1.0"
 from .piece import Piece
 from .cube import Cube
+from .cube_array import CubeArray
 from .cube_lookup import CubeLookup
+from .cube_batch import CubeBatch
+from .cube_coordinates import CubeCoordinates
 from .solver import Solver
+from .solution_cache import SolutionCache
+from .two_phase_solver import TwoPhaseSolver
+from .ida_star_solver import IDAStarSolver
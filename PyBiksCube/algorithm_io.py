@@ -0,0 +1,351 @@
+""" Module for saving and loading the algorithms used by the Solver class """
+
+import ast
+import json
+import numpy as np
+
+from PyBiksCube.stage_index import (
+    MappedStageTable,
+    group_keys_by_mask,
+    sort_projected_keys,
+)
+from PyBiksCube.utilities import encode_cube_state
+
+ALGORITHM_FORMAT_VERSION = 1
+MAPPED_ALGORITHM_FORMAT_VERSION = 2
+MAPPED_ALGORITHM_MAGIC = b"PYBIKSMM"
+
+
+def save_algorithm(output_file_name, array_of_dict_solvers):
+    """
+    Saves the algorithm, an array of dictionaries, in a compact binary file.
+
+    The file is an uncompressed numpy .npz archive, with for each stage i:
+
+    - keys_i : array of 54 byte strings, the keys (masks) of the stage
+    - offsets_i : array of ints, the moves of key j are moves_i[offsets_i[j]:offsets_i[j+1]]
+    - moves_i : array of int16, the moves of every key of the stage, concatenated
+
+    plus format_version and n_stages.
+
+    Parameters
+    ----------
+    output_file_name : str
+        File name where algorithm is saved to. Used as is, no extension is appended.
+    array_of_dict_solvers : array of dictionaries
+        Array of the dictionaries used in each stage.
+    """
+
+    arrays = {
+        "format_version": np.array(ALGORITHM_FORMAT_VERSION),
+        "n_stages": np.array(len(array_of_dict_solvers)),
+    }
+
+    for i_stage, dict_solver in enumerate(array_of_dict_solvers):
+        moves = [np.asarray(moves, dtype=np.int16) for moves in dict_solver.values()]
+        offsets = np.zeros(len(moves) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(moves_) for moves_ in moves])
+
+        arrays[f"keys_{i_stage}"] = np.array(list(dict_solver), dtype="S54")
+        arrays[f"offsets_{i_stage}"] = offsets
+        arrays[f"moves_{i_stage}"] = np.concatenate(
+            [np.array([], dtype=np.int16)] + moves
+        )
+
+    with open(output_file_name, "wb") as file_out:
+        np.savez(file_out, **arrays)
+
+
+def load_algorithm(file_name):
+    """
+    Loads an algorithm saved by save_algorithm.
+
+    Parameters
+    ----------
+    file_name : str
+        File name of the algorithm.
+
+    Returns
+    -------
+    array_of_dict_solvers : array of dictionaries
+        Array of the dictionaries used in each stage.
+        The moves of each key are int16 arrays.
+    """
+
+    with np.load(file_name, allow_pickle=False) as arrays:
+        format_version = int(arrays["format_version"])
+        if format_version != ALGORITHM_FORMAT_VERSION:
+            raise ValueError(
+                f"Algorithm file has format version {format_version}, "
+                f"expected {ALGORITHM_FORMAT_VERSION}: {file_name}"
+            )
+
+        array_of_dict_solvers = []
+        for i_stage in range(int(arrays["n_stages"])):
+            keys = arrays[f"keys_{i_stage}"]
+            offsets = arrays[f"offsets_{i_stage}"]
+            moves = arrays[f"moves_{i_stage}"]
+
+            array_of_dict_solvers.append(
+                {
+                    key.decode("ascii"): moves[offsets[i_key] : offsets[i_key + 1]]
+                    for i_key, key in enumerate(keys)
+                }
+            )
+
+    return array_of_dict_solvers
+
+
+def load_text_algorithm(file_name):
+    """
+    Loads an algorithm from the older text format, the str() of the
+    array of dictionaries, without evaluating the file as code.
+
+    Only literals and the numpy array(..., dtype=int16) reprs
+    written by str() are accepted.
+
+    Parameters
+    ----------
+    file_name : str
+        File name of the text algorithm.
+
+    Returns
+    -------
+    array_of_dict_solvers : array of dictionaries
+        Array of the dictionaries used in each stage.
+    """
+
+    with open(file_name, "r", encoding="utf-8") as file:
+        tree = ast.parse(file.read(), mode="eval")
+
+    return _text_node_to_value(tree.body)
+
+
+def convert_text_algorithm(text_file_name, output_file_name):
+    """
+    Converts an algorithm from the older text format to the binary format.
+
+    Parameters
+    ----------
+    text_file_name : str
+        File name of the text algorithm.
+    output_file_name : str
+        File name where the binary algorithm is saved to.
+    """
+
+    save_algorithm(output_file_name, load_text_algorithm(text_file_name))
+
+
+def is_binary_algorithm(file_name):
+    """
+    Checks whether the file is in the binary format, by its zip header.
+
+    Parameters
+    ----------
+    file_name : str
+        File name of the algorithm.
+
+    Returns
+    -------
+    is_binary : bool
+        True for the binary format, False otherwise (text).
+    """
+
+    with open(file_name, "rb") as file:
+        return file.read(4) == b"PK\x03\x04"
+
+
+def _text_node_to_value(node):
+    """Converts a node of the parsed text algorithm into its value."""
+
+    if isinstance(node, ast.List):
+        return [_text_node_to_value(element) for element in node.elts]
+
+    if isinstance(node, ast.Dict):
+        return {
+            _text_node_to_value(key): _text_node_to_value(value)
+            for key, value in zip(node.keys, node.values)
+        }
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (str, int)):
+        return node.value
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return -_text_node_to_value(node.operand)
+
+    if isinstance(node, ast.Call):
+        # array([...], dtype=int16) or numpy scalars like int16(3)
+        function_name = getattr(node.func, "id", getattr(node.func, "attr", None))
+        if function_name == "array" and len(node.args) == 1:
+            return np.array(_text_node_to_value(node.args[0]), dtype=np.int16)
+        if function_name in ("int8", "int16", "int32", "int64") and len(node.args) == 1:
+            return int(_text_node_to_value(node.args[0]))
+
+    raise ValueError(f"Unexpected content in text algorithm: {ast.dump(node)}")
+
+
+def save_mapped_algorithm(output_file_name, array_of_dict_solvers):
+    """
+    Saves the algorithm in a read-only layout meant to be memory mapped
+    by load_mapped_algorithm, so that processes loading the same file share it.
+
+    The file is:
+
+    - MAPPED_ALGORITHM_MAGIC, 8 bytes
+    - length of the header, little endian uint64
+    - header, json with the format version and the location of each array
+    - the arrays of every stage, each aligned to 8 bytes
+
+    For each stage, the keys are grouped by their mask, the faces that are not 'k'.
+    Each group stores only the faces of its keys under the mask, sorted so they
+    can be binary searched, and the index of each of these keys.
+    The offsets and the moves of the keys are stored as in save_algorithm.
+
+    Parameters
+    ----------
+    output_file_name : str
+        File name where algorithm is saved to.
+    array_of_dict_solvers : array of dictionaries
+        Array of the dictionaries used in each stage.
+    """
+
+    stage_headers = []
+    blobs = []
+    position = 0
+
+    def add_blob(array):
+        nonlocal position
+        blob = np.ascontiguousarray(array).tobytes()
+        padding = -len(blob) % 8
+        blobs.append(blob + b"\x00" * padding)
+        blob_header = {
+            "offset": position,
+            "dtype": array.dtype.str,
+            "count": len(array),
+        }
+        position += len(blob) + padding
+        return blob_header
+
+    for dict_solver in array_of_dict_solvers:
+        keys = list(dict_solver)
+        moves = [np.asarray(dict_solver[key], dtype=np.int16) for key in keys]
+        encoded_keys = encode_cube_state("".join(keys)).reshape(-1, 54)
+
+        mask_groups = []
+        for mask_indices, key_indices in group_keys_by_mask(encoded_keys):
+            sorted_keys, sorted_key_indices = sort_projected_keys(
+                encoded_keys, mask_indices, key_indices
+            )
+            mask_groups.append(
+                {
+                    "mask_indices": mask_indices.tolist(),
+                    "keys": add_blob(sorted_keys),
+                    "key_indices": add_blob(sorted_key_indices),
+                }
+            )
+
+        offsets = np.zeros(len(moves) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(moves_) for moves_ in moves])
+
+        stage_headers.append(
+            {
+                "mask_groups": mask_groups,
+                "offsets": add_blob(offsets),
+                "moves": add_blob(
+                    np.concatenate([np.array([], dtype=np.int16)] + moves)
+                ),
+            }
+        )
+
+    header = json.dumps(
+        {"format_version": MAPPED_ALGORITHM_FORMAT_VERSION, "stages": stage_headers}
+    ).encode("utf-8")
+    header += b" " * (-len(header) % 8)
+
+    with open(output_file_name, "wb") as file_out:
+        file_out.write(MAPPED_ALGORITHM_MAGIC)
+        file_out.write(np.array(len(header), dtype="<u8").tobytes())
+        file_out.write(header)
+        for blob in blobs:
+            file_out.write(blob)
+
+
+def load_mapped_algorithm(file_name):
+    """
+    Memory maps an algorithm saved by save_mapped_algorithm.
+    Nothing is read into memory besides the header, the stages
+    are looked up directly in the mapped file.
+
+    Parameters
+    ----------
+    file_name : str
+        File name of the algorithm.
+
+    Returns
+    -------
+    array_of_dict_solvers : array of MappedStageTable
+        Array of the read-only tables used in each stage.
+    """
+
+    mapped_file = np.memmap(file_name, dtype=np.uint8, mode="r")
+
+    if mapped_file[:8].tobytes() != MAPPED_ALGORITHM_MAGIC:
+        raise ValueError(f"Not a mapped algorithm file: {file_name}")
+
+    header_length = int(mapped_file[8:16].view("<u8")[0])
+    header = json.loads(mapped_file[16 : 16 + header_length].tobytes())
+    data_start = 16 + header_length
+
+    if header["format_version"] != MAPPED_ALGORITHM_FORMAT_VERSION:
+        raise ValueError(
+            f"Algorithm file has format version {header['format_version']}, "
+            f"expected {MAPPED_ALGORITHM_FORMAT_VERSION}: {file_name}"
+        )
+
+    def get_blob(blob_header):
+        return np.frombuffer(
+            mapped_file,
+            dtype=np.dtype(blob_header["dtype"]),
+            count=blob_header["count"],
+            offset=data_start + blob_header["offset"],
+        )
+
+    array_of_dict_solvers = []
+    for stage_header in header["stages"]:
+        mask_groups = [
+            (
+                np.array(group_header["mask_indices"], dtype=np.intp),
+                get_blob(group_header["keys"]),
+                get_blob(group_header["key_indices"]),
+            )
+            for group_header in stage_header["mask_groups"]
+        ]
+
+        array_of_dict_solvers.append(
+            MappedStageTable(
+                mask_groups,
+                get_blob(stage_header["offsets"]),
+                get_blob(stage_header["moves"]),
+            )
+        )
+
+    return array_of_dict_solvers
+
+
+def is_mapped_algorithm(file_name):
+    """
+    Checks whether the file is in the memory mapped format, by its magic bytes.
+
+    Parameters
+    ----------
+    file_name : str
+        File name of the algorithm.
+
+    Returns
+    -------
+    is_mapped : bool
+        True for the memory mapped format, False otherwise.
+    """
+
+    with open(file_name, "rb") as file:
+        return file.read(len(MAPPED_ALGORITHM_MAGIC)) == MAPPED_ALGORITHM_MAGIC
@@ -0,0 +1,169 @@
+""" Module that defines the AsyncSolver class, solving cubes from asyncio code in batches """
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import numpy as np
+
+from PyBiksCube.serve import solve_cube_states, solve_in_worker
+from PyBiksCube.solver import Solver
+from PyBiksCube.utilities import encode_cube_state
+
+
+class AsyncSolver:
+    """
+    Solves cubes for asyncio code, without blocking the event loop.
+
+    Calls of solve in the same short window are gathered into one batch,
+    solved with Solver.solve_many on a thread or process pool.
+    A batch is sent after max_wait seconds, or as soon as it has
+    max_batch_size cubes, which bounds the wait added to each call.
+    Calls with a state that is already being solved are coalesced,
+    they all wait on the same solve.
+
+    Attributes
+    ----------
+    max_batch_size : int
+        Largest number of cubes solved in one batch.
+    max_wait : float
+        Seconds a batch waits for more calls before it is sent.
+    stats : dict
+        Counts of the calls of solve, the calls coalesced with another
+        of the same state, and the batches sent.
+    """
+
+    def __init__(
+        self,
+        solver=None,
+        executor=None,
+        max_batch_size=256,
+        max_wait=0.002,
+        simplify=False,
+    ):
+        """
+        The constructor for the AsyncSolver class.
+
+        Parameters
+        ----------
+        solver : Solver
+            The solver used by a thread pool, shared by its threads.
+            Default of None loads Solver("default").
+            Not used by a process pool, whose workers hold their own.
+        executor : ThreadPoolExecutor or ProcessPoolExecutor
+            Where the batches are solved. A process pool must come from
+            serve.create_worker_pool. Default of None creates a thread pool
+            of one thread, shut down by close.
+        max_batch_size : int
+            Largest number of cubes solved in one batch.
+        max_wait : float
+            Seconds a batch waits for more calls before it is sent.
+        simplify : bool
+            Simplifies the moves returned, see move_optimizer.simplify_moves.
+            Set on the process pool instead, for one from serve.create_worker_pool.
+        """
+
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = {"calls": 0, "coalesced": 0, "batches": 0}
+
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(1)
+        self._executor = executor
+
+        if isinstance(executor, ProcessPoolExecutor):
+            self._solve_batch = solve_in_worker
+        else:
+            if solver is None:
+                solver = Solver("default")
+            self._solve_batch = partial(solve_cube_states, solver, simplify=simplify)
+
+        # Futures of the states being solved, and the states of the next batch
+        self._in_flight = {}
+        self._pending_states = []
+        self._flush_handle = None
+        self._batch_tasks = set()
+
+    async def solve(self, cube_state):
+        """
+        Solves the cube state, batched with the other calls of the same window.
+
+        Parameters
+        ----------
+        cube_state : str
+            String of 54 characters for color of different faces.
+
+        Returns
+        -------
+        moves_to_solve : array of int16
+            The moves that solve the cube, following the CubeLookup move integers.
+        """
+
+        if not isinstance(cube_state, str) or len(cube_state) != 54:
+            raise ValueError(f"Cube state must be a 54 character string: {cube_state}")
+        encode_cube_state(cube_state)
+
+        self.stats["calls"] += 1
+
+        future = self._in_flight.get(cube_state)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._in_flight[cube_state] = future
+            self._pending_states.append(cube_state)
+
+            if len(self._pending_states) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        else:
+            self.stats["coalesced"] += 1
+
+        # Shielded, so one caller cancelling does not cancel the others
+        moves_to_solve = await asyncio.shield(future)
+        return moves_to_solve.copy()
+
+    def _flush(self):
+        """Sends the pending states as one batch."""
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        cube_states = self._pending_states
+        self._pending_states = []
+        if not cube_states:
+            return
+
+        self.stats["batches"] += 1
+        batch_task = asyncio.get_running_loop().create_task(
+            self._run_batch(cube_states)
+        )
+        self._batch_tasks.add(batch_task)
+        batch_task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, cube_states):
+        """Solves a batch on the executor, then resolves the futures of its states."""
+
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self._executor, self._solve_batch, cube_states
+            )
+        except Exception as error:
+            results = [f"Solving the batch failed: {error}"] * len(cube_states)
+
+        for cube_state, result in zip(cube_states, results):
+            future = self._in_flight.pop(cube_state)
+            if future.done():
+                continue
+            if isinstance(result, str):
+                future.set_exception(ValueError(result))
+            else:
+                future.set_result(np.array(result, dtype=np.int16))
+
+    def close(self):
+        """Shuts down the thread pool, if it was created by the AsyncSolver."""
+
+        if self._owns_executor:
+            self._executor.shutdown()
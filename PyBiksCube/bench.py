@@ -0,0 +1,403 @@
+""" Benchmarks of the cube classes and the Solver, run with python -m PyBiksCube.bench """
+
+import argparse
+import json
+import os.path
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+import PyBiksCube
+from PyBiksCube import (
+    Cube,
+    CubeArray,
+    CubeLookup,
+    CubeBatch,
+    Solver,
+    TwoPhaseSolver,
+    IDAStarSolver,
+)
+from PyBiksCube.algorithm_io import save_algorithm, save_mapped_algorithm
+from PyBiksCube.create_solution_algorithm import (
+    run_mc_samples,
+    run_bfs_search,
+    DEFAULT_STAGES,
+)
+
+FUNDAMENTAL_MOVES = ["U", "F", "D", "L", "R", "B", "U'", "F'", "D'", "L'", "R'", "B'"]
+
+
+def _time_per_call(function, n_calls):
+    """Returns the seconds per call of function, called n_calls times."""
+
+    start_time = time.perf_counter()
+    for _ in range(n_calls):
+        function()
+    return (time.perf_counter() - start_time) / n_calls
+
+
+def _rate(n_items, seconds):
+    """Returns items per second, rounded for the output."""
+
+    return round(n_items / seconds, 1)
+
+
+def bench_import(scale=1.0, seed=0):
+    """
+    Seconds to import PyBiksCube in a fresh interpreter,
+    and whether that loaded matplotlib, which only plotting should need.
+    """
+
+    del seed  # Nothing random, the seed is only part of the signature of BENCHMARKS
+    n_imports = max(int(5 * scale), 1)
+    code = (
+        "import sys, time; start_time = time.perf_counter(); import PyBiksCube; "
+        "print(time.perf_counter() - start_time, 'matplotlib' in sys.modules)"
+    )
+
+    import_seconds = []
+    for _ in range(n_imports):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, check=True, text=True
+        ).stdout.split()
+        import_seconds.append(float(output[0]))
+
+    return {
+        "import_s": min(import_seconds),
+        "import_loads_matplotlib": output[1] == "True",
+    }
+
+
+def bench_moves(scale=1.0, seed=0):
+    """Throughput of single moves, in moves per second."""
+
+    rng = np.random.default_rng(seed)
+    n_moves = max(int(20000 * scale), 12)
+    moves = rng.integers(0, 12, n_moves, dtype=np.int16)
+
+    cube_lookup = CubeLookup()
+    start_time = time.perf_counter()
+    for move_command in moves:
+        cube_lookup._fundamental_move(move_command)
+    lookup_seconds = time.perf_counter() - start_time
+
+    cube_lookup.set_default_cube_state()
+    start_time = time.perf_counter()
+    cube_lookup.apply_moves(moves)
+    compiled_seconds = time.perf_counter() - start_time
+
+    n_cube_moves = max(n_moves // 100, 12)
+    cube = Cube()
+    start_time = time.perf_counter()
+    for move_command in moves[:n_cube_moves]:
+        cube.fundamental_move(FUNDAMENTAL_MOVES[move_command])
+    cube_seconds = time.perf_counter() - start_time
+
+    n_cube_array_moves = max(n_moves // 10, 12)
+    cube_array = CubeArray()
+    start_time = time.perf_counter()
+    for move_command in moves[:n_cube_array_moves]:
+        cube_array.fundamental_move(FUNDAMENTAL_MOVES[move_command])
+    cube_array_seconds = time.perf_counter() - start_time
+
+    n_batch = 1000
+    cube_batch = CubeBatch(n_batch)
+    batch_moves = rng.integers(0, 12, (n_batch, max(n_moves // n_batch, 1)))
+    start_time = time.perf_counter()
+    cube_batch.move_decoder(batch_moves)
+    batch_seconds = time.perf_counter() - start_time
+
+    return {
+        "cube_fundamental_move_per_s": _rate(n_cube_moves, cube_seconds),
+        "cube_array_fundamental_move_per_s": _rate(
+            n_cube_array_moves, cube_array_seconds
+        ),
+        "cube_lookup_fundamental_move_per_s": _rate(n_moves, lookup_seconds),
+        "cube_lookup_apply_moves_per_s": _rate(n_moves, compiled_seconds),
+        "cube_batch_move_per_s": _rate(batch_moves.size, batch_seconds),
+    }
+
+
+def bench_state_io(scale=1.0, seed=0):
+    """
+    Seconds per call of loading and unloading the cube state, check_solved,
+    and creating a CubeLookup.
+    """
+
+    rng = np.random.default_rng(seed)
+    n_calls = max(int(2000 * scale), 10)
+    cube_lookup = CubeLookup()
+    cube_lookup.apply_moves(rng.integers(0, 12, 20, dtype=np.int16))
+    cube_state = cube_lookup.get_cube_state()
+    cube = Cube(cube_state)
+    cube_array = CubeArray(cube_state)
+
+    n_cube_calls = max(n_calls // 50, 2)
+    return {
+        "cube_set_cube_state_s": _time_per_call(
+            lambda: cube.set_cube_state(cube_state), n_cube_calls
+        ),
+        "cube_get_cube_state_s": _time_per_call(cube.get_cube_state, n_cube_calls),
+        "cube_check_solved_s": _time_per_call(cube.check_solved, n_cube_calls),
+        "cube_array_set_cube_state_s": _time_per_call(
+            lambda: cube_array.set_cube_state(cube_state), n_calls
+        ),
+        "cube_array_get_cube_state_s": _time_per_call(
+            cube_array.get_cube_state, n_calls
+        ),
+        "cube_array_check_solved_s": _time_per_call(cube_array.check_solved, n_calls),
+        "cube_lookup_set_cube_state_s": _time_per_call(
+            lambda: cube_lookup.set_cube_state(cube_state), n_calls
+        ),
+        "cube_lookup_get_cube_state_s": _time_per_call(
+            cube_lookup.get_cube_state, n_calls
+        ),
+        "cube_lookup_check_solved_s": _time_per_call(cube_lookup.check_solved, n_calls),
+        "cube_lookup_init_s": _time_per_call(
+            lambda: CubeLookup(cube_state=cube_state), n_calls
+        ),
+    }
+
+
+def bench_solve(scale=1.0, seed=0, solver=None, n_solves=None):
+    """Latency percentiles of Solver.solve_cube on seeded scrambles, in seconds."""
+
+    if n_solves is None:
+        n_solves = max(int(500 * scale), 10)
+    if solver is None:
+        solver = Solver("default")
+    rng = np.random.default_rng(seed)
+    cube = CubeLookup()
+
+    latencies = np.empty(n_solves)
+    n_moves = np.empty(n_solves)
+    for i_solve in range(n_solves):
+        cube.set_default_cube_state()
+        cube.apply_moves(rng.integers(0, 12, 30))
+
+        start_time = time.perf_counter()
+        moves = solver.solve_cube(cube, output_moves=True)
+        latencies[i_solve] = time.perf_counter() - start_time
+        n_moves[i_solve] = len(moves)
+
+    return {
+        "n_solves": n_solves,
+        "solve_p50_s": float(np.percentile(latencies, 50)),
+        "solve_p90_s": float(np.percentile(latencies, 90)),
+        "solve_p99_s": float(np.percentile(latencies, 99)),
+        "solve_mean_s": float(np.mean(latencies)),
+        "solve_mean_moves": float(np.mean(n_moves)),
+    }
+
+
+def bench_solve_many(scale=1.0, seed=0):
+    """Throughput of Solver.solve_many on seeded scrambles, in solves per second."""
+
+    n_solves = max(int(20000 * scale), 100)
+    solver = Solver("default")
+    rng = np.random.default_rng(seed)
+    cube_batch = CubeBatch(n_solves)
+    cube_batch.move_decoder(rng.integers(0, 12, (n_solves, 30)))
+
+    start_time = time.perf_counter()
+    solver.solve_many(cube_batch)
+    solve_seconds = time.perf_counter() - start_time
+
+    return {
+        "n_solves": n_solves,
+        "solve_many_per_s": _rate(n_solves, solve_seconds),
+    }
+
+
+def bench_two_phase_solve(scale=1.0, seed=0):
+    """Latency percentiles of TwoPhaseSolver.solve_cube on seeded scrambles, in seconds."""
+
+    return bench_solve(
+        scale, seed, solver=TwoPhaseSolver(), n_solves=max(int(50 * scale), 5)
+    )
+
+
+def bench_ida_star_solve(scale=1.0, seed=0):
+    """
+    Latency percentiles of IDAStarSolver.find_moves_to_solve on seeded
+    10 move scrambles, in seconds, and the mean number of nodes expanded.
+    """
+
+    n_solves = max(int(50 * scale), 5)
+    solver = IDAStarSolver()
+    rng = np.random.default_rng(seed)
+    cube = CubeLookup()
+
+    latencies = np.empty(n_solves)
+    n_nodes = np.empty(n_solves)
+    for i_solve in range(n_solves):
+        cube.set_default_cube_state()
+        cube.apply_moves(rng.integers(0, 12, 10))
+
+        start_time = time.perf_counter()
+        _, search_report = solver.find_moves_to_solve(cube)
+        latencies[i_solve] = time.perf_counter() - start_time
+        n_nodes[i_solve] = search_report["nodes"]
+
+    return {
+        "n_solves": n_solves,
+        "solve_p50_s": float(np.percentile(latencies, 50)),
+        "solve_p90_s": float(np.percentile(latencies, 90)),
+        "solve_p99_s": float(np.percentile(latencies, 99)),
+        "solve_mean_nodes": float(np.mean(n_nodes)),
+    }
+
+
+def bench_solver_load(scale=1.0, seed=0):
+    """Seconds to load the default solver, in each of the file formats."""
+
+    del seed  # Nothing random, the seed is only part of the signature of BENCHMARKS
+    array_of_dict_solvers = Solver("default").array_of_dict_solvers
+    n_calls = max(int(20 * scale), 2)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        binary_file_name = os.path.join(temp_dir, "algorithm.npz")
+        text_file_name = os.path.join(temp_dir, "algorithm.txt")
+        mapped_file_name = os.path.join(temp_dir, "algorithm.mapped")
+
+        save_algorithm(binary_file_name, array_of_dict_solvers)
+        save_mapped_algorithm(mapped_file_name, array_of_dict_solvers)
+        with open(text_file_name, "w", encoding="utf-8") as file_out:
+            file_out.write(
+                str([dict(dict_solver) for dict_solver in array_of_dict_solvers])
+            )
+
+        return {
+            "solver_load_binary_s": _time_per_call(
+                lambda: Solver(binary_file_name), n_calls
+            ),
+            "solver_load_mapped_s": _time_per_call(
+                lambda: Solver(mapped_file_name), n_calls
+            ),
+            "solver_load_text_s": _time_per_call(
+                lambda: Solver(text_file_name), n_calls
+            ),
+        }
+
+
+def bench_algorithm_generation(scale=1.0, seed=0):
+    """
+    Seconds to generate the first stages of the default algorithm,
+    with Monte Carlo samples and with the breadth-first search.
+    """
+
+    # Too few samples can miss states of a stage, which the next stage then fails on
+    n_mc_cubes = max(int(2000 * scale), 500)
+    mc_stages = DEFAULT_STAGES[0:2]
+    bfs_stages = DEFAULT_STAGES[0:4]
+
+    start_time = time.perf_counter()
+    run_mc_samples(n_mc_cubes, mc_stages, seed=seed)
+    mc_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    run_bfs_search(bfs_stages, n_mc_cubes=0)
+    bfs_seconds = time.perf_counter() - start_time
+
+    return {
+        "n_mc_cubes": n_mc_cubes,
+        "mc_n_stages": len(mc_stages),
+        "mc_generation_s": mc_seconds,
+        "bfs_n_stages": len(bfs_stages),
+        "bfs_generation_s": bfs_seconds,
+    }
+
+
+BENCHMARKS = {
+    "import": bench_import,
+    "moves": bench_moves,
+    "state_io": bench_state_io,
+    "solve": bench_solve,
+    "solve_many": bench_solve_many,
+    "two_phase_solve": bench_two_phase_solve,
+    "ida_star_solve": bench_ida_star_solve,
+    "solver_load": bench_solver_load,
+    "algorithm_generation": bench_algorithm_generation,
+}
+
+
+def run_benchmarks(names=None, scale=1.0, seed=0):
+    """
+    Runs the benchmarks and collects their results.
+
+    Parameters
+    ----------
+    names : list of str
+        Names of the benchmarks to run, keys of BENCHMARKS.
+        Default of None runs all of them.
+    scale : float
+        Multiplies the number of iterations of each benchmark.
+    seed : int
+        Seed of the random moves and scrambles, for reproducible runs.
+
+    Returns
+    -------
+    results : dict
+        The environment the benchmarks ran in, and the results of each benchmark.
+    """
+
+    if names is None:
+        names = list(BENCHMARKS)
+
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Not a valid benchmark: {name}")
+
+    results = {
+        "environment": {
+            "pybikscube": PyBiksCube.__version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "scale": scale,
+        "seed": seed,
+        "benchmarks": {},
+    }
+
+    for name in names:
+        results["benchmarks"][name] = BENCHMARKS[name](scale=scale, seed=seed)
+
+    return results
+
+
+def main(argv=None):
+    """Command line entry point, prints or saves the results as JSON."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m PyBiksCube.bench", description=__doc__
+    )
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        help=f"Benchmarks to run, all of them by default. One of: {', '.join(BENCHMARKS)}",
+    )
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="File to save the JSON to, stdout by default.")
+    args = parser.parse_args(argv)
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"Not a valid benchmark: {name}")
+
+    results = run_benchmarks(args.benchmarks or None, args.scale, args.seed)
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as file_out:
+            json.dump(results, file_out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
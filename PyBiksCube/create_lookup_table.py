@@ -1,6 +1,20 @@
 """ Module that creates the lookup table used for moves in the CubeLookup class """
 import numpy as np
-from PyBiksCube import Cube
+from PyBiksCube import CubeArray
+from PyBiksCube.symmetry import SIDE_NORMALS, get_facelet_geometry
+from PyBiksCube.utilities import MOVE_NAMES, N_QUARTER_TURNS
+
+# Face whose turn each slice move, wide move and rotation follows,
+# and the layers moved, as distances from the center along the face normal
+LAYER_MOVES = {
+    "M": ("L", (0,)),
+    "E": ("D", (0,)),
+    "S": ("F", (0,)),
+    **{face + "w": (face, (0, 1)) for face in "UFDLRB"},
+    "x": ("R", (-1, 0, 1)),
+    "y": ("U", (-1, 0, 1)),
+    "z": ("F", (-1, 0, 1)),
+}
 
 
 def create_lookup_table(output_file_name):
@@ -10,39 +24,33 @@ def create_lookup_table(output_file_name):
     The lookup table is a map of indices used in rotations from before to after the move.
 
     Works by:
-    1) Loading up the Cube class, which uses an object oriented approach for
-    simulating the cube, with unique colors on each face.
+    1) Loading up the CubeArray class, the array backed version of the object
+    oriented Cube class, with unique colors on each face.
     2) Apply move to the cube
     3) Find the new indices of each face after the move
     4) Collect all fundamdental moves and their index maps into a 2D array
-    5) Save array to output_file_name
+    5) Add the other moves of utilities.MOVE_NAMES, see calc_layer_lookup_table
+    6) Save array to output_file_name
 
     Parameters
     ----------
     output_file_name : str
-        Name of output csv file.
+        Name of output file. Saved as a binary numpy array if it ends with .npy,
+        as a csv file otherwise.
     """
 
-    fundamental_moves = [
-        "U",
-        "F",
-        "D",
-        "L",
-        "R",
-        "B",
-        "U'",
-        "F'",
-        "D'",
-        "L'",
-        "R'",
-        "B'",
-    ]
+    fundamental_moves = MOVE_NAMES[:N_QUARTER_TURNS]
 
     move_array = np.array(
-        [calc_lookup_table_for_move(move) for move in fundamental_moves], dtype=np.int16
+        [calc_lookup_table_for_move(move) for move in fundamental_moves]
+        + [calc_layer_lookup_table(move) for move in MOVE_NAMES[N_QUARTER_TURNS:]],
+        dtype=np.int16,
     )
 
-    np.savetxt(output_file_name, move_array, fmt="%i", delimiter=",")
+    if output_file_name.endswith(".npy"):
+        np.save(output_file_name, move_array)
+    else:
+        np.savetxt(output_file_name, move_array, fmt="%i", delimiter=",")
 
 
 def calc_lookup_table_for_move(move):
@@ -60,7 +68,7 @@ def calc_lookup_table_for_move(move):
         Indices corresponding to the move requested. Length of 54 elements.
     """
 
-    cube = Cube()
+    cube = CubeArray()
 
     initial_cube_state = "abcdefghijklmnopqrstuvwxyz[ABCDEFGHIJKLMNOPQRSTUVWXYZ]"
     cube.set_cube_state(initial_cube_state)
@@ -72,3 +80,48 @@ def calc_lookup_table_for_move(move):
     )
 
     return cur_map
+
+
+def calc_layer_lookup_table(move):
+    """
+    Calculate the indices needed for a move of one or more layers,
+    by rotating the position and normal of each face of the moved layers.
+    Covers every move of utilities.MOVE_NAMES: face turns, slice moves,
+    wide moves and rotations, with an optional ' or 2.
+
+    Parameters
+    ----------
+    move : str
+        Move to perform on the cube, e.g. "U2", "M'", "Rw" or "x".
+
+    Returns
+    -------
+    cur_map : array of ints
+        Indices corresponding to the move requested. Length of 54 elements.
+    """
+
+    n_quarter_turns = {"'": 3, "2": 2}.get(move[-1], 1)
+    layer_move = move.rstrip("'2")
+    face, layers = LAYER_MOVES.get(layer_move, (layer_move, (1,)))
+
+    # Clockwise quarter turn seen from outside the face, v -> n (n.v) - n x v
+    normal = np.array(SIDE_NORMALS[face])
+    cross_product_matrix = np.cross(np.eye(3, dtype=np.int64), normal)
+    rotation = np.outer(normal, normal) - cross_product_matrix
+    rotation = np.linalg.matrix_power(rotation, n_quarter_turns)
+
+    positions, normals = get_facelet_geometry()
+    facelet_lookup = {
+        (tuple(position), tuple(facelet_normal)): i_face
+        for i_face, (position, facelet_normal) in enumerate(zip(positions, normals))
+    }
+
+    # Where each face ends up after the move
+    images = np.arange(54)
+    for i_face, (position, facelet_normal) in enumerate(zip(positions, normals)):
+        if position @ normal in layers:
+            images[i_face] = facelet_lookup[
+                (tuple(rotation @ position), tuple(rotation @ facelet_normal))
+            ]
+
+    return np.argsort(images).astype(np.int16)
@@ -1,9 +1,83 @@
 """ Module that creates the default algorithm solver """
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from PyBiksCube import CubeLookup, Solver
+from PyBiksCube.algorithm_io import save_algorithm
+from PyBiksCube.move_optimizer import simplify_moves
+from PyBiksCube.utilities import BLANK_CODE, encode_cube_state, decode_cube_state
 
+# Default Stages, solving one piece at a time
+DEFAULT_STAGES = [
+    "krkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkwkkkkkkk",
+    "krkrrkkkkkkkkkkkkkkkkkkkkkkkgkkkkkkkkkkkkkkkkkwkkkkkkk",
+    "krkrrkkrkkykkkkkkkkkkkkkkkkkgkkkkkkkkkkkkkkkkkwkkkkkkk",
+    "krkrrrkrkkykkkkkkkkkkkkkkkkkgkkkkkkkkbkkkkkkkkwkkkkkkk",
+    "rrkrrrkrkkykkkkkkkkkkkkkkkkggkkkkkkkkbkkkkkkkkwwkkkkkk",
+    "rrrrrrkrkkykkkkkkkkkkkkkkkkggkkkkkkkkbbkkkkkkwwwkkkkkk",
+    "rrrrrrrrkyykkkkkkkkkkkkkkkkgggkkkkkkkbbkkkkkkwwwkkkkkk",
+    "rrrrrrrrryyykkkkkkkkkkkkkkkgggkkkkkkbbbkkkkkkwwwkkkkkk",
+    "rrrrrrrrryyykkkkkkkkkkkkkkkgggggkkkkbbbkkkkkkwwwkwwkkk",
+    "rrrrrrrrryyykkkkkkkkkkkkkkkgggggkkkkbbbkbbkkkwwwwwwkkk",
+    "rrrrrrrrryyyyykkkkkkkkkkkkkggggggkkkbbbkbbkkkwwwwwwkkk",
+    "rrrrrrrrryyyyyykkkkkkkkkkkkggggggkkkbbbbbbkkkwwwwwwkkk",
+    "rrrrrrrrryyyyyykkkkkkkmkkmkggggggkkkbbbbbbkkkwwwwwwkwk",
+    "rrrrrrrrryyyyyykkkkkkmmkkmkggggggkgkbbbbbbkkkwwwwwwkwk",
+    "rrrrrrrrryyyyyykkkkkkmmmkmkggggggkgkbbbbbbkbkwwwwwwkwk",
+    "rrrrrrrrryyyyyykykkmkmmmkmkggggggkgkbbbbbbkbkwwwwwwkwk",
+    "rrrrrrrrryyyyyykykkmkmmmmmkggggggggkbbbbbbkbkwwwwwwkww",
+    "rrrrrrrrryyyyyykykkmkmmmmmmggggggggkbbbbbbkbbwwwwwwwww",
+    "rrrrrrrrryyyyyyyykmmkmmmmmmgggggggggbbbbbbkbbwwwwwwwww",
+    "rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww",
+]
 
-def create_algorithm(output_file_name, n_mc_cubes=10000, stages=None, verbose=False):
+# Turns clockwise turns to counterclockwise
+REVERSER_LOOKUP_TABLE = {
+    0: 6,
+    1: 7,
+    2: 8,
+    3: 9,
+    4: 10,
+    5: 11,
+    6: 0,
+    7: 1,
+    8: 2,
+    9: 3,
+    10: 4,
+    11: 5,
+    # Half turns, from simplify_moves, are their own reverse
+    12: 12,
+    13: 13,
+    14: 14,
+    15: 15,
+    16: 16,
+    17: 17,
+}
+
+# Same as REVERSER_LOOKUP_TABLE, as an array for vectorized lookups
+REVERSER_LOOKUP_ARRAY = np.array(
+    [REVERSER_LOOKUP_TABLE[move] for move in range(len(REVERSER_LOOKUP_TABLE))],
+    dtype=np.int16,
+)
+
+# Number of Monte Carlo samples in each chunk when seeded or run in parallel.
+# Fixed, so the algorithm found for a seed does not depend on the number of workers.
+MC_CHUNK_SIZE = 500
+
+# Odd 64 bit constant mixing the packed states of the search into their hash
+STATE_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def create_algorithm(
+    output_file_name,
+    n_mc_cubes=10000,
+    stages=None,
+    verbose=False,
+    workers=None,
+    seed=None,
+    method="mc",
+    max_states=250000,
+    simplify=False,
+):
     """
     Iteratively finds the moves needed to solve a cube from a shuffled state up to the state
     perscribed in a given stage.
@@ -16,7 +90,8 @@ def create_algorithm(output_file_name, n_mc_cubes=10000, stages=None, verbose=Fa
     Parameters
     ----------
     output_file_name : str
-        File name where algorithm is saved to text.
+        File name where algorithm is saved to, in the binary format
+        of algorithm_io.save_algorithm.
     n_mc_cubes : int
         Number of Monte Carlo cube shuffles uses for each stage.
         The higher the number, the slower the run but the more likely
@@ -26,17 +101,50 @@ def create_algorithm(output_file_name, n_mc_cubes=10000, stages=None, verbose=Fa
         54 long strings, representing each face on cube.
         Default of None results in a one piece at a time approach.
     verbose : bool
+    workers : int
+        Number of processes the Monte Carlo samples are spread over.
+        See run_mc_samples.
+    seed : int
+        Seed of the Monte Carlo samples. See run_mc_samples.
+    method : str
+        "mc" to find the moves with Monte Carlo samples (run_mc_samples),
+        "bfs" to find them with a breadth-first search (run_bfs_search).
+    max_states : int
+        Maximum number of states searched per stage when method is "bfs".
+    simplify : bool
+        Simplifies the moves found by Monte Carlo samples. See run_mc_samples.
     """
-    array_of_dict_solvers = run_mc_samples(n_mc_cubes, stages, verbose)
+    if method == "mc":
+        array_of_dict_solvers = run_mc_samples(
+            n_mc_cubes, stages, verbose, workers, seed, simplify
+        )
+    elif method == "bfs":
+        array_of_dict_solvers = run_bfs_search(
+            stages, max_states, n_mc_cubes, verbose, seed, simplify
+        )
+    else:
+        raise ValueError(f"Not a valid method: {method}")
 
-    with open(output_file_name, "w", encoding="utf-8") as file_out:
-        file_out.write(str(array_of_dict_solvers))
+    save_algorithm(output_file_name, array_of_dict_solvers)
 
 
-def run_mc_samples(n_mc_cubes=10000, stages=None, verbose=False):
+def run_mc_samples(
+    n_mc_cubes=10000,
+    stages=None,
+    verbose=False,
+    workers=None,
+    seed=None,
+    simplify=False,
+):
     """
     The idea is that we iteratively build this badboy up.
 
+    If workers or seed is given, the Monte Carlo samples of each stage are split
+    into chunks of MC_CHUNK_SIZE, each with its own random generator spawned from seed.
+    The chunks are run over a pool of worker processes and their results merged,
+    keeping the shortest moves for each key. The algorithm found only depends on
+    seed, not on the number of workers.
+
     Parameters
     ----------
     n_mc_cubes : int
@@ -48,87 +156,458 @@ def run_mc_samples(n_mc_cubes=10000, stages=None, verbose=False):
         54 long strings, representing each face on cube.
         Default of None results in a one piece at a time approach.
     verbose : bool
+    workers : int
+        Number of processes the Monte Carlo samples are spread over.
+        Default of None runs in this process.
+    seed : int
+        Seed of the Monte Carlo samples.
+        Default of None uses numpy's global random state when workers is None,
+        and fresh entropy otherwise.
+    simplify : bool
+        Simplifies the moves of each sample before keeping the shortest,
+        see move_optimizer.simplify_moves. The samples are built from
+        random moves and the moves of the previous stages, so often have
+        moves that cancel out.
+
+    Returns
+    -------
+    array_of_dict_solvers : array of dictionaries
+        Array of the dictionaries used in each stage.
     """
 
-    # Turns clockwise turns to counterclockwise
-    reverser_lookup_table = {
-        0: 6,
-        1: 7,
-        2: 8,
-        3: 9,
-        4: 10,
-        5: 11,
-        6: 0,
-        7: 1,
-        8: 2,
-        9: 3,
-        10: 4,
-        11: 5,
-    }
+    if stages is None:
+        stages = DEFAULT_STAGES
 
-    cube = CubeLookup()
-    solver = Solver()
+    executor = None
+    if workers is not None and workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
 
-    # Default Stages
-    if stages is None:
-        stages = [
-            "krkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkwkkkkkkk",
-            "krkrrkkkkkkkkkkkkkkkkkkkkkkkgkkkkkkkkkkkkkkkkkwkkkkkkk",
-            "krkrrkkrkkykkkkkkkkkkkkkkkkkgkkkkkkkkkkkkkkkkkwkkkkkkk",
-            "krkrrrkrkkykkkkkkkkkkkkkkkkkgkkkkkkkkbkkkkkkkkwkkkkkkk",
-            "rrkrrrkrkkykkkkkkkkkkkkkkkkggkkkkkkkkbkkkkkkkkwwkkkkkk",
-            "rrrrrrkrkkykkkkkkkkkkkkkkkkggkkkkkkkkbbkkkkkkwwwkkkkkk",
-            "rrrrrrrrkyykkkkkkkkkkkkkkkkgggkkkkkkkbbkkkkkkwwwkkkkkk",
-            "rrrrrrrrryyykkkkkkkkkkkkkkkgggkkkkkkbbbkkkkkkwwwkkkkkk",
-            "rrrrrrrrryyykkkkkkkkkkkkkkkgggggkkkkbbbkkkkkkwwwkwwkkk",
-            "rrrrrrrrryyykkkkkkkkkkkkkkkgggggkkkkbbbkbbkkkwwwwwwkkk",
-            "rrrrrrrrryyyyykkkkkkkkkkkkkggggggkkkbbbkbbkkkwwwwwwkkk",
-            "rrrrrrrrryyyyyykkkkkkkkkkkkggggggkkkbbbbbbkkkwwwwwwkkk",
-            "rrrrrrrrryyyyyykkkkkkkmkkmkggggggkkkbbbbbbkkkwwwwwwkwk",
-            "rrrrrrrrryyyyyykkkkkkmmkkmkggggggkgkbbbbbbkkkwwwwwwkwk",
-            "rrrrrrrrryyyyyykkkkkkmmmkmkggggggkgkbbbbbbkbkwwwwwwkwk",
-            "rrrrrrrrryyyyyykykkmkmmmkmkggggggkgkbbbbbbkbkwwwwwwkwk",
-            "rrrrrrrrryyyyyykykkmkmmmmmkggggggggkbbbbbbkbkwwwwwwkww",
-            "rrrrrrrrryyyyyykykkmkmmmmmmggggggggkbbbbbbkbbwwwwwwwww",
-            "rrrrrrrrryyyyyyyykmmkmmmmmmgggggggggbbbbbbkbbwwwwwwwww",
-            "rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww",
-        ]
+    # Only used by the chunked runs, the serial run keeps numpy's global random state
+    chunked = workers is not None or seed is not None
+    stage_seeds = np.random.SeedSequence(seed).spawn(len(stages))
 
     array_of_dict_solvers = [{} for i in range(len(stages))]
-    for i_stage, stage in enumerate(stages):
-        # Start with the empty set, in case this stage can be skipped
-        dict_solver = {stage: np.array([], dtype=np.int16)}
+    try:
+        for i_stage, stage in enumerate(stages):
+            # Start with the empty set, in case this stage can be skipped
+            dict_solver = {stage: np.array([], dtype=np.int16)}
+            previous_stages = array_of_dict_solvers[0:i_stage]
 
-        for i_mc in range(n_mc_cubes):
-            cube.set_cube_state(stage)
-            n_moves = int(np.ceil(10.0 * (i_mc + 1.0) / n_mc_cubes))
-            mc_moves = cube.randomize(n_moves)
+            if not chunked:
+                chunk_results = [
+                    _run_mc_chunk(
+                        stage,
+                        previous_stages,
+                        0,
+                        n_mc_cubes,
+                        n_mc_cubes,
+                        simplify=simplify,
+                    )
+                ]
+            else:
+                chunk_starts = list(range(0, n_mc_cubes, MC_CHUNK_SIZE))
+                chunk_seeds = stage_seeds[i_stage].spawn(len(chunk_starts))
+                chunk_arguments = (
+                    [stage] * len(chunk_starts),
+                    [previous_stages] * len(chunk_starts),
+                    chunk_starts,
+                    [min(start + MC_CHUNK_SIZE, n_mc_cubes) for start in chunk_starts],
+                    [n_mc_cubes] * len(chunk_starts),
+                    chunk_seeds,
+                    [simplify] * len(chunk_starts),
+                )
+                if executor is None:
+                    chunk_results = map(_run_mc_chunk, *chunk_arguments)
+                else:
+                    chunk_results = executor.map(_run_mc_chunk, *chunk_arguments)
 
-            solver.array_of_dict_solvers = array_of_dict_solvers[0:i_stage]
-            moves_to_solve_to_prev_stage = solver.solve_cube(cube, True)
-            mc_moves = np.append(mc_moves, moves_to_solve_to_prev_stage)
+            # Merged in chunk order, so ties keep the earliest sample as when serial
+            for chunk_result in chunk_results:
+                for cube_state, moves in chunk_result.items():
+                    if cube_state not in dict_solver or len(moves) < len(
+                        dict_solver[cube_state]
+                    ):
+                        dict_solver[cube_state] = moves
 
-            # The unsolved cube
-            cube_state = cube.get_cube_state()
+            if verbose:
+                print(f"Number of unique states: {len(dict_solver)}")
+                for i, key in enumerate(dict_solver):
+                    print(
+                        f"{i}) \t {key} \t {len(dict_solver[key])} \t {dict_solver[key]}"
+                    )
 
-            save_path = False
-            if cube_state not in dict_solver:
-                save_path = True
-            else:
-                if len(mc_moves) < len(dict_solver[cube_state]):
-                    save_path = True
+            array_of_dict_solvers[i_stage] = dict_solver
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return array_of_dict_solvers
+
+
+def run_bfs_search(
+    stages=None,
+    max_states=250000,
+    n_mc_cubes=10000,
+    verbose=False,
+    seed=None,
+    simplify=False,
+):
+    """
+    Finds the moves of each stage with a breadth-first search, instead of
+    Monte Carlo samples, producing the same array of dictionaries as run_mc_samples.
+
+    For each stage, all cube states (masked by the stage) are enumerated by
+    applying every move to the states found so far, starting from the stage itself.
+    Each state found that also solves the previous stage is a key of the stage,
+    and its moves are the reverse of the path that reached it, which is the shortest.
+    The search is vectorized over batches of the frontier.
+
+    If the search of a stage ends before max_states, every key of the stage is found.
+    Otherwise, the stage is too large to enumerate (typically, once more than the
+    first few pieces are being solved) and the keys that were not reached are
+    found with n_mc_cubes Monte Carlo samples, as in run_mc_samples.
+
+    Parameters
+    ----------
+    stages : array of strs
+        Stages used for solving, keys / masks for cube states.
+        54 long strings, representing each face on cube.
+        Default of None results in a one piece at a time approach.
+    max_states : int
+        Maximum number of states searched per stage.
+    n_mc_cubes : int
+        Number of Monte Carlo cube shuffles for stages that were not fully searched.
+    verbose : bool
+    seed : int
+        Seed of the Monte Carlo samples. See run_mc_samples.
+    simplify : bool
+        Simplifies the moves of the Monte Carlo samples. See run_mc_samples.
+        The moves found by the search are already the shortest.
+
+    Returns
+    -------
+    array_of_dict_solvers : array of dictionaries
+        Array of the dictionaries used in each stage.
+    """
+
+    if stages is None:
+        stages = DEFAULT_STAGES
 
-            if save_path:
-                # The steps needed to solve it are the reverse of what made it
-                mc_moves = np.flip(mc_moves)
-                mc_moves = [reverser_lookup_table[mc_move] for mc_move in mc_moves]
-                dict_solver[cube_state] = mc_moves
+    move_array = CubeLookup().move_array[:12]
+    stage_seeds = np.random.SeedSequence(seed).spawn(len(stages))
+
+    array_of_dict_solvers = [{} for i in range(len(stages))]
+    for i_stage, stage in enumerate(stages):
+        previous_stage = stages[i_stage - 1] if i_stage > 0 else None
+        dict_solver, complete = _run_bfs_stage(
+            stage, previous_stage, move_array, max_states
+        )
+
+        if verbose:
+            print(
+                f"Stage {i_stage}: {len(dict_solver)} states found by search, "
+                f"{'complete' if complete else 'incomplete'}"
+            )
+
+        if not complete:
+            chunk_result = _run_mc_chunk(
+                stage,
+                array_of_dict_solvers[0:i_stage],
+                0,
+                n_mc_cubes,
+                n_mc_cubes,
+                stage_seeds[i_stage],
+                simplify,
+            )
+            for cube_state, moves in chunk_result.items():
+                if cube_state not in dict_solver:
+                    dict_solver[cube_state] = moves
 
         if verbose:
             print(f"Number of unique states: {len(dict_solver)}")
-            for i, key in enumerate(dict_solver):
-                print(f"{i}) \t {key} \t {len(dict_solver[key])} \t {dict_solver[key]}")
 
         array_of_dict_solvers[i_stage] = dict_solver
 
     return array_of_dict_solvers
+
+
+def _run_bfs_stage(stage, previous_stage, move_array, max_states, batch_size=20000):
+    """
+    Breadth-first search of the cube states of one stage, see run_bfs_search.
+
+    Parameters
+    ----------
+    stage : str
+        Stage being solved for, key / mask for cube states.
+    previous_stage : str
+        Stage before this one, None for the first stage.
+    move_array : 2D array of ints
+        The moves to search with, as in CubeLookup.move_array.
+    max_states : int
+        Maximum number of states searched.
+    batch_size : int
+        Number of frontier states expanded at once.
+
+    Returns
+    -------
+    dict_solver : dict
+        The shortest moves for each state that also solves the previous stage.
+    complete : bool
+        Whether every state of the stage was searched.
+    """
+
+    move_array = np.asarray(move_array, dtype=np.intp)
+    n_moves = len(move_array)
+    stage_codes = encode_cube_state(stage)
+
+    if previous_stage is None:
+        previous_indices = np.array([], dtype=np.intp)
+        previous_codes = np.array([], dtype=np.uint8)
+    else:
+        previous_indices = np.flatnonzero(
+            encode_cube_state(previous_stage) != BLANK_CODE
+        )
+        previous_codes = encode_cube_state(previous_stage)[previous_indices]
+
+    # Each level of the search keeps, for each state, its parent and the move from it
+    level_parents = [np.array([-1])]
+    level_moves = [np.array([-1])]
+    entries = []
+    if np.all(stage_codes[previous_indices] == previous_codes):
+        entries.append((0, 0, stage))
+
+    # Every state found so far, packed (see _pack_states), sorted by their hash.
+    # Once two different states share a hash, the packed states are their own hash
+    visited_keys = _pack_states(stage_codes[np.newaxis, :])
+    visited_hashes = _hash_states(visited_keys)
+    exact = False
+    frontier = stage_codes[np.newaxis, :]
+    complete = True
+
+    while len(frontier) > 0:
+        if len(visited_keys) >= max_states:
+            complete = False
+            break
+
+        child_keys = np.concatenate(
+            [
+                _pack_states(frontier[i_batch : i_batch + batch_size, move_array])
+                for i_batch in range(0, len(frontier), batch_size)
+            ]
+        )
+
+        new_states = None
+        if not exact:
+            new_states = _find_new_states(
+                visited_hashes, visited_keys, _hash_states(child_keys), child_keys
+            )
+        if new_states is None:
+            exact = True
+            visited_keys = np.sort(visited_keys)
+            visited_hashes = visited_keys
+            new_states = _find_new_states(
+                visited_keys, visited_keys, child_keys, child_keys
+            )
+
+        # Each new state once, reached from the first of its parents and moves
+        i_children, new_hashes = new_states
+        i_visited = np.searchsorted(visited_hashes, new_hashes)
+        visited_hashes = np.insert(visited_hashes, i_visited, new_hashes)
+        if exact:
+            visited_keys = visited_hashes
+        else:
+            visited_keys = np.insert(visited_keys, i_visited, child_keys[i_children])
+        i_children = np.sort(i_children)
+
+        # The new states, in the order they were first reached
+        frontier = _unpack_states(child_keys[i_children])
+        level_parents.append(i_children // n_moves)
+        level_moves.append(i_children % n_moves)
+
+        is_entry = np.all(frontier[:, previous_indices] == previous_codes, axis=1)
+        entries.extend(
+            (len(level_parents) - 1, i_state, decode_cube_state(frontier[i_state]))
+            for i_state in np.flatnonzero(is_entry)
+        )
+
+    dict_solver = {}
+    for level, i_state, cube_state in entries:
+        # Walk back up to the stage, undoing the moves that reached this state
+        moves_to_solve = []
+        for i_level in range(level, 0, -1):
+            moves_to_solve.append(level_moves[i_level][i_state])
+            i_state = level_parents[i_level][i_state]
+        dict_solver[cube_state] = REVERSER_LOOKUP_ARRAY[
+            np.array(moves_to_solve, dtype=np.intp)
+        ]
+
+    return dict_solver, complete
+
+
+def _pack_states(cube_codes):
+    """
+    Packs the color codes of many cube states two per byte,
+    each state into one byte string of 27 bytes.
+    cube_codes may have extra leading dimensions, flattened into the states.
+    """
+
+    cube_codes = cube_codes.reshape(-1, 54)
+    packed_codes = cube_codes[:, 0::2] * 8 + cube_codes[:, 1::2]
+    return np.ascontiguousarray(packed_codes, dtype=np.uint8).view("S27").ravel()
+
+
+def _unpack_states(packed_states):
+    """Unpacks the color codes of packed states, see _pack_states."""
+
+    packed_codes = _as_bytes(packed_states)
+    cube_codes = np.empty((len(packed_codes), 54), dtype=np.uint8)
+    cube_codes[:, 0::2] = packed_codes >> 3
+    cube_codes[:, 1::2] = packed_codes & 7
+    return cube_codes
+
+
+def _as_bytes(packed_states):
+    """Views packed states, see _pack_states, as rows of 27 bytes."""
+
+    return packed_states.view(np.uint8).reshape(-1, 27)
+
+
+def _hash_states(packed_states):
+    """
+    Hashes packed states (see _pack_states) into uint64, which sort and search
+    much faster than the byte strings. Different states may share a hash,
+    see _find_new_states.
+    """
+
+    padded_states = np.zeros((len(packed_states), 32), dtype=np.uint8)
+    padded_states[:, :27] = _as_bytes(packed_states)
+
+    hashes = np.zeros(len(packed_states), dtype=np.uint64)
+    for words in padded_states.view(np.uint64).T:
+        hashes = (hashes ^ words) * STATE_HASH_MULTIPLIER
+        hashes ^= hashes >> np.uint64(29)
+    return hashes
+
+
+def _find_new_states(visited_hashes, visited_keys, hashes, keys):
+    """
+    Finds the states not visited yet among the children of a level of the search.
+
+    Parameters
+    ----------
+    visited_hashes : array
+        Hashes of the visited states, sorted.
+    visited_keys : array of byte strings
+        Packed visited states, in the order of visited_hashes.
+    hashes : array
+        Hashes of the children, in the order they were reached.
+    keys : array of byte strings
+        Packed children.
+
+    Returns
+    -------
+    new_states : tuple of arrays
+        Index of the first child reaching each new state, and the hash of each
+        new state, sorted. None if two different states share a hash.
+    """
+
+    # Groups the children by hash, the first child of each group reaching its state
+    order = np.argsort(hashes)
+    sorted_hashes = hashes[order]
+    is_group_start = np.empty(len(hashes), dtype=bool)
+    is_group_start[:1] = True
+    is_group_start[1:] = sorted_hashes[1:] != sorted_hashes[:-1]
+    i_group_starts = np.flatnonzero(is_group_start)
+    unique_hashes = sorted_hashes[i_group_starts]
+    i_first = np.minimum.reduceat(order, i_group_starts)
+
+    i_groups = np.cumsum(is_group_start) - 1
+    if np.any(_as_bytes(keys[order]) != _as_bytes(keys[i_first[i_groups]])):
+        return None
+
+    i_visited = np.searchsorted(visited_hashes, unique_hashes)
+    i_visited = np.minimum(i_visited, len(visited_hashes) - 1)
+    is_visited = visited_hashes[i_visited] == unique_hashes
+    if np.any(
+        _as_bytes(visited_keys[i_visited[is_visited]])
+        != _as_bytes(keys[i_first[is_visited]])
+    ):
+        return None
+
+    return i_first[~is_visited], unique_hashes[~is_visited]
+
+
+def _run_mc_chunk(
+    stage,
+    previous_stages,
+    i_mc_start,
+    i_mc_stop,
+    n_mc_cubes,
+    seed_sequence=None,
+    simplify=False,
+):
+    """
+    Runs the Monte Carlo samples i_mc_start to i_mc_stop of a stage.
+
+    Parameters
+    ----------
+    stage : str
+        Stage being solved for, key / mask for cube states.
+    previous_stages : array of dictionaries
+        Array of the dictionaries of the stages before this one.
+    i_mc_start, i_mc_stop : int
+        Range of the Monte Carlo samples to run.
+    n_mc_cubes : int
+        Total number of Monte Carlo samples of the stage.
+    seed_sequence : numpy SeedSequence
+        Seed of the random moves. Default of None uses numpy's global random state.
+    simplify : bool
+        Simplifies the moves of each sample.
+
+    Returns
+    -------
+    dict_solver : dict
+        The shortest moves found for each cube state.
+    """
+
+    cube = CubeLookup()
+    solver = Solver()
+    solver.array_of_dict_solvers = previous_stages
+
+    rng = None
+    if seed_sequence is not None:
+        rng = np.random.default_rng(seed_sequence)
+
+    dict_solver = {}
+    for i_mc in range(i_mc_start, i_mc_stop):
+        cube.set_cube_state(stage)
+        n_moves = int(np.ceil(10.0 * (i_mc + 1.0) / n_mc_cubes))
+        if rng is None:
+            mc_moves = cube.randomize(n_moves)
+        else:
+            mc_moves = rng.integers(0, 12, n_moves, dtype=np.int16)
+            cube.move_decoder(mc_moves)
+
+        moves_to_solve_to_prev_stage = solver.solve_cube(cube, True)
+        mc_moves = np.append(mc_moves, moves_to_solve_to_prev_stage)
+
+        # The unsolved cube
+        cube_state = cube.get_cube_state()
+
+        if simplify:
+            mc_moves = simplify_moves(mc_moves)
+
+        save_path = False
+        if cube_state not in dict_solver:
+            save_path = True
+        else:
+            if len(mc_moves) < len(dict_solver[cube_state]):
+                save_path = True
+
+        if save_path:
+            # The steps needed to solve it are the reverse of what made it
+            mc_moves = np.flip(mc_moves)
+            mc_moves = [REVERSER_LOOKUP_TABLE[mc_move] for mc_move in mc_moves]
+            dict_solver[cube_state] = mc_moves
+
+    return dict_solver
@@ -2,13 +2,70 @@
 
 from itertools import product
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
 
 from PyBiksCube.utilities import side_type_converter
 from PyBiksCube import Piece
 
 
+# Position of the piece and face of each of the 54 faces in the cube state
+CUBE_STATE_MAP = {
+    0: [(0, 0, 2), "U"],
+    1: [(0, 1, 2), "U"],
+    2: [(0, 2, 2), "U"],
+    3: [(1, 0, 2), "U"],
+    4: [(1, 1, 2), "U"],
+    5: [(1, 2, 2), "U"],
+    6: [(2, 0, 2), "U"],
+    7: [(2, 1, 2), "U"],
+    8: [(2, 2, 2), "U"],
+    9: [(2, 0, 2), "F"],
+    10: [(2, 1, 2), "F"],
+    11: [(2, 2, 2), "F"],
+    12: [(2, 0, 1), "F"],
+    13: [(2, 1, 1), "F"],
+    14: [(2, 2, 1), "F"],
+    15: [(2, 0, 0), "F"],
+    16: [(2, 1, 0), "F"],
+    17: [(2, 2, 0), "F"],
+    18: [(2, 0, 0), "D"],
+    19: [(2, 1, 0), "D"],
+    20: [(2, 2, 0), "D"],
+    21: [(1, 0, 0), "D"],
+    22: [(1, 1, 0), "D"],
+    23: [(1, 2, 0), "D"],
+    24: [(0, 0, 0), "D"],
+    25: [(0, 1, 0), "D"],
+    26: [(0, 2, 0), "D"],
+    27: [(0, 0, 2), "L"],
+    28: [(1, 0, 2), "L"],
+    29: [(2, 0, 2), "L"],
+    30: [(0, 0, 1), "L"],
+    31: [(1, 0, 1), "L"],
+    32: [(2, 0, 1), "L"],
+    33: [(0, 0, 0), "L"],
+    34: [(1, 0, 0), "L"],
+    35: [(2, 0, 0), "L"],
+    36: [(2, 2, 2), "R"],
+    37: [(1, 2, 2), "R"],
+    38: [(0, 2, 2), "R"],
+    39: [(2, 2, 1), "R"],
+    40: [(1, 2, 1), "R"],
+    41: [(0, 2, 1), "R"],
+    42: [(2, 2, 0), "R"],
+    43: [(1, 2, 0), "R"],
+    44: [(0, 2, 0), "R"],
+    45: [(0, 2, 2), "B"],
+    46: [(0, 1, 2), "B"],
+    47: [(0, 0, 2), "B"],
+    48: [(0, 2, 1), "B"],
+    49: [(0, 1, 1), "B"],
+    50: [(0, 0, 1), "B"],
+    51: [(0, 2, 0), "B"],
+    52: [(0, 1, 0), "B"],
+    53: [(0, 0, 0), "B"],
+}
+
+
 class Cube:
     """
     Representation of a Rubik's Cube. Includes:
@@ -53,62 +110,7 @@ class Cube:
             "R": [(i, 2, j) for i, j in product(range(3), repeat=2)],
         }
 
-        self.cube_state_map = {
-            0: [(0, 0, 2), "U"],
-            1: [(0, 1, 2), "U"],
-            2: [(0, 2, 2), "U"],
-            3: [(1, 0, 2), "U"],
-            4: [(1, 1, 2), "U"],
-            5: [(1, 2, 2), "U"],
-            6: [(2, 0, 2), "U"],
-            7: [(2, 1, 2), "U"],
-            8: [(2, 2, 2), "U"],
-            9: [(2, 0, 2), "F"],
-            10: [(2, 1, 2), "F"],
-            11: [(2, 2, 2), "F"],
-            12: [(2, 0, 1), "F"],
-            13: [(2, 1, 1), "F"],
-            14: [(2, 2, 1), "F"],
-            15: [(2, 0, 0), "F"],
-            16: [(2, 1, 0), "F"],
-            17: [(2, 2, 0), "F"],
-            18: [(2, 0, 0), "D"],
-            19: [(2, 1, 0), "D"],
-            20: [(2, 2, 0), "D"],
-            21: [(1, 0, 0), "D"],
-            22: [(1, 1, 0), "D"],
-            23: [(1, 2, 0), "D"],
-            24: [(0, 0, 0), "D"],
-            25: [(0, 1, 0), "D"],
-            26: [(0, 2, 0), "D"],
-            27: [(0, 0, 2), "L"],
-            28: [(1, 0, 2), "L"],
-            29: [(2, 0, 2), "L"],
-            30: [(0, 0, 1), "L"],
-            31: [(1, 0, 1), "L"],
-            32: [(2, 0, 1), "L"],
-            33: [(0, 0, 0), "L"],
-            34: [(1, 0, 0), "L"],
-            35: [(2, 0, 0), "L"],
-            36: [(2, 2, 2), "R"],
-            37: [(1, 2, 2), "R"],
-            38: [(0, 2, 2), "R"],
-            39: [(2, 2, 1), "R"],
-            40: [(1, 2, 1), "R"],
-            41: [(0, 2, 1), "R"],
-            42: [(2, 2, 0), "R"],
-            43: [(1, 2, 0), "R"],
-            44: [(0, 2, 0), "R"],
-            45: [(0, 2, 2), "B"],
-            46: [(0, 1, 2), "B"],
-            47: [(0, 0, 2), "B"],
-            48: [(0, 2, 1), "B"],
-            49: [(0, 1, 1), "B"],
-            50: [(0, 0, 1), "B"],
-            51: [(0, 2, 0), "B"],
-            52: [(0, 1, 0), "B"],
-            53: [(0, 0, 0), "B"],
-        }
+        self.cube_state_map = CUBE_STATE_MAP
 
         if cube_state is not None:
             self.set_cube_state(cube_state)
@@ -391,6 +393,10 @@ class Cube:
         Great for debugging.
         """
 
+        # Imported here so that only plotting needs matplotlib
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Rectangle
+
         _, ax = plt.subplots(figsize=(12, 9))
 
         for i_position in self.face_to_index_map["F"]:
@@ -470,9 +476,18 @@ class Cube:
         ax.set_ylim(-3, 6)
 
 
-if __name__ == "__main__":
+def main():
+    """Plots a cube after a U2, run with python -m PyBiksCube.cube"""
+
+    # Imported here so that only plotting needs matplotlib
+    import matplotlib.pyplot as plt
+
     # UFDLRB
     cube = Cube()
     cube.move_decoder("U2")
     cube.plot()
     plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+""" Module that defines the CubeArray class, the Cube class backed by a single array """
+
+import numpy as np
+
+from PyBiksCube.utilities import side_type_converter
+from PyBiksCube.cube import Cube, CUBE_STATE_MAP
+
+# Index of each side in the color axis, as in Piece.side_to_index_map
+SIDE_TO_INDEX_MAP = {"F": 0, "B": 2, "R": 1, "L": 3, "U": 5, "D": 4}
+
+# The sides that are rotated when a turn is initiated on given face key,
+# as in Piece.turn_sequences
+TURN_SEQUENCES = {
+    "F": ["U", "R", "D", "L"],
+    "B": ["U", "L", "D", "R"],
+    "R": ["U", "B", "D", "F"],
+    "L": ["U", "F", "D", "B"],
+    "U": ["F", "L", "B", "R"],
+    "D": ["F", "R", "B", "L"],
+}
+
+# The layer of pieces of each face, in the order of Cube.face_to_index_map
+FACE_TO_SLICE_MAP = {
+    "U": (slice(None), slice(None), 2),
+    "D": (slice(None), slice(None), 0),
+    "F": (2, slice(None), slice(None)),
+    "B": (0, slice(None), slice(None)),
+    "L": (slice(None), 0, slice(None)),
+    "R": (slice(None), 2, slice(None)),
+}
+
+# Flat index into the (3, 3, 3, 6) colors array of each of the 54 faces in the cube state
+CUBE_STATE_INDICES = np.array(
+    [
+        np.ravel_multi_index((*i_position, SIDE_TO_INDEX_MAP[face]), (3, 3, 3, 6))
+        for i_position, face in (CUBE_STATE_MAP[i] for i in range(54))
+    ]
+)
+
+FUNDAMENTAL_MOVES = ["U", "F", "D", "L", "R", "B", "U'", "F'", "D'", "L'", "R'", "B'"]
+
+
+class CubeArray:
+    """
+    Representation of a Rubik's Cube with the same interface as the Cube class,
+    but with the colors of all pieces stored in a single (3, 3, 3, 6) array.
+
+    A move rotates the whole layer of the face in one array operation,
+    then rolls the colors of every piece in the layer at once,
+    instead of moving and rotating each Piece object in turn.
+
+    Attributes
+    ----------
+    colors : 4D array of str
+        The color of each side of each piece. The first three axes are
+        the piece positions of Cube.pieces, the last the sides of
+        Piece.colors, following SIDE_TO_INDEX_MAP.
+    """
+
+    def __init__(self, cube_state=None, randomize=False):
+        """
+        The constructor for the CubeArray class.
+
+        Parameters
+        ----------
+        cube_state : str
+            Load the cube faces from a 54 character long string.
+            Default of None loads the solved cube.
+        randomize : bool
+            Randomize the cube via a random number of
+            fundamental movements.
+            Default to False.
+        """
+
+        self.colors = np.full((3, 3, 3, 6), "k", dtype="<U1")
+
+        if cube_state is not None:
+            self.set_cube_state(cube_state)
+        else:
+            # +x and -x
+            self.set_face_color("F", "y")
+            self.set_face_color("B", "w")
+
+            # +y and -y
+            self.set_face_color("R", "b")
+            self.set_face_color("L", "g")
+
+            # +z and -z
+            self.set_face_color("U", "r")
+            self.set_face_color("D", "m")
+
+        if randomize:
+            self.randomize(np.random.randint(2, 20))
+
+    def randomize(self, n_moves=10):
+        """
+        Randomizes the cube state by applying
+        n_moves number of random moves on cube.
+
+        Parameters
+        ----------
+        n_moves : int
+            Number of random moves to move.
+        """
+        move_commands = np.random.choice(FUNDAMENTAL_MOVES, n_moves)
+        for move_command in move_commands:
+            self.fundamental_move(move_command)
+
+    def set_cube_state(self, cube_state):
+        """
+        Sets cube face colors based on the
+        cube_state, a 54 long string.
+
+        Parameters
+        ----------
+        cube_state : str
+            String of 54 characters for color of different faces.
+            Order matches CUBE_STATE_MAP.
+        """
+
+        if len(cube_state) != 54:
+            raise ValueError(
+                "Cube state must be a 54-long list of chars or string of colors"
+            )
+
+        np.put(self.colors, CUBE_STATE_INDICES, list(cube_state))
+
+    def get_cube_state(self):
+        """
+        Returns cube face colors based on a 54 long string.
+
+        Returns
+        -------
+        cube_state : str
+            String of 54 characters for color of different faces.
+            Order matches CUBE_STATE_MAP.
+        """
+
+        return "".join(self.colors.take(CUBE_STATE_INDICES))
+
+    def set_face_color(self, face, color):
+        """
+        Sets all faces on side with color.
+
+        Parameters
+        ----------
+        face : str
+            Face to color in, following either xyz or FBRLUD
+        color : str
+            Color to fill in face. Should be a matplotlib color.
+        """
+
+        converted_face = side_type_converter(face)
+        self.colors[FACE_TO_SLICE_MAP[converted_face]][
+            ..., SIDE_TO_INDEX_MAP[converted_face]
+        ] = color
+
+    def get_face_colors(self, face):
+        """
+        Gets color of all faces on side.
+
+        Parameters
+        ----------
+        face : str
+            Face to color retrieve colors for, following either xyz or FBRLUD
+
+        Returns
+        -------
+        colors_flat : list of str
+            List of strings of all 9 face colors on a side.
+        """
+
+        converted_face = side_type_converter(face)
+        layer = self.colors[FACE_TO_SLICE_MAP[converted_face]]
+        return layer[..., SIDE_TO_INDEX_MAP[converted_face]].flatten()
+
+    def print_face(self, face):
+        """
+        Prints and gets color of all faces on side.
+
+        Parameters
+        ----------
+        face : str
+            Face to color retrieve colors for, following either xyz or FBRLUD
+        """
+
+        converted_face = side_type_converter(face)
+        print(face, end=" ")
+        print(" ")
+        print(self.get_face_colors(converted_face).reshape((3, 3)))
+        print(" ")
+
+    def check_solved(self):
+        """
+        Checks whether the cube is solved.
+
+        Returns
+        -------
+        solved : bool
+            Boolean of whether or not the cube is solved.
+        """
+
+        faces = self.colors.take(CUBE_STATE_INDICES).reshape((6, 9))
+        return bool(np.all(faces == faces[:, :1]))
+
+    def move_decoder(self, move_command):
+        """
+        Decodes move command, decomposing more complicated moves
+        into their fundamental movement components that are
+        then executed.
+        Currently, only complicated moves implemented are
+        the double moves U2, D2, R2, L2, F2, and B2
+
+        Parameters
+        ----------
+        move_command : str
+            Move command to perform.
+        """
+
+        if isinstance(move_command, (list, np.ndarray)):
+            for move_command_ in move_command:
+                self.move_decoder(move_command_)
+            return
+
+        if not isinstance(move_command, str):
+            raise ValueError("Move command should be a string")
+        move_command = move_command.strip()
+
+        double_moves = ["U2", "D2", "R2", "L2", "F2", "B2"]
+
+        valid_moves = [""] + FUNDAMENTAL_MOVES + double_moves
+        if move_command not in valid_moves:
+            raise ValueError(f"Not a valid move_command: {move_command}")
+
+        if move_command in double_moves:
+            self.fundamental_move(move_command[0])
+            self.fundamental_move(move_command[0])
+        else:
+            self.fundamental_move(move_command)
+
+    def fundamental_move(self, move_command):
+        """
+        Executes fundamental movements.
+        The fundamental movements are U, D, R, L, F, B
+        and U', D', R', L', F', B'
+
+        Parameters
+        ----------
+        move_command : str
+            Move command to perform.
+        """
+
+        if not isinstance(move_command, str):
+            raise ValueError("Move command should be a string")
+
+        move_command = move_command.strip()
+
+        if len(move_command) == 0:
+            return
+
+        if len(move_command) == 2 and move_command[1] != "'":
+            raise ValueError(
+                "Primed commands should have a prime in their second position."
+            )
+        if len(move_command) > 2:
+            raise ValueError(
+                f"Move command should be a two character command: {move_command}."
+            )
+
+        if move_command[0] not in "UFDLRB":
+            raise ValueError(
+                f"Move command should follow UFDLRB notation: {move_command[0]}"
+            )
+
+        direction = -1 if move_command.endswith("'") else 1
+        face = move_command[0]
+
+        # -1 is needed for the normally defined coordinate system of the notation
+        handedness_correction = -1 if face in "UFL" else 1
+
+        # Turn the layer of pieces, then rotate the colors of each of its pieces
+        face_slice = FACE_TO_SLICE_MAP[face]
+        layer = np.rot90(
+            self.colors[face_slice], handedness_correction * direction, axes=(0, 1)
+        ).copy()
+
+        sides_to_roll = [SIDE_TO_INDEX_MAP[side] for side in TURN_SEQUENCES[face]]
+        layer[..., sides_to_roll] = layer[..., np.roll(sides_to_roll, direction)]
+
+        self.colors[face_slice] = layer
+
+    def plot(self):
+        """
+        Creates a matplotlib plot of the cube
+        layed out in a cross, as in Cube.plot.
+        """
+
+        Cube(self.get_cube_state()).plot()
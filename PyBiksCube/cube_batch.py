@@ -0,0 +1,218 @@
+""" Module that defines the CubeBatch class, many lookup table based cubes at once """
+
+import numpy as np
+
+from PyBiksCube.cube_lookup import load_move_array, SOLVED_CUBE_STATE
+from PyBiksCube.utilities import (
+    encode_cube_state,
+    decode_cube_state,
+    decode_cube_colors,
+)
+
+
+class CubeBatch:
+    """
+    Representation of many Rubik's Cubes at once.
+    Uses the same lookup table as CubeLookup, but holds the state of
+    every cube in a single 2D array so moves can be applied
+    to the whole batch with one NumPy call.
+    Includes:
+
+    - commands to load and unload the cube states as 54 character long strings.
+    - commands to perform one move per cube, following the CubeLookup move integers
+    - command to check which cubes are solved
+
+    Like CubeLookup, the class is optimized for speed, so does not sanitize inputs.
+    A move of -1 leaves the corresponding cube untouched,
+    which is handy for padding move sequences of different lengths.
+
+    Face colors are stored as uint8 codes, the same as CubeLookup.
+
+    Attributes
+    ----------
+    cube_states : 2D array of uint8, N rows of 54 color codes for each face on cube
+    move_array : 2D array of ints, used to convert moves to indices of cube_states
+    """
+
+    def __init__(self, n_cubes=1, lookup_table_file_name=None, cube_states=None):
+        """
+        The constructor for the CubeBatch class.
+
+        Parameters
+        ----------
+        n_cubes : int
+            Number of solved cubes in the batch.
+            Ignored if cube_states is given.
+        lookup_table_file_name : str
+            Location of the lookup table used for moves
+        cube_states : list of str or 2D array of str
+            Load the cube faces from 54 character long strings, one per cube.
+            Default of None loads n_cubes solved cubes.
+        """
+
+        self.move_array = load_move_array(lookup_table_file_name)
+
+        # Extra identity row, so that move -1 is "do nothing"
+        self._move_array_padded = np.vstack(
+            [self.move_array, np.arange(54, dtype=self.move_array.dtype)]
+        )
+
+        self._solved_state = encode_cube_state(SOLVED_CUBE_STATE)
+
+        if cube_states is None:
+            self.cube_states = np.empty((n_cubes, 54), dtype=np.uint8)
+            self.set_default_cube_states()
+        else:
+            self.set_cube_states(cube_states)
+
+    def __len__(self):
+        return len(self.cube_states)
+
+    def set_cube_states(self, cube_states):
+        """
+        Sets the face colors of every cube in the batch.
+
+        Parameters
+        ----------
+        cube_states : list of str, 2D array of str or 2D array of uint8
+            Strings of 54 characters for color of different faces, one per cube.
+            Order matches CubeLookup.
+            A 2D array of uint8 is taken as color codes directly.
+        """
+
+        if isinstance(cube_states, np.ndarray) and cube_states.dtype == np.uint8:
+            self.cube_states = cube_states.reshape(-1, 54).copy()
+        elif isinstance(cube_states, np.ndarray):
+            self.cube_states = encode_cube_state(cube_states).reshape(-1, 54)
+        else:
+            self.cube_states = encode_cube_state("".join(cube_states)).reshape(-1, 54)
+
+    def get_cube_states(self):
+        """
+        Returns the face colors of every cube in the batch.
+
+        Returns
+        -------
+        cube_states : list of str
+            Strings of 54 characters for color of different faces, one per cube.
+        """
+
+        joined_states = decode_cube_state(self.cube_states)
+        return [joined_states[i : i + 54] for i in range(0, len(joined_states), 54)]
+
+    def get_raw_cube_states(self):
+        """
+        Returns the raw face colors of every cube in the batch.
+
+        Returns
+        -------
+        cube_states : 2D array of str
+            Array of N by 54 strings for color of different faces.
+        """
+
+        return decode_cube_colors(self.cube_states)
+
+    def get_cube_codes(self):
+        """
+        Returns the uint8 color codes of every cube in the batch.
+
+        Returns
+        -------
+        cube_codes : 2D array of uint8
+            Array of N by 54 codes, the index of each face color in COLOR_PALETTE.
+        """
+
+        return self.cube_states
+
+    def set_default_cube_states(self):
+        """
+        Sets every cube in the batch to the default solved Rubik's cube.
+        The red face on top and yellow face on front.
+        """
+
+        self.cube_states = np.tile(self._solved_state, (len(self.cube_states), 1))
+
+    def move(self, move_commands):
+        """
+        Applies one move to each cube in the batch, in a single gather.
+
+        The notation must be the corresponding integer for each move,
+        matching CubeLookup, or -1 for no move.
+
+        Parameters
+        ----------
+        move_commands : int or array of ints
+            Either a single move applied to all cubes,
+            or one move per cube (length N).
+        """
+
+        move_commands = np.asarray(move_commands)
+        if move_commands.ndim == 0:
+            self.cube_states = self.cube_states[
+                :, self._move_array_padded[move_commands]
+            ]
+            return
+
+        self.cube_states = np.take_along_axis(
+            self.cube_states, self._move_array_padded[move_commands], axis=1
+        )
+
+    def move_decoder(self, move_commands):
+        """
+        Applies a sequence of moves to each cube in the batch.
+
+        Parameters
+        ----------
+        move_commands : 1D or 2D array of ints
+            If 1D, the same sequence of moves is applied to every cube.
+            If 2D of shape (N, n_moves), row i is the sequence applied to cube i,
+            padded with -1 for sequences shorter than n_moves.
+        """
+
+        move_commands = np.asarray(move_commands)
+
+        if move_commands.ndim == 1:
+            for move_command in move_commands:
+                self.move(move_command)
+            return
+
+        for move_column in move_commands.T:
+            self.move(move_column)
+
+    def randomize(self, n_moves=None):
+        """
+        Randomizes every cube in the batch independently
+        by applying n_moves random moves to each cube.
+
+        Parameters
+        ----------
+        n_moves : int
+            Number of random moves to move.
+            Default of None randomly selects an number from 1 to 30.
+
+        Returns
+        -------
+        mc_moves : 2D array of ints
+            The moves applied, of shape (N, n_moves).
+        """
+
+        if n_moves is None:
+            n_moves = np.random.randint(1, 30)
+        mc_moves = np.random.choice(
+            np.arange(12, dtype=np.int16), (len(self.cube_states), n_moves)
+        )
+        self.move_decoder(mc_moves)
+        return mc_moves
+
+    def check_solved(self):
+        """
+        Checks which cubes in the batch are solved,
+        using the same solved state as CubeLookup.
+
+        Returns
+        -------
+        solved : array of bool
+            Whether or not each cube is solved.
+        """
+
+        return np.all(self.cube_states == self._solved_state, axis=1)
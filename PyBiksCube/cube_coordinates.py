@@ -0,0 +1,614 @@
+"""
+Module that defines the CubeCoordinates class,
+the cube as permutation and orientation coordinates
+"""
+
+from functools import lru_cache
+from itertools import combinations
+import numpy as np
+
+from PyBiksCube.utilities import encode_cube_state, decode_cube_state
+from PyBiksCube.cube_lookup import load_move_array, SOLVED_CUBE_STATE
+
+# Faces of the solved cube, the color code of each of the 54 faces
+FACELET_FACES = encode_cube_state(SOLVED_CUBE_STATE)
+
+# Color codes of the faces that corners and edges are oriented against
+U_CODE, D_CODE = FACELET_FACES[4], FACELET_FACES[22]
+
+# Faces of the 8 corners, in the CubeLookup state order, starting with the U or D face
+# and going clockwise: URF, UFL, ULB, UBR, DFR, DLF, DBL, DRB
+CORNER_FACELETS = np.array(
+    [
+        [8, 36, 11],
+        [6, 9, 29],
+        [0, 27, 47],
+        [2, 45, 38],
+        [20, 17, 42],
+        [18, 35, 15],
+        [24, 53, 33],
+        [26, 44, 51],
+    ]
+)
+
+# Faces of the 12 edges, in the CubeLookup state order:
+# UR, UF, UL, UB, DR, DF, DL, DB, FR, FL, BL, BR
+EDGE_FACELETS = np.array(
+    [
+        [5, 37],
+        [7, 10],
+        [3, 28],
+        [1, 46],
+        [23, 43],
+        [19, 16],
+        [21, 34],
+        [25, 52],
+        [14, 39],
+        [12, 32],
+        [50, 30],
+        [48, 41],
+    ]
+)
+
+CORNER_COLORS = FACELET_FACES[CORNER_FACELETS]
+EDGE_COLORS = FACELET_FACES[EDGE_FACELETS]
+
+# Edges FR, FL, BL and BR, the edges of the slice between U and D
+UD_SLICE_EDGES = np.array([8, 9, 10, 11])
+
+N_MOVES = 12
+N_CORNER_ORIENTATION = 3**7
+N_EDGE_ORIENTATION = 2**11
+N_CORNER_PERMUTATION = 40320
+N_EDGE_PERMUTATION = 479001600
+N_UD_SLICE = 495
+
+# UD slice coordinate of each 12 bit mask of the positions of the slice edges,
+# ordered so that the solved cube, slice edges in positions 8 to 11, is 0
+_UD_SLICE_MASKS = np.array(
+    [sum(1 << i for i in positions) for positions in combinations(range(11, -1, -1), 4)]
+)
+_MASK_TO_UD_SLICE = np.full(1 << 12, -1, dtype=np.int16)
+_MASK_TO_UD_SLICE[_UD_SLICE_MASKS] = np.arange(N_UD_SLICE)
+
+
+def facelets_to_cubies(cube_codes):
+    """
+    Converts the 54 faces of a cube into its corners and edges.
+
+    Orientations follow the usual convention: a corner is twisted by the index
+    of its U or D face in CORNER_FACELETS, and an edge is flipped if its first
+    face is not on the first face of the position.
+
+    Parameters
+    ----------
+    cube_codes : array of uint8
+        The 54 color codes of the cube, as in CubeLookup.get_cube_codes.
+
+    Returns
+    -------
+    cubies : tuple of arrays
+        Corner permutation, corner orientation, edge permutation, edge orientation.
+        Piece cp[i] is in position i, twisted by co[i], and similarly for edges.
+    """
+
+    cube_codes = np.asarray(cube_codes)
+
+    corner_colors = cube_codes[CORNER_FACELETS]
+    is_up_down = (corner_colors == U_CODE) | (corner_colors == D_CODE)
+    if not np.all(np.sum(is_up_down, axis=1) == 1):
+        raise ValueError("Not a valid cube state, corner without U or D face")
+    corner_orientation = np.argmax(is_up_down, axis=1)
+
+    twisted_colors = np.take_along_axis(
+        corner_colors, (corner_orientation[:, None] + np.arange(3)) % 3, axis=1
+    )
+    corner_matches = np.all(twisted_colors[:, None, :] == CORNER_COLORS, axis=2)
+
+    edge_colors = cube_codes[EDGE_FACELETS]
+    edge_matches = np.all(edge_colors[:, None, :] == EDGE_COLORS, axis=2)
+    flipped_matches = np.all(edge_colors[:, None, ::-1] == EDGE_COLORS, axis=2)
+    edge_orientation = np.any(flipped_matches, axis=1).astype(np.int64)
+
+    corner_permutation = np.argmax(corner_matches, axis=1)
+    edge_permutation = np.argmax(edge_matches | flipped_matches, axis=1)
+    if (
+        not np.all(np.any(corner_matches, axis=1))
+        or not np.all(np.any(edge_matches | flipped_matches, axis=1))
+        or len(np.unique(corner_permutation)) != 8
+        or len(np.unique(edge_permutation)) != 12
+    ):
+        raise ValueError("Not a valid cube state, pieces are missing")
+
+    return corner_permutation, corner_orientation, edge_permutation, edge_orientation
+
+
+def is_solvable(
+    corner_permutation, corner_orientation, edge_permutation, edge_orientation
+):
+    """
+    Checks whether the corners and edges can be reached from the solved cube by moves:
+    the corner twists add up to 0 modulo 3, the edge flips to 0 modulo 2,
+    and the corner and edge permutations have the same parity.
+
+    Parameters
+    ----------
+    corner_permutation, corner_orientation : arrays of 8 ints
+    edge_permutation, edge_orientation : arrays of 12 ints
+
+    Returns
+    -------
+    solvable : bool
+    """
+
+    def parity(permutation):
+        permutation = np.asarray(permutation)
+        n_inversions = np.sum(np.triu(permutation[:, None] > permutation[None, :]))
+        return n_inversions % 2
+
+    return bool(
+        np.sum(corner_orientation) % 3 == 0
+        and np.sum(edge_orientation) % 2 == 0
+        and parity(corner_permutation) == parity(edge_permutation)
+    )
+
+
+def cubies_to_facelets(
+    corner_permutation, corner_orientation, edge_permutation, edge_orientation
+):
+    """
+    Converts the corners and edges of a cube into its 54 faces,
+    the inverse of facelets_to_cubies.
+
+    Parameters
+    ----------
+    corner_permutation, corner_orientation : arrays of 8 ints
+    edge_permutation, edge_orientation : arrays of 12 ints
+
+    Returns
+    -------
+    cube_codes : array of uint8
+        The 54 color codes of the cube, as in CubeLookup.get_cube_codes.
+    """
+
+    cube_codes = FACELET_FACES.copy()
+
+    corner_faces = np.take_along_axis(
+        CORNER_FACELETS,
+        (np.asarray(corner_orientation)[:, None] + np.arange(3)) % 3,
+        axis=1,
+    )
+    cube_codes[corner_faces] = CORNER_COLORS[corner_permutation]
+
+    edge_faces = np.take_along_axis(
+        EDGE_FACELETS,
+        (np.asarray(edge_orientation)[:, None] + np.arange(2)) % 2,
+        axis=1,
+    )
+    cube_codes[edge_faces] = EDGE_COLORS[edge_permutation]
+
+    return cube_codes
+
+
+def permutation_index(permutation):
+    """
+    Ranks permutations in lexicographic order, the order of itertools.permutations.
+    Vectorized over all but the last axis.
+
+    Parameters
+    ----------
+    permutation : array of ints
+        Permutations of range(n) along the last axis.
+
+    Returns
+    -------
+    index : int or array of ints
+        Rank of each permutation, from 0 to n! - 1.
+    """
+
+    permutation = np.asarray(permutation)
+    n_elements = permutation.shape[-1]
+
+    index = np.zeros(permutation.shape[:-1], dtype=np.int64)
+    for i in range(n_elements - 1):
+        n_smaller = np.sum(permutation[..., i + 1 :] < permutation[..., i : i + 1], -1)
+        index = index * (n_elements - i) + n_smaller
+    return index
+
+
+def permutation_from_index(index, n_elements):
+    """
+    Unranks permutations, the inverse of permutation_index.
+
+    Parameters
+    ----------
+    index : int or array of ints
+        Rank of each permutation.
+    n_elements : int
+        Number of elements permuted.
+
+    Returns
+    -------
+    permutation : array of ints
+        Permutations of range(n_elements) along the last axis.
+    """
+
+    index = np.array(index, dtype=np.int64)
+    permutation = np.zeros(index.shape + (n_elements,), dtype=np.int64)
+    for i in range(n_elements - 2, -1, -1):
+        digit = index % (n_elements - i)
+        index = index // (n_elements - i)
+        permutation[..., i] = digit
+        permutation[..., i + 1 :] += permutation[..., i + 1 :] >= digit[..., None]
+    return permutation
+
+
+def orientation_index(orientation, n_orientations):
+    """
+    Encodes orientations as an integer, in base n_orientations
+    without the last piece, whose orientation follows from the others.
+
+    Parameters
+    ----------
+    orientation : array of ints
+        Orientation of each piece along the last axis.
+    n_orientations : int
+        3 for corners, 2 for edges.
+
+    Returns
+    -------
+    index : int or array of ints
+    """
+
+    orientation = np.asarray(orientation)
+    powers = n_orientations ** np.arange(orientation.shape[-1] - 2, -1, -1)
+    return orientation[..., :-1] @ powers
+
+
+def orientation_from_index(index, n_orientations, n_pieces):
+    """
+    Decodes orientations, the inverse of orientation_index.
+
+    Parameters
+    ----------
+    index : int or array of ints
+    n_orientations : int
+        3 for corners, 2 for edges.
+    n_pieces : int
+        8 for corners, 12 for edges.
+
+    Returns
+    -------
+    orientation : array of ints
+        Orientation of each piece along the last axis.
+    """
+
+    index = np.array(index, dtype=np.int64)
+    orientation = np.zeros(index.shape + (n_pieces,), dtype=np.int64)
+    for i in range(n_pieces - 2, -1, -1):
+        orientation[..., i] = index % n_orientations
+        index = index // n_orientations
+    orientation[..., -1] = -np.sum(orientation[..., :-1], axis=-1) % n_orientations
+    return orientation
+
+
+def ud_slice_index(edge_permutation):
+    """
+    Encodes which positions hold the 4 edges of the UD slice, ignoring their order.
+
+    Parameters
+    ----------
+    edge_permutation : array of ints
+        Edge permutations along the last axis.
+
+    Returns
+    -------
+    index : int or array of ints
+        From 0, the slice edges in the slice, to N_UD_SLICE - 1.
+    """
+
+    in_slice = np.asarray(edge_permutation) >= UD_SLICE_EDGES[0]
+    return _MASK_TO_UD_SLICE[in_slice @ (1 << np.arange(12))]
+
+
+@lru_cache(maxsize=None)
+def get_cubie_moves():
+    """
+    Returns the moves at the level of corners and edges, derived from the
+    CubeLookup move table. Applying move m to (cp, co, ep, eo) gives
+    (cp[cp_m], (co[cp_m] + co_m) % 3, ep[ep_m], (eo[ep_m] + eo_m) % 2).
+
+    Returns
+    -------
+    cubie_moves : list of tuples of arrays
+        The (cp_m, co_m, ep_m, eo_m) of each of the 12 fundamental moves.
+    """
+
+    move_array = load_move_array()
+    return [
+        tuple(
+            np.asarray(cubies)
+            for cubies in facelets_to_cubies(FACELET_FACES[move_array[move_command]])
+        )
+        for move_command in range(N_MOVES)
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_move_tables():
+    """
+    Returns the move tables of the coordinates, built on first use.
+    table[coordinate, move] is the coordinate after the move.
+
+    The edge permutation has no move table, with 12! values it would not fit
+    in memory. It is moved at the level of the edges instead.
+
+    Returns
+    -------
+    move_tables : dict of 2D arrays of uint16
+        Keys corner_orientation, edge_orientation, corner_permutation and ud_slice.
+    """
+
+    cubie_moves = get_cubie_moves()
+
+    corner_orientations = orientation_from_index(np.arange(N_CORNER_ORIENTATION), 3, 8)
+    edge_orientations = orientation_from_index(np.arange(N_EDGE_ORIENTATION), 2, 12)
+    corner_permutations = permutation_from_index(np.arange(N_CORNER_PERMUTATION), 8)
+    ud_slice_permutations = np.zeros((N_UD_SLICE, 12), dtype=np.int64)
+    for i_slice, mask in enumerate(_UD_SLICE_MASKS):
+        ud_slice_permutations[i_slice, (mask >> np.arange(12)) & 1 == 1] = 8
+
+    move_tables = {
+        "corner_orientation": np.empty((N_CORNER_ORIENTATION, N_MOVES), np.uint16),
+        "edge_orientation": np.empty((N_EDGE_ORIENTATION, N_MOVES), np.uint16),
+        "corner_permutation": np.empty((N_CORNER_PERMUTATION, N_MOVES), np.uint16),
+        "ud_slice": np.empty((N_UD_SLICE, N_MOVES), np.uint16),
+    }
+
+    for move_command, (cp_m, co_m, ep_m, eo_m) in enumerate(cubie_moves):
+        move_tables["corner_orientation"][:, move_command] = orientation_index(
+            (corner_orientations[:, cp_m] + co_m) % 3, 3
+        )
+        move_tables["edge_orientation"][:, move_command] = orientation_index(
+            (edge_orientations[:, ep_m] + eo_m) % 2, 2
+        )
+        move_tables["corner_permutation"][:, move_command] = permutation_index(
+            corner_permutations[:, cp_m]
+        )
+        move_tables["ud_slice"][:, move_command] = ud_slice_index(
+            ud_slice_permutations[:, ep_m]
+        )
+
+    for move_table in move_tables.values():
+        move_table.flags.writeable = False
+
+    return move_tables
+
+
+class CubeCoordinates:
+    """
+    Representation of a Rubik's Cube as integer coordinates
+    of the permutation and orientation of its corners and edges,
+    instead of the colors of its 54 faces.
+
+    Moves use the precomputed move tables of get_move_tables, so a move is
+    a handful of table lookups. Converts from and to the CubeLookup state order.
+
+    Attributes
+    ----------
+    corner_permutation : int
+        Rank of the permutation of the 8 corners, from 0 to 8! - 1.
+    corner_orientation : int
+        Twist of the corners, from 0 to 3^7 - 1.
+    edge_permutation : int
+        Rank of the permutation of the 12 edges, from 0 to 12! - 1.
+    edge_orientation : int
+        Flip of the edges, from 0 to 2^11 - 1.
+    ud_slice : int
+        Positions of the edges of the UD slice, from 0 to 494,
+        follows from edge_permutation.
+    """
+
+    def __init__(self, cube_state=None):
+        """
+        The constructor for the CubeCoordinates class.
+
+        Parameters
+        ----------
+        cube_state : str or array of uint8
+            Load the cube from a 54 character long string, or its color codes,
+            in the CubeLookup state order. Default of None loads the solved cube.
+        """
+
+        self.move_tables = get_move_tables()
+        self._edge_moves = [cubie_move[2] for cubie_move in get_cubie_moves()]
+
+        # Set from cube_state below, see set_cubies
+        self.corner_permutation = 0
+        self.corner_orientation = 0
+        self.edge_permutation = 0
+        self.edge_orientation = 0
+        self.ud_slice = 0
+
+        if cube_state is None:
+            cube_state = SOLVED_CUBE_STATE
+        self.set_cube_state(cube_state)
+
+    def set_cube_state(self, cube_state):
+        """
+        Sets the coordinates from the faces of the cube.
+
+        Parameters
+        ----------
+        cube_state : str or array of uint8
+            54 character long string, or the color codes, of the faces.
+        """
+
+        if isinstance(cube_state, str):
+            cube_state = encode_cube_state(cube_state)
+        if len(cube_state) != 54:
+            raise ValueError(
+                "Cube state must be a 54-long list of chars or string of colors"
+            )
+
+        self.set_cubies(*facelets_to_cubies(cube_state))
+
+    def get_cube_state(self):
+        """
+        Returns the faces of the cube as a 54 character long string.
+
+        Returns
+        -------
+        cube_state : str
+            String of 54 characters for color of different faces.
+        """
+
+        return decode_cube_state(self.get_cube_codes())
+
+    def get_cube_codes(self):
+        """
+        Returns the faces of the cube as color codes.
+
+        Returns
+        -------
+        cube_codes : array of uint8
+            Array of 54 codes, as in CubeLookup.get_cube_codes.
+        """
+
+        return cubies_to_facelets(*self.get_cubies())
+
+    def set_cubies(
+        self, corner_permutation, corner_orientation, edge_permutation, edge_orientation
+    ):
+        """
+        Sets the coordinates from the permutation and orientation arrays
+        of the corners and edges, as returned by facelets_to_cubies.
+        """
+
+        self.corner_permutation = int(permutation_index(corner_permutation))
+        self.corner_orientation = int(orientation_index(corner_orientation, 3))
+        self.edge_permutation = int(permutation_index(edge_permutation))
+        self.edge_orientation = int(orientation_index(edge_orientation, 2))
+        self.ud_slice = int(ud_slice_index(edge_permutation))
+
+    def get_cubies(self):
+        """
+        Returns the permutation and orientation arrays of the corners and edges.
+
+        Returns
+        -------
+        cubies : tuple of arrays
+            Corner permutation, corner orientation, edge permutation, edge orientation.
+        """
+
+        return (
+            permutation_from_index(self.corner_permutation, 8),
+            orientation_from_index(self.corner_orientation, 3, 8),
+            permutation_from_index(self.edge_permutation, 12),
+            orientation_from_index(self.edge_orientation, 2, 12),
+        )
+
+    def get_coordinates(self):
+        """
+        Returns the coordinates of the cube, compact and hashable.
+
+        Returns
+        -------
+        coordinates : tuple of ints
+            Corner permutation, corner orientation, edge permutation, edge orientation.
+        """
+
+        return (
+            self.corner_permutation,
+            self.corner_orientation,
+            self.edge_permutation,
+            self.edge_orientation,
+        )
+
+    def move_decoder(self, move_command):
+        """
+        Executes moves, following the same integers as CubeLookup.move_decoder:
+        U:0, F:1, D:2, L:3, R:4, B:5, U':6, F':7, D':8, L':9, R':10, B':11
+
+        Parameters
+        ----------
+        move_command : int or list of ints
+            Move command, or commands, to perform.
+        """
+
+        if isinstance(move_command, (list, np.ndarray)):
+            for move_command_ in move_command:
+                self.move_decoder(move_command_)
+            return
+
+        if not isinstance(move_command, (int, np.integer)):
+            raise ValueError("Move command should be a int")
+
+        if move_command < 0 or move_command >= N_MOVES:
+            raise ValueError(f"Not a valid move_command: {move_command}")
+
+        self._fundamental_move(move_command)
+
+    def _fundamental_move(self, move_command):
+        """
+        Executes one of the 12 fundamental moves, without checks.
+
+        Parameters
+        ----------
+        move_command : int
+            Move command to perform.
+        """
+
+        self.corner_permutation = int(
+            self.move_tables["corner_permutation"][
+                self.corner_permutation, move_command
+            ]
+        )
+        self.corner_orientation = int(
+            self.move_tables["corner_orientation"][
+                self.corner_orientation, move_command
+            ]
+        )
+        self.edge_orientation = int(
+            self.move_tables["edge_orientation"][self.edge_orientation, move_command]
+        )
+        self.ud_slice = int(self.move_tables["ud_slice"][self.ud_slice, move_command])
+
+        edge_permutation = permutation_from_index(self.edge_permutation, 12)
+        self.edge_permutation = int(
+            permutation_index(edge_permutation[self._edge_moves[move_command]])
+        )
+
+    def randomize(self, n_moves=None):
+        """
+        Randomizes the cube by applying n_moves random moves.
+
+        Parameters
+        ----------
+        n_moves : int
+            Number of random moves to move.
+            Default of None randomly selects an number from 1 to 30.
+
+        Returns
+        -------
+        mc_moves : array of ints
+            The random moves applied.
+        """
+
+        if n_moves is None:
+            n_moves = np.random.randint(1, 30)
+        mc_moves = np.random.randint(0, N_MOVES, n_moves)
+        self.move_decoder(mc_moves)
+        return mc_moves
+
+    def check_solved(self):
+        """
+        Checks whether the cube is solved, all coordinates at 0.
+
+        Returns
+        -------
+        solved : bool
+            Boolean of whether or not the cube is solved.
+        """
+
+        return self.get_coordinates() == (0, 0, 0, 0)
@@ -1,10 +1,183 @@
 """ Module that defines the Cube class based on look up tables """
 
 import os.path
+from functools import lru_cache
 from itertools import product
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
+
+from PyBiksCube.utilities import (
+    COLOR_PALETTE,
+    BLANK_CODE,
+    MOVE_NAMES,
+    encode_cube_state,
+    decode_cube_state,
+    decode_cube_colors,
+    pack_cube_codes,
+)
+from PyBiksCube.stage_index import MaskedKey
+
+SOLVED_CUBE_STATE = "rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww"
+_SOLVED_CUBE_CODES = encode_cube_state(SOLVED_CUBE_STATE)
+
+
+DEFAULT_LOOKUP_TABLE_FILE_NAME = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), "data/default_cube_lookup_table.npy"
+)
+
+# Move tables already loaded, by file name, shared read-only by every cube
+_move_arrays = {}
+
+
+def load_move_array(lookup_table_file_name=None):
+    """
+    Loads the lookup table used for moves.
+    Each file is only read once per process, every later call
+    returns the same read-only array.
+
+    Parameters
+    ----------
+    lookup_table_file_name : str
+        Location of the lookup table used for moves, either a binary .npy file
+        or a text file of comma separated integers.
+        Default of None loads data/default_cube_lookup_table.npy,
+        creating it if it does not exist yet, or if it was created by an older
+        version, with only the quarter turns.
+
+    Returns
+    -------
+    move_array : 2D array of ints
+        Used to convert moves to indices of a cube state, one row per move
+        of utilities.MOVE_NAMES. Read-only.
+    """
+
+    if lookup_table_file_name is None:
+        lookup_table_file_name = DEFAULT_LOOKUP_TABLE_FILE_NAME
+
+    move_array = _move_arrays.get(lookup_table_file_name)
+    if move_array is not None:
+        return move_array
+
+    if lookup_table_file_name == DEFAULT_LOOKUP_TABLE_FILE_NAME:
+        # Check if the default file exists and has every move. If not, create it.
+        if not os.path.isfile(lookup_table_file_name) or len(
+            np.load(lookup_table_file_name, mmap_mode="r")
+        ) < len(MOVE_NAMES):
+            _create_default_lookup_table(lookup_table_file_name)
+    else:
+        # Check if the selected file exists. If not, throw error.
+        if not os.path.isfile(lookup_table_file_name):
+            raise ValueError(f"Filename given did not open: {lookup_table_file_name}")
+
+    try:
+        if lookup_table_file_name.endswith(".npy"):
+            move_array = np.load(lookup_table_file_name).astype(np.int16, copy=False)
+        else:
+            move_array = np.loadtxt(
+                lookup_table_file_name, delimiter=",", dtype=np.int16
+            )
+    except:
+        raise ValueError("Something wrong happened with opening the lookup table.")
+
+    move_array.flags.writeable = False
+    _move_arrays[lookup_table_file_name] = move_array
+    return move_array
+
+
+def _create_default_lookup_table(lookup_table_file_name):
+    """Creates the default lookup table."""
+
+    # It is not typical to import functions mid-code.
+    # However, this is only used if the default table doesn't already exist
+    # and importing here solves a cyclical import error.
+    from PyBiksCube.create_lookup_table import create_lookup_table
+
+    create_lookup_table(lookup_table_file_name)
+
+
+class MovePermutationCache:
+    """
+    Compiles sequences of moves into a single permutation of the 54 faces,
+    the composition of the rows of a move_array, and caches them.
+
+    Applying a compiled sequence to a cube state is then one gather,
+    cube_state[permutation], no matter how many moves are in the sequence.
+    Cache is least recently used, keyed by the tuple of moves.
+
+    Attributes
+    ----------
+    move_array : 2D array of ints, used to convert moves to indices of cube_state
+    """
+
+    def __init__(self, move_array, maxsize=4096):
+        """
+        The constructor for the MovePermutationCache class.
+
+        Parameters
+        ----------
+        move_array : 2D array of ints
+            The lookup table of the moves.
+        maxsize : int
+            Maximum number of compiled sequences kept.
+        """
+
+        self.move_array = move_array
+        self._compile_cached = lru_cache(maxsize=maxsize)(self._compile_uncached)
+
+    def compile(self, move_sequence):
+        """
+        Returns the permutation of the move sequence, compiling it if not cached.
+
+        Parameters
+        ----------
+        move_sequence : list or array of ints
+            Moves to compile, following the CubeLookup move integers.
+
+        Returns
+        -------
+        permutation : array of ints
+            54 indices, so that cube_state[permutation] applies every move in order.
+            Shared by the cache, so read-only.
+        """
+
+        return self._compile_cached(tuple(np.asarray(move_sequence).tolist()))
+
+    def _compile_uncached(self, move_tuple):
+        """Composes the rows of move_array for the tuple of moves."""
+
+        permutation = np.arange(54, dtype=np.intp)
+        for move_command in move_tuple:
+            permutation = permutation[self.move_array[move_command]]
+        permutation.flags.writeable = False
+        return permutation
+
+
+# One cache per move table, shared by every cube using the same table
+_move_permutation_caches = {}
+
+
+def get_move_permutation_cache(move_array):
+    """
+    Returns the MovePermutationCache shared by all cubes using this move table.
+
+    The caches are keyed by the identity of the array, which load_move_array
+    shares between every cube loading the same file, so finding the cache
+    does not read the table. The cache keeps its array alive,
+    so the identity is never reused by another array.
+
+    Parameters
+    ----------
+    move_array : 2D array of ints
+        The lookup table of the moves.
+
+    Returns
+    -------
+    cache : MovePermutationCache
+    """
+
+    table_key = id(move_array)
+    if table_key not in _move_permutation_caches:
+        _move_permutation_caches[table_key] = MovePermutationCache(move_array)
+    return _move_permutation_caches[table_key]
 
 
 class CubeLookup:
@@ -21,10 +194,15 @@ class CubeLookup:
     Class is optimized for speed, so does not sanitize inputs
     and is missing some helpful things like automatically converts moves to indices.
 
+    Internally, each face color is stored as a uint8 code, its index in
+    utilities.COLOR_PALETTE. Colors are only converted to and from
+    characters when loading or unloading the cube state.
+
     Attributes
     ----------
-    cube_state : array of strings, 54 entries for each face on cube
+    cube_state : array of uint8, 54 entries for the color code of each face on cube
     move_array : 2D array of ints, used to convert moves to indices of cube_state
+    permutation_cache : MovePermutationCache, compiled move sequences for move_array
     """
 
     def __init__(self, lookup_table_file_name=None, cube_state=None):
@@ -40,40 +218,15 @@ class CubeLookup:
             Default of None loads the solved cube.
         """
 
-        self.cube_state = np.empty(54, dtype=str)
+        self.cube_state = np.empty(54, dtype=np.uint8)
 
         if cube_state is None:
             self.set_default_cube_state()
         else:
             self.set_cube_state(cube_state)
 
-        if lookup_table_file_name is None:
-            lookup_table_file_name = os.path.join(
-                os.path.dirname(os.path.realpath(__file__)),
-                "data/default_cube_lookup_table.txt",
-            )
-
-            # Check if the default file exists. If not, create it.
-            if not os.path.isfile(lookup_table_file_name):
-                # It is not typical to import functions mid-code.
-                # However, this is only used if the default table doesn't already exist
-                # and importing here solves a cyclical import error.
-                from PyBiksCube.create_lookup_table import create_lookup_table
-
-                create_lookup_table(lookup_table_file_name)
-        else:
-            # Check if the selected file exists. If not, throw error.
-            if not os.path.isfile(lookup_table_file_name):
-                raise ValueError(
-                    f"Filename given did not open: {lookup_table_file_name}"
-                )
-
-        try:
-            self.move_array = np.loadtxt(
-                lookup_table_file_name, delimiter=",", dtype=np.int16
-            )
-        except:
-            raise ValueError("Something wrong happened with opening the lookup table.")
+        self.move_array = load_move_array(lookup_table_file_name)
+        self.permutation_cache = get_move_permutation_cache(self.move_array)
 
     def set_cube_state(self, cube_state_):
         """
@@ -82,12 +235,16 @@ class CubeLookup:
 
         Parameters
         ----------
-        cube_state : str
+        cube_state : str or bytes
             String of 54 characters for color of different faces.
             Order matches self.cube_state_map
+            Can also be the 54 bytes from get_compact_cube_state.
         """
 
-        self.cube_state = np.array(list(cube_state_), dtype=str)
+        if isinstance(cube_state_, (bytes, bytearray)):
+            self.cube_state = np.frombuffer(cube_state_, dtype=np.uint8).copy()
+        else:
+            self.cube_state = encode_cube_state(cube_state_)
 
     def get_cube_state(self):
         """
@@ -100,7 +257,7 @@ class CubeLookup:
             Order matches self.cube_state_map.
         """
 
-        return "".join(self.cube_state)
+        return decode_cube_state(self.cube_state)
 
     def get_raw_cube_state(self):
         """
@@ -113,8 +270,46 @@ class CubeLookup:
             Order matches self.cube_state_map.
         """
 
+        return decode_cube_colors(self.cube_state)
+
+    def get_cube_codes(self):
+        """
+        Returns the uint8 color codes of the cube faces.
+
+        Returns
+        -------
+        cube_codes : array of uint8
+            Array of 54 codes, the index of each face color in COLOR_PALETTE.
+        """
+
         return self.cube_state
 
+    def get_compact_cube_state(self):
+        """
+        Returns the cube state as 54 bytes, one color code per face.
+        Cheap to hash and store, and can be loaded back with set_cube_state.
+
+        Returns
+        -------
+        cube_state : bytes
+            Bytes of the color code of each face.
+        """
+
+        return self.cube_state.tobytes()
+
+    def get_packed_cube_state(self):
+        """
+        Returns the cube state packed into one integer, one byte per face,
+        for matching MaskedKey keys with integer operations.
+
+        Returns
+        -------
+        packed_state : int
+            The packed cube state, see utilities.pack_cube_codes.
+        """
+
+        return pack_cube_codes(self.cube_state)
+
     def move_decoder(self, move_command):
         """
         Decodes move command, decomposing more complicated moves
@@ -124,6 +319,9 @@ class CubeLookup:
         The notation must be the corresponding integer for each move.
         The mapping, as defined in create_lookup_table, is:
         U:0, F:1, D:2, L:3, R:4, B:5, U':6, F':7, D':8, L':9, R':10, B':11
+        followed by the half turns, slice moves, wide moves and rotations,
+        the index of each move in utilities.MOVE_NAMES.
+        Each move is one row of the lookup table, applied in a single gather.
 
         Parameters
         ----------
@@ -139,7 +337,7 @@ class CubeLookup:
         if not isinstance(move_command, (int, np.int16)):
             raise ValueError("Move command should be a int")
 
-        if move_command < 0 or move_command >= 12:
+        if move_command < 0 or move_command >= len(self.move_array):
             raise ValueError(f"Not a valid move_command: {move_command}")
 
         self._fundamental_move(move_command)
@@ -161,6 +359,50 @@ class CubeLookup:
 
         self.cube_state = self.cube_state[self.move_array[move_command]]
 
+    def compile_moves(self, move_sequence):
+        """
+        Compiles a sequence of moves into a single permutation of the faces.
+        Compiled sequences are cached, see MovePermutationCache.
+
+        Parameters
+        ----------
+        move_sequence : list or array of ints
+            Moves to compile, following the same integers as move_decoder.
+
+        Returns
+        -------
+        permutation : array of ints
+            54 indices, for apply_permutation.
+        """
+
+        return self.permutation_cache.compile(move_sequence)
+
+    def apply_permutation(self, permutation):
+        """
+        Applies a permutation of the faces, as from compile_moves, in one gather.
+
+        Parameters
+        ----------
+        permutation : array of ints
+            54 indices of the faces.
+        """
+
+        self.cube_state = self.cube_state[permutation]
+
+    def apply_moves(self, move_sequence):
+        """
+        Applies a sequence of moves in one gather, using the compiled and cached
+        permutation of the whole sequence. Same result as move_decoder,
+        without the per move checks.
+
+        Parameters
+        ----------
+        move_sequence : list or array of ints
+            Moves to perform, following the same integers as move_decoder.
+        """
+
+        self.cube_state = self.cube_state[self.permutation_cache.compile(move_sequence)]
+
     def randomize(self, n_moves=None):
         """
         Randomizes the cube state by applying
@@ -185,7 +427,7 @@ class CubeLookup:
         The red face on top and yellow face on front.
         """
 
-        self.set_cube_state("rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww")
+        self.cube_state = _SOLVED_CUBE_CODES.copy()
 
     def check_solved(self):
         """
@@ -199,10 +441,7 @@ class CubeLookup:
             Boolean of whether or not the cube is solved.
         """
 
-        return (
-            self.get_cube_state()
-            == "rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww"
-        )
+        return np.array_equal(self.cube_state, _SOLVED_CUBE_CODES)
 
     def check_match_against_key(self, key):
         """
@@ -215,20 +454,22 @@ class CubeLookup:
 
         Parameters
         ----------
-        key : array of str
-            Array of strings, length of 54, corresponding to the faces of the cube.
+        key : str, array of str or MaskedKey
+            String or array of strings, length of 54, corresponding to the faces of the cube.
+            Or the key already compiled as a MaskedKey, matched without building arrays.
 
         Returns
         -------
         match : bool
             Boolean of whether or not the key matches the cube.
         """
-        converted_key = np.array(list(key), dtype=str)
-        count_matches = np.sum(
-            np.logical_and(converted_key == self.cube_state, converted_key != "k")
+        if isinstance(key, MaskedKey):
+            return key.matches(self.get_packed_cube_state())
+
+        converted_key = encode_cube_state(key)
+        return bool(
+            np.all((converted_key == self.cube_state) | (converted_key == BLANK_CODE))
         )
-        counts_expected = np.sum(converted_key != "k")
-        return count_matches == counts_expected
 
     def plot(self):
         """
@@ -237,13 +478,21 @@ class CubeLookup:
         Great for debugging.
         """
 
+        # Imported here so that only plotting needs matplotlib
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Rectangle
+
         _, ax = plt.subplots(figsize=(12, 9))
 
         for i, (y_pos, x_pos) in enumerate(product(range(3), repeat=2)):
             i += 9 * 0
             y_pos = 5 - y_pos
             rect = Rectangle(
-                (x_pos, y_pos), 1, 1, edgecolor="black", facecolor=self.cube_state[i]
+                (x_pos, y_pos),
+                1,
+                1,
+                edgecolor="black",
+                facecolor=COLOR_PALETTE[self.cube_state[i]],
             )
             ax.add_patch(rect)
             ax.text(x_pos + 0.1, y_pos + 0.1, i)
@@ -252,7 +501,11 @@ class CubeLookup:
             i += 9 * 1
             y_pos = 2 - y_pos
             rect = Rectangle(
-                (x_pos, y_pos), 1, 1, edgecolor="black", facecolor=self.cube_state[i]
+                (x_pos, y_pos),
+                1,
+                1,
+                edgecolor="black",
+                facecolor=COLOR_PALETTE[self.cube_state[i]],
             )
             ax.add_patch(rect)
             ax.text(x_pos + 0.1, y_pos + 0.1, i)
@@ -261,7 +514,11 @@ class CubeLookup:
             i += 9 * 2
             y_pos = -1 - y_pos
             rect = Rectangle(
-                (x_pos, y_pos), 1, 1, edgecolor="black", facecolor=self.cube_state[i]
+                (x_pos, y_pos),
+                1,
+                1,
+                edgecolor="black",
+                facecolor=COLOR_PALETTE[self.cube_state[i]],
             )
             ax.add_patch(rect)
             ax.text(x_pos + 0.1, y_pos + 0.1, i)
@@ -271,7 +528,11 @@ class CubeLookup:
             x_pos = x_pos - 3
             y_pos = 2 - y_pos
             rect = Rectangle(
-                (x_pos, y_pos), 1, 1, edgecolor="black", facecolor=self.cube_state[i]
+                (x_pos, y_pos),
+                1,
+                1,
+                edgecolor="black",
+                facecolor=COLOR_PALETTE[self.cube_state[i]],
             )
             ax.add_patch(rect)
             ax.text(x_pos + 0.1, y_pos + 0.1, i)
@@ -281,7 +542,11 @@ class CubeLookup:
             x_pos = x_pos + 3
             y_pos = 2 - y_pos
             rect = Rectangle(
-                (x_pos, y_pos), 1, 1, edgecolor="black", facecolor=self.cube_state[i]
+                (x_pos, y_pos),
+                1,
+                1,
+                edgecolor="black",
+                facecolor=COLOR_PALETTE[self.cube_state[i]],
             )
             ax.add_patch(rect)
             ax.text(x_pos + 0.1, y_pos + 0.1, i)
@@ -291,7 +556,11 @@ class CubeLookup:
             x_pos = x_pos + 6
             y_pos = 2 - y_pos
             rect = Rectangle(
-                (x_pos, y_pos), 1, 1, edgecolor="black", facecolor=self.cube_state[i]
+                (x_pos, y_pos),
+                1,
+                1,
+                edgecolor="black",
+                facecolor=COLOR_PALETTE[self.cube_state[i]],
             )
             ax.add_patch(rect)
             ax.text(x_pos + 0.1, y_pos + 0.1, i)
@@ -0,0 +1,590 @@
+""" Module that defines the IDAStarSolver class, an optimal iterative deepening A* solver """
+
+import os.path
+import time
+import numpy as np
+
+from PyBiksCube.cube_array import FUNDAMENTAL_MOVES
+from PyBiksCube.cube_coordinates import (
+    get_move_tables,
+    get_cubie_moves,
+    facelets_to_cubies,
+    is_solvable,
+    permutation_index,
+    orientation_index,
+    N_MOVES,
+    N_CORNER_ORIENTATION,
+    N_CORNER_PERMUTATION,
+)
+from PyBiksCube.utilities import encode_cube_state
+
+# Groups of 4 edges with their own pattern database: U edges, D edges, slice edges
+EDGE_GROUPS = np.array([[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11]])
+
+# Positions of the 4 edges of a group, as a partial permutation of the 12 positions,
+# times the 2^4 orientations of the 4 edges
+N_EDGE_GROUP_POSITIONS = 12 * 11 * 10 * 9
+N_EDGE_GROUP = N_EDGE_GROUP_POSITIONS * 2**4
+
+N_CORNERS = N_CORNER_PERMUTATION * N_CORNER_ORIENTATION
+
+# Face of each move, following the CubeLookup move integers
+MOVE_FACES = [move % 6 for move in range(N_MOVES)]
+OPPOSITE_FACES = [2, 5, 0, 4, 3, 1]
+
+# Value of the unvisited entries while building a pattern database
+_UNVISITED = 15
+
+
+def pack_nibbles(distances):
+    """
+    Packs distances of at most 15 into 4 bits each, two per byte,
+    the even entries in the low bits.
+
+    Parameters
+    ----------
+    distances : array of uint8
+
+    Returns
+    -------
+    packed_distances : array of uint8
+        Half the length of distances, rounded up.
+    """
+
+    distances = np.asarray(distances, dtype=np.uint8)
+    if len(distances) % 2 == 1:
+        distances = np.append(distances, np.uint8(0))
+    return distances[0::2] | (distances[1::2] << 4)
+
+
+def unpack_nibbles(packed_distances):
+    """
+    Unpacks distances packed by pack_nibbles.
+
+    Parameters
+    ----------
+    packed_distances : array of uint8
+
+    Returns
+    -------
+    distances : array of uint8
+        Twice the length of packed_distances.
+    """
+
+    packed_distances = np.asarray(packed_distances, dtype=np.uint8)
+    distances = np.empty(2 * len(packed_distances), dtype=np.uint8)
+    distances[0::2] = packed_distances & 15
+    distances[1::2] = packed_distances >> 4
+    return distances
+
+
+def edge_group_index(positions, orientations):
+    """
+    Encodes the positions and orientations of the 4 edges of a group.
+    Vectorized over all but the last axis.
+
+    Parameters
+    ----------
+    positions : array of ints
+        Position of each edge of the group, from 0 to 11.
+    orientations : array of ints
+        Orientation of each edge of the group, 0 or 1.
+
+    Returns
+    -------
+    index : int or array of ints
+        From 0 to N_EDGE_GROUP - 1.
+    """
+
+    positions = np.asarray(positions)
+
+    # Rank of the partial permutation, each position counted among those left
+    index = np.zeros(positions.shape[:-1], dtype=np.int64)
+    for i in range(4):
+        n_smaller_before = np.sum(positions[..., :i] < positions[..., i : i + 1], -1)
+        index = index * (12 - i) + positions[..., i] - n_smaller_before
+
+    return index * 16 + np.asarray(orientations) @ (1 << np.arange(3, -1, -1))
+
+
+def edge_group_from_index(index):
+    """
+    Decodes the positions and orientations of the 4 edges of a group,
+    the inverse of edge_group_index.
+
+    Parameters
+    ----------
+    index : int or array of ints
+
+    Returns
+    -------
+    positions, orientations : arrays of ints
+        Along the last axis, 4 of each.
+    """
+
+    index = np.array(index, dtype=np.int64)
+    orientations = (index[..., None] >> np.arange(3, -1, -1)) & 1
+    index = index // 16
+
+    digits = np.zeros(index.shape + (4,), dtype=np.int64)
+    for i in range(3, -1, -1):
+        digits[..., i] = index % (12 - i)
+        index = index // (12 - i)
+
+    # Each digit counts the free positions below it, shift it past the taken ones
+    positions = digits.copy()
+    for i in range(1, 4):
+        taken_positions = np.sort(positions[..., :i], axis=-1)
+        for j in range(i):
+            positions[..., i] += positions[..., i] >= taken_positions[..., j]
+    return positions, orientations
+
+
+def _build_edge_group_move_table():
+    """
+    Builds the move table of the edge group coordinate, shared by the three groups:
+    table[index, move] is the index after the move.
+    """
+
+    positions, orientations = edge_group_from_index(np.arange(N_EDGE_GROUP))
+
+    move_table = np.empty((N_EDGE_GROUP, N_MOVES), dtype=np.int32)
+    for move_command, (_, _, edge_move, edge_orientation_move) in enumerate(
+        get_cubie_moves()
+    ):
+        # The edge in position p moves to the position q with edge_move[q] == p
+        inverse_edge_move = np.argsort(edge_move)
+        next_positions = inverse_edge_move[positions]
+        next_orientations = (orientations + edge_orientation_move[next_positions]) % 2
+        move_table[:, move_command] = edge_group_index(
+            next_positions, next_orientations
+        )
+    return move_table
+
+
+def _breadth_first_search(n_states, start_states, get_children, chunk_size=4000000):
+    """
+    Breadth-first search of the distance of every state to the start states,
+    for the pattern databases. Distances of 15 or more are stored as 15.
+    """
+
+    distances = np.full(n_states, _UNVISITED, dtype=np.uint8)
+    distances[start_states] = 0
+
+    depth = 0
+    while depth < _UNVISITED - 1:
+        frontier = np.flatnonzero(distances == depth)
+        if len(frontier) == 0:
+            break
+
+        depth += 1
+        for i_start in range(0, len(frontier), chunk_size):
+            for children in get_children(frontier[i_start : i_start + chunk_size]):
+                distances[children[distances[children] == _UNVISITED]] = depth
+
+    return distances
+
+
+def create_corner_pattern_database(output_file_name):
+    """
+    Creates the pattern database of the corners: the number of moves needed
+    to solve the permutation and orientation of all 8 corners, ignoring the edges,
+    for every one of their 8! * 3^7 states. Saved nibble packed, about 44 MB.
+
+    Parameters
+    ----------
+    output_file_name : str
+        File name where the database is saved, as a numpy .npy file.
+    """
+
+    move_tables = get_move_tables()
+    permutation_table = move_tables["corner_permutation"].astype(np.int64)
+    orientation_table = move_tables["corner_orientation"].astype(np.int64)
+
+    def get_children(states):
+        corner_permutations = states // N_CORNER_ORIENTATION
+        corner_orientations = states % N_CORNER_ORIENTATION
+        for move_command in range(N_MOVES):
+            yield (
+                permutation_table[corner_permutations, move_command]
+                * N_CORNER_ORIENTATION
+                + orientation_table[corner_orientations, move_command]
+            )
+
+    distances = _breadth_first_search(N_CORNERS, [0], get_children)
+    np.save(output_file_name, pack_nibbles(distances))
+
+
+def create_edge_pattern_database(output_file_name):
+    """
+    Creates the pattern databases of the edges: for each group of EDGE_GROUPS,
+    the number of moves needed to solve the positions and orientations of its
+    4 edges, ignoring the other pieces. Saved nibble packed, one row per group.
+
+    Parameters
+    ----------
+    output_file_name : str
+        File name where the database is saved, as a numpy .npy file.
+    """
+
+    move_table = _build_edge_group_move_table()
+
+    def get_children(states):
+        for move_command in range(N_MOVES):
+            yield move_table[states, move_command]
+
+    packed_distances = [
+        pack_nibbles(
+            _breadth_first_search(
+                N_EDGE_GROUP,
+                [edge_group_index(edge_group, np.zeros(4, dtype=np.int64))],
+                get_children,
+            )
+        )
+        for edge_group in EDGE_GROUPS
+    ]
+    np.save(output_file_name, np.stack(packed_distances))
+
+
+def _load_pattern_database(file_name, default_file_name, create_database):
+    """Loads a pattern database, creating the default one if it does not exist yet."""
+
+    if file_name is None:
+        file_name = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)), default_file_name
+        )
+
+        # Check if the default file exists. If not, create it.
+        if not os.path.isfile(file_name):
+            create_database(file_name)
+    else:
+        # Check if the selected file exists. If not, throw error.
+        if not os.path.isfile(file_name):
+            raise ValueError(f"Filename given did not open: {file_name}")
+
+    return np.load(file_name, allow_pickle=False)
+
+
+class _IDAStarSearch:
+    """State of one search of the IDAStarSolver, so searches share nothing."""
+
+    def __init__(self, solver, cube_codes, max_depth, timeout):
+        self.solver = solver
+        self.max_depth = max_depth
+        self.start_time = time.perf_counter()
+        self.deadline = None if timeout is None else self.start_time + timeout
+
+        (
+            corner_permutation,
+            corner_orientation,
+            edge_permutation,
+            edge_orientation,
+        ) = facelets_to_cubies(cube_codes)
+        if not is_solvable(
+            corner_permutation, corner_orientation, edge_permutation, edge_orientation
+        ):
+            raise ValueError("Not a solvable cube state, pieces are twisted or swapped")
+
+        self.corner_permutation = int(permutation_index(corner_permutation))
+        self.corner_orientation = int(orientation_index(corner_orientation, 3))
+
+        # Position of each edge, and its orientation
+        edge_positions = np.argsort(edge_permutation)
+        self.edge_groups = [
+            int(
+                edge_group_index(
+                    edge_positions[edge_group],
+                    edge_orientation[edge_positions[edge_group]],
+                )
+            )
+            for edge_group in EDGE_GROUPS
+        ]
+
+        self.path = []
+        self.nodes = 0
+        self.timed_out = False
+
+    def heuristic(
+        self,
+        corner_permutation,
+        corner_orientation,
+        edge_group_0,
+        edge_group_1,
+        edge_group_2,
+    ):
+        """Lower bound of the moves to solve, the largest of the pattern databases."""
+
+        solver = self.solver
+        corners = corner_permutation * N_CORNER_ORIENTATION + corner_orientation
+        return max(
+            (solver.corner_distances[corners >> 1] >> ((corners & 1) << 2)) & 15,
+            (solver.edge_distances[0][edge_group_0 >> 1] >> ((edge_group_0 & 1) << 2))
+            & 15,
+            (solver.edge_distances[1][edge_group_1 >> 1] >> ((edge_group_1 & 1) << 2))
+            & 15,
+            (solver.edge_distances[2][edge_group_2 >> 1] >> ((edge_group_2 & 1) << 2))
+            & 15,
+        )
+
+    def run(self):
+        """Runs the depth first searches with increasing depths."""
+
+        corners = [self.corner_permutation, self.corner_orientation]
+        depth = self.heuristic(*corners, *self.edge_groups)
+        while depth <= self.max_depth:
+            if self._search(*corners, *self.edge_groups, depth, -1, False):
+                return self.path, depth
+            if self.timed_out:
+                break
+            depth += 1
+
+        return None, depth
+
+    def _search(
+        self,
+        corner_permutation,
+        corner_orientation,
+        edge_group_0,
+        edge_group_1,
+        edge_group_2,
+        togo,
+        last_move,
+        repeated,
+    ):
+        """Depth first search with exactly togo moves left."""
+
+        if togo == 0:
+            return (
+                self.heuristic(
+                    corner_permutation,
+                    corner_orientation,
+                    edge_group_0,
+                    edge_group_1,
+                    edge_group_2,
+                )
+                == 0
+            )
+
+        self.nodes += 1
+        if self.deadline is not None and self.nodes & 1023 == 0:
+            if time.perf_counter() > self.deadline:
+                self.timed_out = True
+        if self.timed_out:
+            return False
+
+        solver = self.solver
+        corner_permutations = solver.corner_permutation_table[corner_permutation]
+        corner_orientations = solver.corner_orientation_table[corner_orientation]
+        edge_moves_0 = solver.edge_group_table[edge_group_0]
+        edge_moves_1 = solver.edge_group_table[edge_group_1]
+        edge_moves_2 = solver.edge_group_table[edge_group_2]
+
+        for move_command in solver.allowed_moves[last_move][repeated]:
+            next_corner_permutation = corner_permutations[move_command]
+            next_corner_orientation = corner_orientations[move_command]
+            next_edge_group_0 = edge_moves_0[move_command]
+            next_edge_group_1 = edge_moves_1[move_command]
+            next_edge_group_2 = edge_moves_2[move_command]
+
+            if (
+                self.heuristic(
+                    next_corner_permutation,
+                    next_corner_orientation,
+                    next_edge_group_0,
+                    next_edge_group_1,
+                    next_edge_group_2,
+                )
+                >= togo
+            ):
+                continue
+
+            self.path.append(move_command)
+            if self._search(
+                next_corner_permutation,
+                next_corner_orientation,
+                next_edge_group_0,
+                next_edge_group_1,
+                next_edge_group_2,
+                togo - 1,
+                move_command,
+                move_command == last_move,
+            ):
+                return True
+            self.path.pop()
+
+        return False
+
+
+class IDAStarSolver:
+    """
+    Solver for the Rubik's Cube that finds the shortest solution,
+    counting quarter turns, with an iterative deepening A* search (IDA*).
+
+    The search moves the cube with the move tables of CubeCoordinates, derived
+    from the CubeLookup move table, and bounds the moves left with pattern
+    databases: the exact distance to solved of the 8 corners, and of each group
+    of 4 edges in EDGE_GROUPS. The databases are built once, saved nibble packed
+    in the data directory, about 44 MB in total.
+
+    Sequences that are never shorter are skipped: a move undoing the previous one,
+    three turns of the same face, a half turn written as two primed turns,
+    and the second of two opposite face moves, which commute, in the wrong order.
+
+    Meant for short scrambles, the number of nodes grows about tenfold per move.
+    Each search reports the nodes expanded and time taken.
+
+    Attributes
+    ----------
+    max_depth : int
+        Longest solution searched for.
+    timeout : float
+        Seconds after which a search gives up. None to never give up.
+    """
+
+    def __init__(
+        self,
+        corner_database_file_name=None,
+        edge_database_file_name=None,
+        max_depth=12,
+        timeout=10.0,
+    ):
+        """
+        The constructor for the IDAStarSolver class.
+
+        Parameters
+        ----------
+        corner_database_file_name : str
+            Location of the corner pattern database, see create_corner_pattern_database.
+            Default of None loads data/default_corner_pattern_database.npy,
+            creating it if it does not exist yet, which takes about half a minute.
+        edge_database_file_name : str
+            Location of the edge pattern databases, see create_edge_pattern_database.
+            Default of None loads data/default_edge_pattern_database.npy,
+            creating it if it does not exist yet.
+        max_depth : int
+            Longest solution searched for.
+        timeout : float
+            Seconds after which a search gives up. None to never give up.
+        """
+
+        self.max_depth = max_depth
+        self.timeout = timeout
+
+        # Plain lists and bytes, much faster to index one element at a time
+        self.corner_distances = _load_pattern_database(
+            corner_database_file_name,
+            "data/default_corner_pattern_database.npy",
+            create_corner_pattern_database,
+        ).tobytes()
+        self.edge_distances = [
+            packed_distances.tobytes()
+            for packed_distances in _load_pattern_database(
+                edge_database_file_name,
+                "data/default_edge_pattern_database.npy",
+                create_edge_pattern_database,
+            )
+        ]
+
+        move_tables = get_move_tables()
+        self.corner_permutation_table = move_tables["corner_permutation"].tolist()
+        self.corner_orientation_table = move_tables["corner_orientation"].tolist()
+        self.edge_group_table = _build_edge_group_move_table().tolist()
+
+        # Moves allowed after each last move, -1 for none, and whether it was repeated
+        self.allowed_moves = {
+            last_move: [
+                self._get_allowed_moves(last_move, repeated)
+                for repeated in [False, True]
+            ]
+            for last_move in range(-1, N_MOVES)
+        }
+
+    @staticmethod
+    def _get_allowed_moves(last_move, repeated):
+        """Moves that may follow last_move, see the class docstring."""
+
+        if last_move < 0:
+            return list(range(N_MOVES))
+
+        allowed_moves = []
+        last_face = MOVE_FACES[last_move]
+        for move_command in range(N_MOVES):
+            face = MOVE_FACES[move_command]
+            if face == last_face:
+                # Only a half turn, as two clockwise quarter turns
+                if move_command != last_move or repeated or move_command >= 6:
+                    continue
+            elif face == OPPOSITE_FACES[last_face] and face < last_face:
+                continue
+            allowed_moves.append(move_command)
+        return allowed_moves
+
+    def find_moves_to_solve(self, cube):
+        """
+        Searches for the shortest solution of the cube, without moving it.
+
+        Parameters
+        ----------
+        cube : cube object
+            The cube to be solved, a CubeLookup or any cube with get_cube_state.
+
+        Returns
+        -------
+        moves_to_solve : array of int16
+            The moves that solve the cube, following the CubeLookup move integers.
+            None if there is no solution within max_depth moves, or on timeout.
+        search_report : dict
+            nodes, the number of nodes expanded, seconds, the time taken,
+            depth, the last depth searched, and timed_out.
+        """
+
+        if hasattr(cube, "get_cube_codes"):
+            cube_codes = cube.get_cube_codes()
+        else:
+            cube_codes = encode_cube_state(cube.get_cube_state())
+
+        search = _IDAStarSearch(self, cube_codes, self.max_depth, self.timeout)
+        path, depth = search.run()
+
+        search_report = {
+            "nodes": search.nodes,
+            "seconds": time.perf_counter() - search.start_time,
+            "depth": depth,
+            "timed_out": search.timed_out,
+        }
+
+        if path is None:
+            return None, search_report
+        return np.array(path, dtype=np.int16), search_report
+
+    def solve_cube(self, cube, output_moves=False):
+        """
+        Solves the given cube with the shortest solution.
+
+        Parameters
+        ----------
+        cube : cube object
+            The cube to be solved, a CubeLookup, a Cube or a CubeArray.
+        output_moves : bool
+            Returns the moves used to solve.
+        """
+
+        moves_to_solve, search_report = self.find_moves_to_solve(cube)
+        if moves_to_solve is None:
+            raise ValueError(
+                f"Didn't find a solution within {self.max_depth} moves"
+                f" after {search_report['seconds']:.1f} s."
+            )
+
+        if hasattr(cube, "apply_moves"):
+            cube.apply_moves(moves_to_solve)
+        elif hasattr(cube, "get_cube_codes"):
+            cube.move_decoder(moves_to_solve)
+        else:
+            # Cube and CubeArray take moves in UFDLRB notation
+            cube.move_decoder([FUNDAMENTAL_MOVES[move] for move in moves_to_solve])
+
+        if output_moves:
+            return moves_to_solve
+
+        return None
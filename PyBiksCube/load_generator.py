@@ -0,0 +1,168 @@
+"""
+Load generator for the solve server of PyBiksCube.serve,
+run with python -m PyBiksCube.load_generator
+"""
+
+import argparse
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from PyBiksCube.cube_batch import CubeBatch
+from PyBiksCube.serve import DEFAULT_HOST, DEFAULT_PORT
+
+
+def _post_json(url, content):
+    """Posts content as JSON, returns the status and the decoded JSON answer."""
+
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(content).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def _get_json(url):
+    """Gets the decoded JSON answer of url."""
+
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def run_load(
+    url=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}",
+    n_requests=1000,
+    concurrency=16,
+    cubes_per_request=1,
+    seed=0,
+    check=True,
+):
+    """
+    Sends solve requests of seeded scrambles to a running solve server,
+    from concurrent clients, and measures their throughput and latency.
+
+    Parameters
+    ----------
+    url : str
+        Address of the server, see PyBiksCube.serve.
+    n_requests : int
+        Number of requests sent.
+    concurrency : int
+        Number of requests in flight at once.
+    cubes_per_request : int
+        Number of cube states in each request.
+    seed : int
+        Seed of the scrambles, for reproducible runs.
+    check : bool
+        Checks that the moves returned solve each cube.
+
+    Returns
+    -------
+    results : dict
+        Counts of requests, cubes, errors and unsolved cubes, the throughput,
+        the latency percentiles in seconds, and the metrics of the server.
+    """
+
+    rng = np.random.default_rng(seed)
+    n_cubes = n_requests * cubes_per_request
+    cube_batch = CubeBatch(n_cubes)
+    cube_batch.move_decoder(rng.integers(0, 12, (n_cubes, 30)))
+    cube_states = cube_batch.get_cube_states()
+
+    def send_request(i_request):
+        request_states = cube_states[
+            i_request * cubes_per_request : (i_request + 1) * cubes_per_request
+        ]
+        start_time = time.perf_counter()
+        status, answer = _post_json(f"{url}/solve", {"cube_states": request_states})
+        return time.perf_counter() - start_time, status, answer
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        responses = list(executor.map(send_request, range(n_requests)))
+    seconds = time.perf_counter() - start_time
+
+    latencies = np.array([latency for latency, _, _ in responses])
+    n_errors = sum(status != 200 for _, status, _ in responses)
+
+    n_unsolved = 0
+    if check:
+        solved_states = []
+        solved_moves = []
+        for i_request, (_, status, answer) in enumerate(responses):
+            if status == 200:
+                solved_states += cube_states[
+                    i_request * cubes_per_request : (i_request + 1) * cubes_per_request
+                ]
+                solved_moves += answer["moves"]
+
+        # Replays the moves of every cube at once, padded with the no move -1
+        padded_moves = np.full(
+            (len(solved_moves), max(map(len, solved_moves), default=0)), -1
+        )
+        for i_cube, moves in enumerate(solved_moves):
+            padded_moves[i_cube, : len(moves)] = moves
+        solved_batch = CubeBatch(cube_states=solved_states)
+        solved_batch.move_decoder(padded_moves)
+        n_unsolved = int(np.sum(~solved_batch.check_solved()))
+
+    return {
+        "n_requests": n_requests,
+        "n_cubes": n_cubes,
+        "concurrency": concurrency,
+        "n_errors": int(n_errors),
+        "n_unsolved": n_unsolved,
+        "requests_per_s": n_requests / seconds,
+        "cubes_per_s": n_cubes / seconds,
+        "latency_p50_s": float(np.percentile(latencies, 50)),
+        "latency_p90_s": float(np.percentile(latencies, 90)),
+        "latency_p99_s": float(np.percentile(latencies, 99)),
+        "server_metrics": _get_json(f"{url}/metrics"),
+    }
+
+
+def main(argv=None):
+    """Command line entry point, prints or saves the results as JSON."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m PyBiksCube.load_generator", description=__doc__
+    )
+    parser.add_argument("--url", default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--cubes-per-request", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--no-check", action="store_true", help="Skip checking the moves returned."
+    )
+    parser.add_argument("--output", help="File to save the JSON to, stdout by default.")
+    args = parser.parse_args(argv)
+
+    results = run_load(
+        args.url,
+        args.requests,
+        args.concurrency,
+        args.cubes_per_request,
+        args.seed,
+        check=not args.no_check,
+    )
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w", encoding="utf-8") as file_out:
+            json.dump(results, file_out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
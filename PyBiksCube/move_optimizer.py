@@ -0,0 +1,77 @@
+""" Module that simplifies sequences of moves, as used by CubeLookup and the Solver """
+
+import numpy as np
+
+# Face turned by each face turn, following the CubeLookup move integers
+# U:0, F:1, D:2, L:3, R:4, B:5, U':6, F':7, D':8, L':9, R':10, B':11, U2:12, ..., B2:17
+MOVE_FACES = np.array([0, 1, 2, 3, 4, 5, 0, 1, 2, 3, 4, 5, 0, 1, 2, 3, 4, 5])
+
+# Number of clockwise quarter turns of each face turn, modulo 4
+MOVE_TURNS = np.array([1, 1, 1, 1, 1, 1, 3, 3, 3, 3, 3, 3, 2, 2, 2, 2, 2, 2])
+
+# Face turns are merged, every later move (slice, wide move or rotation) is kept as is
+N_FACE_TURNS = len(MOVE_FACES)
+
+# Axis of each face, opposite faces share an axis and commute: U-D, F-B, L-R
+FACE_AXES = np.array([0, 1, 0, 2, 2, 1])
+
+# Moves written out for each face and number of clockwise quarter turns
+FACE_TURNS_TO_MOVES = [
+    [[], [face], [face + 12], [face + 6]] for face in range(len(FACE_AXES))
+]
+
+
+def simplify_moves(move_sequence):
+    """
+    Simplifies a sequence of moves without changing what it does to the cube.
+
+    - Moves on the same face are merged, so X X' cancels, X X becomes X2,
+      X X X becomes X' and X X X X disappears.
+    - Moves on opposite faces commute, so they are gathered together before
+      merging, exposing more cancellations, e.g. U D U' becomes D.
+    - Whenever moves cancel out, the moves around them are merged in turn.
+    - Slice moves, wide moves and rotations are kept as they are,
+      and no move is merged across them.
+
+    Parameters
+    ----------
+    move_sequence : list or array of ints
+        Moves following the CubeLookup move integers.
+
+    Returns
+    -------
+    simplified_sequence : array of int16
+        The simplified moves, never longer than move_sequence.
+    """
+
+    # Stack of groups of moves on the same axis, each with the quarter turns
+    # of its faces, and of the moves kept as is, with an axis of None
+    axis_groups = []
+
+    for move_command in np.asarray(move_sequence, dtype=np.intp).tolist():
+        if move_command >= N_FACE_TURNS:
+            axis_groups.append((None, move_command))
+            continue
+
+        face = MOVE_FACES[move_command]
+        axis = FACE_AXES[face]
+
+        if len(axis_groups) == 0 or axis_groups[-1][0] != axis:
+            axis_groups.append((axis, {}))
+
+        face_turns = axis_groups[-1][1]
+        face_turns[face] = (face_turns.get(face, 0) + MOVE_TURNS[move_command]) % 4
+        if face_turns[face] == 0:
+            del face_turns[face]
+        if len(face_turns) == 0:
+            axis_groups.pop()
+
+    simplified_sequence = []
+    for axis, group in axis_groups:
+        if axis is None:
+            simplified_sequence.append(group)
+            continue
+        for face in sorted(group):
+            simplified_sequence += FACE_TURNS_TO_MOVES[face][group[face]]
+
+    return np.array(simplified_sequence, dtype=np.int16)
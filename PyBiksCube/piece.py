@@ -2,10 +2,6 @@
 
 import numpy as np
 
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
-from mpl_toolkits.mplot3d import art3d
-
 from PyBiksCube.utilities import side_type_converter
 
 
@@ -119,6 +115,11 @@ class Piece:
         Create a 3D plot of the piece, for debugging purposes.
         """
 
+        # Imported here so that only plotting needs matplotlib
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Rectangle
+        from mpl_toolkits.mplot3d import art3d
+
         fig = plt.figure()
         ax = fig.add_subplot(projection="3d")
         ax.set_aspect("equal")
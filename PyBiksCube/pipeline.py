@@ -0,0 +1,429 @@
+"""
+Module that streams cube states from files through the Solver,
+run with python -m PyBiksCube.pipeline
+"""
+
+import argparse
+import json
+import sys
+from itertools import islice
+import numpy as np
+
+from PyBiksCube.cube_batch import CubeBatch
+from PyBiksCube.cube_lookup import SOLVED_CUBE_STATE
+from PyBiksCube.serve import solve_cube_states
+from PyBiksCube.solver import Solver
+from PyBiksCube.utilities import MOVE_NAMES, N_QUARTER_TURNS, convert_move_command
+
+INPUT_FORMATS = ("text", "ndjson")
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+def guess_format(file_name):
+    """Format of a file from its extension, ndjson for .ndjson and .jsonl, text otherwise."""
+
+    if file_name is not None and file_name.endswith(NDJSON_EXTENSIONS):
+        return "ndjson"
+    return "text"
+
+
+def parse_scramble(scramble):
+    """
+    Converts a scramble into move integers.
+
+    Parameters
+    ----------
+    scramble : str or list
+        Move names separated by spaces, e.g. "U F2 R'", any of utilities.MOVE_NAMES,
+        or a list of move names or move integers.
+
+    Returns
+    -------
+    moves : list of ints
+        The moves, following the CubeLookup move integers.
+    """
+
+    if isinstance(scramble, str):
+        scramble = scramble.split()
+
+    moves = []
+    for move in scramble:
+        if isinstance(move, str):
+            try:
+                move = convert_move_command(move)
+            except KeyError as error:
+                raise ValueError(f"Not a valid move: {move}") from error
+        elif not isinstance(move, int) or isinstance(move, bool):
+            raise ValueError(f"Not a valid move: {move}")
+        if move < 0 or move >= len(MOVE_NAMES):
+            raise ValueError(f"Not a valid move: {move}")
+        moves.append(move)
+    return moves
+
+
+def parse_record(line, input_format="text"):
+    """
+    Parses one line of an input file.
+
+    A text line is either a 54 character long cube state, or a scramble
+    of move names separated by spaces. An ndjson line is either such a string,
+    or an object with a "cube_state" or a "scramble", and optionally an "id"
+    copied to the output.
+
+    Parameters
+    ----------
+    line : str
+        The line, without its line break.
+    input_format : str
+        Either "text" or "ndjson".
+
+    Returns
+    -------
+    record : dict
+        Either the "cube_state", or the "scramble" as move integers,
+        or the "error" if the line cannot be parsed.
+        The cube_state of a scramble is set when it is solved, see solve_records.
+        Along with the "id" of the ndjson object, if any.
+    """
+
+    record = {}
+    try:
+        if input_format == "ndjson":
+            content = json.loads(line)
+            if isinstance(content, dict):
+                if "id" in content:
+                    record["id"] = content["id"]
+                if "scramble" in content:
+                    record["scramble"] = parse_scramble(content["scramble"])
+                    return record
+                if not isinstance(content.get("cube_state"), str):
+                    raise ValueError("Object has neither a cube_state nor a scramble")
+                record["cube_state"] = content["cube_state"]
+                return record
+            line = content
+
+        if not isinstance(line, str):
+            raise ValueError(f"Not a cube state or a scramble: {line}")
+
+        line = line.strip()
+        if len(line) == 54 and " " not in line:
+            record["cube_state"] = line
+        else:
+            record["scramble"] = parse_scramble(line)
+    except ValueError as error:
+        record["error"] = str(error)
+
+    return record
+
+
+def read_records(file_in, input_format="text"):
+    """
+    Streams the records of an input file, one line at a time.
+    Blank lines are skipped.
+
+    Parameters
+    ----------
+    file_in : file object
+        The input file, opened as text.
+    input_format : str
+        Either "text" or "ndjson", see parse_record.
+
+    Yields
+    ------
+    record : dict
+        The record of each line, see parse_record.
+    """
+
+    if input_format not in INPUT_FORMATS:
+        raise ValueError(f"Not a valid format: {input_format}")
+
+    for line in file_in:
+        if line.strip():
+            yield parse_record(line, input_format)
+
+
+def generate_scrambles(n_cubes, n_moves=30, seed=0, chunk_size=1024):
+    """
+    Streams random scrambles, reproducible from the seed.
+
+    Parameters
+    ----------
+    n_cubes : int
+        Number of scrambles.
+    n_moves : int
+        Number of random moves of each scramble.
+    seed : int
+        Seed of the scrambles.
+    chunk_size : int
+        Number of scrambles drawn at once.
+
+    Yields
+    ------
+    record : dict
+        The "scramble" of each cube, as move integers.
+    """
+
+    rng = np.random.default_rng(seed)
+    for i_start in range(0, n_cubes, chunk_size):
+        n_chunk = min(chunk_size, n_cubes - i_start)
+        for scramble in rng.integers(0, N_QUARTER_TURNS, (n_chunk, n_moves)):
+            yield {"scramble": scramble.tolist()}
+
+
+def iter_chunks(records, chunk_size):
+    """Splits an iterable into lists of at most chunk_size items."""
+
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_records(records, solver=None, chunk_size=1024, simplify=False):
+    """
+    Solves a stream of records in batches of chunk_size cubes,
+    so only one batch is held in memory at a time.
+
+    Parameters
+    ----------
+    records : iterable of dict
+        The records to solve, see parse_record.
+    solver : Solver
+        The solver used. Default of None loads Solver("default").
+    chunk_size : int
+        Number of cubes solved in each batch.
+    simplify : bool
+        Simplifies the moves returned, see move_optimizer.simplify_moves.
+
+    Yields
+    ------
+    record : dict
+        Each record, in order, with its "cube_state" and the "moves" that solve it,
+        or the "error" if it could not be solved.
+    """
+
+    if solver is None:
+        solver = Solver("default")
+    cube_batch = CubeBatch(0)
+
+    for chunk in iter_chunks(records, chunk_size):
+        _scramble_records(chunk, cube_batch)
+
+        valid_records = [record for record in chunk if "error" not in record]
+        results = []
+        if valid_records:
+            results = solve_cube_states(
+                solver,
+                [record["cube_state"] for record in valid_records],
+                simplify,
+                cube_batch,
+            )
+        for record, result in zip(valid_records, results):
+            if isinstance(result, str):
+                record["error"] = result
+            else:
+                record["moves"] = result
+
+        yield from chunk
+
+
+def _scramble_records(records, cube_batch):
+    """Sets the cube_state of the records with a scramble, applying them all at once."""
+
+    scramble_records = [record for record in records if "scramble" in record]
+    if not scramble_records:
+        return
+
+    scrambles = [record["scramble"] for record in scramble_records]
+    padded_moves = np.full(
+        (len(scrambles), max(map(len, scrambles))), -1, dtype=np.int16
+    )
+    for i_cube, moves in enumerate(scrambles):
+        padded_moves[i_cube, : len(moves)] = moves
+
+    cube_batch.set_cube_states([SOLVED_CUBE_STATE] * len(scrambles))
+    cube_batch.move_decoder(padded_moves)
+    for record, cube_state in zip(scramble_records, cube_batch.get_cube_states()):
+        record["cube_state"] = cube_state
+
+
+def format_record(record, output_format="text"):
+    """
+    Formats a solved record as one line of an output file.
+
+    A text line has the names of the moves separated by spaces,
+    or "error: " and the error. An ndjson line is the record as a JSON object.
+
+    Parameters
+    ----------
+    record : dict
+        The record, as yielded by solve_records.
+    output_format : str
+        Either "text" or "ndjson".
+
+    Returns
+    -------
+    line : str
+        The line, with its line break.
+    """
+
+    if output_format == "ndjson":
+        return json.dumps(record) + "\n"
+    if output_format != "text":
+        raise ValueError(f"Not a valid format: {output_format}")
+
+    if "error" in record:
+        return f"error: {record['error']}\n"
+    return " ".join(MOVE_NAMES[move] for move in record["moves"]) + "\n"
+
+
+def write_records(records, file_out, output_format="text", flush_every=1024):
+    """
+    Writes solved records as they come, one line each.
+
+    Parameters
+    ----------
+    records : iterable of dict
+        The records, as yielded by solve_records.
+    file_out : file object
+        The output file, opened as text.
+    output_format : str
+        Either "text" or "ndjson", see format_record.
+    flush_every : int
+        Number of records written between flushes of the file.
+
+    Returns
+    -------
+    counts : dict
+        Number of records written, solved and with an error.
+    """
+
+    counts = {"n_records": 0, "n_solved": 0, "n_errors": 0}
+    for record in records:
+        file_out.write(format_record(record, output_format))
+
+        counts["n_records"] += 1
+        if "error" in record:
+            counts["n_errors"] += 1
+        else:
+            counts["n_solved"] += 1
+
+        if counts["n_records"] % flush_every == 0:
+            file_out.flush()
+
+    file_out.flush()
+    return counts
+
+
+def run_pipeline(
+    records,
+    file_out,
+    output_format="text",
+    solver=None,
+    chunk_size=1024,
+    simplify=False,
+):
+    """
+    Solves a stream of records and writes the results, in bounded memory.
+
+    Parameters
+    ----------
+    records : iterable of dict
+        The records to solve, e.g. from read_records or generate_scrambles.
+    file_out : file object
+        The output file, opened as text.
+    output_format : str
+        Either "text" or "ndjson", see format_record.
+    solver : Solver
+        The solver used. Default of None loads Solver("default").
+    chunk_size : int
+        Number of cubes solved in each batch.
+    simplify : bool
+        Simplifies the moves returned, see move_optimizer.simplify_moves.
+
+    Returns
+    -------
+    counts : dict
+        Number of records written, solved and with an error.
+    """
+
+    solved_records = solve_records(records, solver, chunk_size, simplify)
+    return write_records(solved_records, file_out, output_format, chunk_size)
+
+
+def main(argv=None):
+    """Command line entry point, prints the counts as JSON to stderr."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m PyBiksCube.pipeline", description=__doc__
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="Input file, stdin by default."
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="Output file, stdout by default."
+    )
+    parser.add_argument("--input-format", choices=INPUT_FORMATS)
+    parser.add_argument("--output-format", choices=INPUT_FORMATS)
+    parser.add_argument(
+        "--generate",
+        type=int,
+        metavar="N_CUBES",
+        help="Solves N_CUBES random scrambles instead of reading an input file.",
+    )
+    parser.add_argument("--scramble-moves", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--simplify", action="store_true")
+    parser.add_argument(
+        "--solver", default="default", help="Algorithm file of the Solver."
+    )
+    args = parser.parse_args(argv)
+
+    input_format = args.input_format or guess_format(args.input)
+    output_format = args.output_format or guess_format(args.output)
+    solver = Solver(args.solver)
+
+    file_in = None
+    if args.generate is not None:
+        records = generate_scrambles(
+            args.generate, args.scramble_moves, args.seed, args.chunk_size
+        )
+    elif args.input == "-":
+        records = read_records(sys.stdin, input_format)
+    else:
+        file_in = open(args.input, "r", encoding="utf-8")
+        records = read_records(file_in, input_format)
+
+    try:
+        if args.output == "-":
+            counts = run_pipeline(
+                records,
+                sys.stdout,
+                output_format,
+                solver,
+                args.chunk_size,
+                args.simplify,
+            )
+        else:
+            with open(args.output, "w", encoding="utf-8") as file_out:
+                counts = run_pipeline(
+                    records,
+                    file_out,
+                    output_format,
+                    solver,
+                    args.chunk_size,
+                    args.simplify,
+                )
+    finally:
+        if file_in is not None:
+            file_in.close()
+
+    json.dump(counts, sys.stderr)
+    sys.stderr.write("\n")
+
+
+if __name__ == "__main__":
+    main()
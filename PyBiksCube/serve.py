@@ -0,0 +1,597 @@
+"""
+Module that serves the Solver over a local HTTP endpoint,
+run with python -m PyBiksCube.serve
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+from PyBiksCube.cube_batch import CubeBatch
+from PyBiksCube.solver import Solver
+from PyBiksCube.symmetry import get_rotation_tables, orient_centers
+from PyBiksCube.utilities import encode_cube_state
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8754
+
+# Solver and CubeBatch of a worker process, loaded once per process.
+# Set in the parent before the workers are forked, so they share its tables.
+_worker_state = None
+
+
+def _load_worker_state(solver_file_name, simplify):
+    """Loads the solver, and the lookup table through a CubeBatch."""
+
+    global _worker_state
+    _worker_state = (Solver(solver_file_name), CubeBatch(0), simplify)
+
+
+def _init_worker(solver_file_name, simplify):
+    """Initializer of the worker processes, loads what the fork did not inherit."""
+
+    if _worker_state is None:
+        _load_worker_state(solver_file_name, simplify)
+
+
+def _ping_worker(_):
+    """Does nothing, used to start the workers up front."""
+
+    return None
+
+
+def solve_cube_states(solver, cube_states, simplify=False, cube_batch=None):
+    """
+    Solves a batch of cube states with Solver.solve_many,
+    one cube at a time if some cannot be solved, so only those fail.
+    Cubes with moved centers, e.g. scrambled with slice moves or rotations,
+    are first rotated back, see symmetry.orient_centers, and the moves
+    returned start with that rotation.
+
+    Parameters
+    ----------
+    solver : Solver
+        The solver with its algorithm loaded.
+    cube_states : list of str
+        Strings of 54 characters for color of different faces.
+    simplify : bool
+        Simplifies the moves returned, see move_optimizer.simplify_moves.
+    cube_batch : CubeBatch
+        Reused to hold the cubes, saves loading the lookup table.
+        Default of None creates a new one.
+
+    Returns
+    -------
+    results : list
+        For each cube, the list of moves that solve it,
+        or the error message if it could not be solved.
+    """
+
+    if cube_batch is None:
+        cube_batch = CubeBatch(0)
+
+    try:
+        cube_batch.set_cube_states(cube_states)
+        cube_batch.cube_states, i_rotations = orient_centers(cube_batch.cube_states)
+        _, moves_to_solve = solver.solve_many(
+            cube_batch, output_moves=True, simplify=simplify
+        )
+    except ValueError as error:
+        if len(cube_states) == 1:
+            return [str(error)]
+        return [
+            result
+            for cube_state in cube_states
+            for result in solve_cube_states(solver, [cube_state], simplify, cube_batch)
+        ]
+
+    rotation_moves = get_rotation_tables()["moves"]
+    return [
+        rotation_moves[i_rotation].tolist() + moves[moves >= 0].tolist()
+        for i_rotation, moves in zip(i_rotations, moves_to_solve)
+    ]
+
+
+def solve_in_worker(cube_states):
+    """
+    Solves a batch of cube states in a worker process of create_worker_pool,
+    see solve_cube_states.
+    """
+
+    solver, cube_batch, simplify = _worker_state
+    return solve_cube_states(solver, cube_states, simplify, cube_batch)
+
+
+def create_worker_pool(
+    solver_file_name="default", n_workers=2, simplify=False, start_method=None
+):
+    """
+    Creates a pool of worker processes that solve with solve_in_worker.
+
+    The solver and lookup table are loaded once, before the workers are forked,
+    so the workers share them copy-on-write (or through the page cache,
+    for a memory mapped algorithm file, see algorithm_io.save_mapped_algorithm).
+    Where fork is not available, or with the spawn start method,
+    each worker loads its own.
+
+    Parameters
+    ----------
+    solver_file_name : str
+        File name of the algorithm of the Solver, see Solver.
+    n_workers : int
+        Number of worker processes.
+    simplify : bool
+        Simplifies the moves returned, see move_optimizer.simplify_moves.
+    start_method : str
+        Start method of the worker processes, see multiprocessing.get_context.
+        Default of None forks where available, which is only safe
+        while no other thread is running; "spawn" is safe at any time.
+
+    Returns
+    -------
+    executor : ProcessPoolExecutor
+        The pool, with every worker started.
+    """
+
+    _load_worker_state(solver_file_name, simplify)
+
+    if start_method is None and "fork" in multiprocessing.get_all_start_methods():
+        start_method = "fork"
+
+    mp_context = None
+    if start_method is not None:
+        mp_context = multiprocessing.get_context(start_method)
+
+    executor = ProcessPoolExecutor(
+        n_workers,
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(solver_file_name, simplify),
+    )
+    # Start every worker now, before any other thread is running when forking
+    list(executor.map(_ping_worker, range(n_workers)))
+    return executor
+
+
+class SolveMetrics:
+    """
+    Thread-safe throughput and latency counters of a SolveService.
+
+    Latencies are kept for the last max_latencies requests only.
+    """
+
+    def __init__(self, max_latencies=10000):
+        """
+        The constructor for the SolveMetrics class.
+
+        Parameters
+        ----------
+        max_latencies : int
+            Number of the latest request latencies used for the percentiles.
+        """
+
+        self._lock = threading.Lock()
+        self._start_time = time.perf_counter()
+        self._latencies = deque(maxlen=max_latencies)
+        self._batch_sizes = deque(maxlen=max_latencies)
+        self._counts = {"requests": 0, "cubes": 0, "errors": 0, "batches": 0}
+
+    def record_request(self, n_cubes, seconds, failed=False):
+        """Counts a request of n_cubes that took seconds to answer."""
+
+        with self._lock:
+            self._counts["requests"] += 1
+            self._counts["cubes"] += n_cubes
+            self._counts["errors"] += int(failed)
+            self._latencies.append(seconds)
+
+    def record_batch(self, n_cubes):
+        """Counts a batch of n_cubes sent to the workers."""
+
+        with self._lock:
+            self._counts["batches"] += 1
+            self._batch_sizes.append(n_cubes)
+
+    def to_dict(self):
+        """
+        Returns the metrics.
+
+        Returns
+        -------
+        metrics : dict
+            Counts of requests, cubes, errors and batches since the start,
+            cubes solved per second, the mean batch size,
+            and the latency percentiles of the requests in seconds.
+        """
+
+        with self._lock:
+            metrics = dict(self._counts)
+            latencies = np.array(self._latencies)
+            batch_sizes = np.array(self._batch_sizes)
+
+        uptime = time.perf_counter() - self._start_time
+        metrics["uptime_s"] = uptime
+        metrics["cubes_per_s"] = metrics["cubes"] / uptime
+        metrics["mean_batch_size"] = (
+            float(np.mean(batch_sizes)) if len(batch_sizes) else 0.0
+        )
+        for percentile in [50, 90, 99]:
+            metrics[f"latency_p{percentile}_s"] = (
+                float(np.percentile(latencies, percentile)) if len(latencies) else 0.0
+            )
+        return metrics
+
+
+class SolveService:
+    """
+    Solves cube states on a pool of worker processes.
+
+    The workers share the tables of one solver, see create_worker_pool.
+    Concurrent requests are gathered into batches, each solved by one worker
+    with Solver.solve_many. A batch is only gathered once a worker is idle,
+    so the batches are small under light load and grow under heavy load.
+    If a worker dies, the batches it broke fail, and the pool is recreated.
+
+    Attributes
+    ----------
+    n_workers : int
+        Number of worker processes.
+    max_batch_size : int
+        Largest number of cubes sent to a worker at once.
+    max_wait : float
+        Seconds a batch waits for more requests before it is sent.
+    request_timeout : float
+        Seconds solve waits for the results before raising TimeoutError.
+    metrics : SolveMetrics
+        Throughput and latency of the requests.
+    """
+
+    def __init__(
+        self,
+        solver_file_name="default",
+        n_workers=2,
+        max_batch_size=256,
+        max_wait=0.002,
+        simplify=False,
+        request_timeout=30.0,
+    ):
+        """
+        The constructor for the SolveService class.
+
+        Parameters
+        ----------
+        solver_file_name : str
+            File name of the algorithm of the Solver, see Solver.
+        n_workers : int
+            Number of worker processes.
+        max_batch_size : int
+            Largest number of cubes sent to a worker at once.
+        max_wait : float
+            Seconds a batch waits for more requests before it is sent.
+        simplify : bool
+            Simplifies the moves returned, see move_optimizer.simplify_moves.
+        request_timeout : float
+            Seconds solve waits for the results before raising TimeoutError.
+        """
+
+        self.n_workers = n_workers
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.request_timeout = request_timeout
+        self.metrics = SolveMetrics()
+
+        self._solver_file_name = solver_file_name
+        self._simplify = simplify
+        self._executor = create_worker_pool(solver_file_name, n_workers, simplify)
+
+        self._pending = queue.Queue()
+        self._idle_workers = threading.Semaphore(n_workers)
+        self._batcher = threading.Thread(target=self._run_batcher, daemon=True)
+        self._batcher.start()
+
+    def solve(self, cube_states):
+        """
+        Solves the cube states, batched with those of other concurrent calls.
+
+        Parameters
+        ----------
+        cube_states : list of str
+            Strings of 54 characters for color of different faces.
+
+        Returns
+        -------
+        results : list
+            For each cube, the list of moves that solve it, following
+            the CubeLookup move integers, or the error message if it could not be solved.
+
+        Raises
+        ------
+        TimeoutError
+            If the results are not back after request_timeout seconds.
+        """
+
+        start_time = time.perf_counter()
+
+        futures = []
+        for cube_state in cube_states:
+            future = Future()
+            self._pending.put((cube_state, future))
+            futures.append(future)
+
+        deadline = start_time + self.request_timeout
+        try:
+            results = [
+                future.result(timeout=max(deadline - time.perf_counter(), 0))
+                for future in futures
+            ]
+        except FutureTimeoutError as error:
+            self.metrics.record_request(
+                len(cube_states), time.perf_counter() - start_time, failed=True
+            )
+            raise TimeoutError(
+                f"Cubes not solved after {self.request_timeout} seconds"
+            ) from error
+
+        self.metrics.record_request(
+            len(cube_states),
+            time.perf_counter() - start_time,
+            failed=any(isinstance(result, str) for result in results),
+        )
+        return results
+
+    def is_healthy(self):
+        """Whether the batcher is running, so requests can be answered."""
+        return self._batcher.is_alive()
+
+    def get_worker_pid(self):
+        """Process id of a worker process, e.g. to monitor it."""
+        return self._executor.submit(os.getpid).result()
+
+    def _run_batcher(self):
+        """Gathers the pending cubes into batches and sends them to the workers."""
+
+        while True:
+            pending_cube = self._pending.get()
+            if pending_cube is None:
+                return
+
+            # Cubes keep queueing while every worker is busy, so batches grow with the load
+            self._idle_workers.acquire()
+
+            batch = [pending_cube]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    pending_cube = self._pending.get(
+                        timeout=max(deadline - time.perf_counter(), 0)
+                    )
+                except queue.Empty:
+                    break
+                if pending_cube is None:
+                    self._pending.put(None)
+                    break
+                batch.append(pending_cube)
+
+            self.metrics.record_batch(len(batch))
+            try:
+                batch_future = self._submit_batch(batch)
+            except Exception as error:
+                self._fail_batch(batch, error)
+                continue
+
+            batch_future.add_done_callback(
+                lambda batch_future, batch=batch: self._finish_batch(
+                    batch_future, batch
+                )
+            )
+
+    def _submit_batch(self, batch):
+        """Sends a batch to the pool, recreating the pool if a worker died."""
+
+        cube_states = [cube_state for cube_state, _ in batch]
+        try:
+            return self._executor.submit(solve_in_worker, cube_states)
+        except BrokenProcessPool:
+            # The HTTP threads are running by now, so forking could deadlock the workers
+            self._executor.shutdown(wait=False)
+            self._executor = create_worker_pool(
+                self._solver_file_name, self.n_workers, self._simplify, "spawn"
+            )
+            return self._executor.submit(solve_in_worker, cube_states)
+
+    def _fail_batch(self, batch, error):
+        """Answers every cube of a batch that could not be solved with the error."""
+
+        self._idle_workers.release()
+        for _, future in batch:
+            future.set_result(f"Solving the batch failed: {error}")
+
+    def _finish_batch(self, batch_future, batch):
+        """Hands the results of a batch back to the waiting requests."""
+
+        try:
+            results = batch_future.result()
+        except Exception as error:
+            self._fail_batch(batch, error)
+            return
+
+        self._idle_workers.release()
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def close(self):
+        """Stops the batching and the worker processes."""
+
+        self._pending.put(None)
+        self._batcher.join()
+        self._executor.shutdown()
+
+
+class _SolveRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles the requests of a SolveServer:
+
+    - POST /solve with {"cube_state": str} or {"cube_states": [str, ...]}
+      answers {"moves": [int, ...]} or {"moves": [[int, ...], ...]}.
+    - GET /metrics answers SolveMetrics.to_dict.
+    - GET /health answers {"status": "ok"}, or 503 if the service cannot solve.
+
+    Requests answer 503 if the service cannot solve, or timed out.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send_json(200, self.server.service.metrics.to_dict())
+        elif self.path == "/health":
+            if self.server.service.is_healthy():
+                self._send_json(200, {"status": "ok"})
+            else:
+                self._send_json(503, {"status": "unavailable"})
+        else:
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/solve":
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            single_cube = "cube_state" in request
+            cube_states = (
+                [request["cube_state"]] if single_cube else request["cube_states"]
+            )
+            for cube_state in cube_states:
+                if len(cube_state) != 54:
+                    raise ValueError(
+                        f"Cube state must be 54 characters long: {cube_state}"
+                    )
+                encode_cube_state(cube_state)
+        except (ValueError, KeyError, TypeError) as error:
+            self._send_json(400, {"error": f"Not a valid request: {error}"})
+            return
+
+        if not self.server.service.is_healthy():
+            self._send_json(503, {"error": "The solve service is unavailable"})
+            return
+
+        try:
+            results = self.server.service.solve(cube_states)
+        except TimeoutError as error:
+            self._send_json(503, {"error": str(error)})
+            return
+
+        errors = [result for result in results if isinstance(result, str)]
+        if errors:
+            self._send_json(422, {"error": errors[0]})
+        elif single_cube:
+            self._send_json(200, {"moves": results[0]})
+        else:
+            self._send_json(200, {"moves": results})
+
+    def _send_json(self, status, content):
+        """Sends content as the JSON body of the response."""
+
+        body = json.dumps(content).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Requests are counted in the metrics instead of logged."""
+
+
+class SolveServer(ThreadingHTTPServer):
+    """
+    HTTP server answering solve requests with a SolveService,
+    one thread per connection.
+
+    Attributes
+    ----------
+    service : SolveService
+        Solves the cubes of the requests.
+    """
+
+    daemon_threads = True
+    # Room for many clients connecting at once, the default is 5
+    request_queue_size = 1024
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        The constructor for the SolveServer class.
+
+        Parameters
+        ----------
+        service : SolveService
+            Solves the cubes of the requests.
+        host : str
+            Address to listen on, local only by default.
+        port : int
+            Port to listen on, 0 for any free port.
+        """
+
+        self.service = service
+        super().__init__((host, port), _SolveRequestHandler)
+
+
+def main(argv=None):
+    """Command line entry point, serves until interrupted."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m PyBiksCube.serve", description=__doc__
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--solver", default="default", help="Algorithm file of the Solver."
+    )
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=2.0,
+        help="Milliseconds a batch waits for more requests.",
+    )
+    parser.add_argument("--simplify", action="store_true")
+    args = parser.parse_args(argv)
+
+    service = SolveService(
+        args.solver,
+        n_workers=args.workers,
+        max_batch_size=args.max_batch_size,
+        max_wait=args.max_wait_ms / 1000,
+        simplify=args.simplify,
+    )
+    server = SolveServer(service, args.host, args.port)
+    print(
+        f"Serving on http://{server.server_address[0]}:{server.server_address[1]}",
+        file=sys.stderr,
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+""" Module that defines the SolutionCache class, the solutions of recently solved cubes """
+
+from collections import OrderedDict
+import os.path
+import threading
+import numpy as np
+
+# Bytes counted for each entry on top of its key and moves, for the dictionary and arrays
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class SolutionCache:
+    """
+    Bounded cache of the moves that solve cube states, for the Solver.
+
+    Keyed by the compact cube state, the 54 bytes of CubeLookup.get_compact_cube_state.
+    A symmetric cache is keyed by the canonical state instead (see symmetry.canonicalize),
+    so the up to 48 states related by a symmetry share one entry, with the moves
+    solving the canonical state. The Solver transforms the moves in and out.
+    When the entries take more than max_bytes, the least recently used are evicted.
+    The size of an entry is its key, its moves and ENTRY_OVERHEAD_BYTES.
+    Thread-safe, so it can be shared with the Solver by many threads.
+
+    Attributes
+    ----------
+    max_bytes : int
+        Size limit of the cache, in bytes.
+    file_name : str
+        File the cache is loaded from, if it exists, and saved to by save.
+    symmetric : bool
+        Whether the keys are canonical states.
+    hits : int
+        Number of lookups that found the cube state.
+    misses : int
+        Number of lookups that did not.
+    evictions : int
+        Number of entries evicted to stay within max_bytes.
+    """
+
+    def __init__(self, max_bytes=64 * 2**20, file_name=None, symmetric=False):
+        """
+        The constructor for the SolutionCache class.
+
+        Parameters
+        ----------
+        max_bytes : int
+            Size limit of the cache, in bytes.
+        file_name : str
+            File the cache is persisted to between runs, see save.
+            Loaded if it already exists. Default of None is not persisted.
+        symmetric : bool
+            Keys the cache by canonical states, see the class docstring.
+        """
+
+        self.max_bytes = max_bytes
+        self.file_name = file_name
+        self.symmetric = symmetric
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._n_bytes = 0
+
+        if file_name is not None and os.path.isfile(file_name):
+            self.load(file_name)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def n_bytes(self):
+        """Size of the entries of the cache, in bytes."""
+        return self._n_bytes
+
+    def get(self, cube_key):
+        """
+        Looks up the moves that solve a cube state.
+
+        Parameters
+        ----------
+        cube_key : bytes
+            The compact cube state, as in CubeLookup.get_compact_cube_state.
+
+        Returns
+        -------
+        moves_to_solve : array of int16
+            The moves stored for the state, read-only. None if not cached.
+        """
+
+        with self._lock:
+            moves_to_solve = self._entries.get(cube_key)
+            if moves_to_solve is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(cube_key)
+            return moves_to_solve
+
+    def put(self, cube_key, moves_to_solve):
+        """
+        Stores the moves that solve a cube state,
+        evicting the least recently used entries if the cache gets too big.
+
+        Parameters
+        ----------
+        cube_key : bytes
+            The compact cube state, as in CubeLookup.get_compact_cube_state.
+        moves_to_solve : list or array of ints
+            The moves that solve the state, following the CubeLookup move integers.
+        """
+
+        moves_to_solve = np.array(moves_to_solve, dtype=np.int16)
+        moves_to_solve.flags.writeable = False
+        entry_bytes = _entry_bytes(cube_key, moves_to_solve)
+
+        with self._lock:
+            if cube_key in self._entries:
+                self._n_bytes -= _entry_bytes(cube_key, self._entries.pop(cube_key))
+
+            if entry_bytes > self.max_bytes:
+                return
+
+            self._entries[cube_key] = moves_to_solve
+            self._n_bytes += entry_bytes
+
+            while self._n_bytes > self.max_bytes:
+                old_key, old_moves = self._entries.popitem(last=False)
+                self._n_bytes -= _entry_bytes(old_key, old_moves)
+                self.evictions += 1
+
+    def clear(self):
+        """Removes every entry, keeping the counters."""
+
+        with self._lock:
+            self._entries.clear()
+            self._n_bytes = 0
+
+    def get_stats(self):
+        """
+        Returns the counters of the cache.
+
+        Returns
+        -------
+        stats : dict
+            hits, misses, evictions, the number of entries and their size in bytes.
+        """
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "n_bytes": self._n_bytes,
+            }
+
+    def save(self, file_name=None):
+        """
+        Saves the entries of the cache, from the least to the most recently used,
+        as arrays in a .npz file: keys, the 54 bytes of each state,
+        and moves, the moves of every state concatenated, split at offsets.
+
+        Parameters
+        ----------
+        file_name : str
+            Location to save the cache. Default of None uses the file_name attribute.
+        """
+
+        if file_name is None:
+            file_name = self.file_name
+        if file_name is None:
+            raise ValueError("No file name to save the cache to.")
+
+        with self._lock:
+            keys = list(self._entries)
+            moves = list(self._entries.values())
+
+        lengths = np.array([len(entry_moves) for entry_moves in moves], dtype=np.int64)
+        with open(file_name, "wb") as file_out:
+            np.savez(
+                file_out,
+                keys=np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(-1, 54),
+                offsets=np.concatenate([[0], np.cumsum(lengths)]),
+                moves=np.concatenate([np.empty(0, dtype=np.int16)] + moves),
+                symmetric=self.symmetric,
+            )
+
+    def load(self, file_name):
+        """
+        Loads the entries saved with save, on top of the current ones.
+
+        Parameters
+        ----------
+        file_name : str
+            Location of the saved cache.
+        """
+
+        try:
+            with np.load(file_name) as arrays:
+                keys = arrays["keys"]
+                offsets = arrays["offsets"]
+                moves = arrays["moves"]
+                symmetric = bool(arrays["symmetric"])
+        except Exception as error:
+            raise ValueError(
+                f"Something wrong happened with opening the cache file: {file_name}"
+            ) from error
+
+        if symmetric != self.symmetric:
+            raise ValueError(
+                f"Cache file {file_name} has symmetric={symmetric},"
+                f" but the cache has symmetric={self.symmetric}."
+            )
+
+        for i_key, key in enumerate(keys):
+            self.put(key.tobytes(), moves[offsets[i_key] : offsets[i_key + 1]])
+
+
+def _entry_bytes(cube_key, moves_to_solve):
+    """Size counted for an entry of the cache."""
+    return len(cube_key) + moves_to_solve.nbytes + ENTRY_OVERHEAD_BYTES
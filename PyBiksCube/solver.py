@@ -1,8 +1,28 @@
 """ Module that defines the Solver class """
 
 import os.path
+from types import MappingProxyType
 import numpy as np
-from numpy import array, int16  # Needed for eval on loaded file
+
+from PyBiksCube.algorithm_io import (
+    load_algorithm,
+    load_mapped_algorithm,
+    load_text_algorithm,
+    convert_text_algorithm,
+    is_binary_algorithm,
+    is_mapped_algorithm,
+)
+from PyBiksCube.cube_batch import CubeBatch
+from PyBiksCube.cube_lookup import get_move_permutation_cache
+from PyBiksCube.move_optimizer import simplify_moves
+from PyBiksCube.stage_index import StageIndex, MappedStageTable
+from PyBiksCube.symmetry import canonicalize, transform_moves, get_symmetry_tables
+from PyBiksCube.utilities import (
+    BLANK_CODE,
+    encode_cube_state,
+    decode_cube_state,
+    pack_cube_codes,
+)
 
 
 class Solver:
@@ -20,14 +40,26 @@ class Solver:
     piece iteratively, with 20 stages and each stage not having more
     than 24 possible cube states. The default solver uses this approach.
 
+    Each stage dictionary is indexed (see StageIndex) when it is
+    assigned, so finding the moves of a stage is one hash lookup
+    per distinct mask of its keys, instead of a scan over every key.
+    Stages loaded from a memory mapped file are MappedStageTable,
+    which are already indexed.
+    solve_many solves many cubes together, one stage at a time for all of them.
+
     Attributes
     ----------
-    array_of_dict_solvers : array of dictionaries
-        Array of the dictionaries used in each stage.
-    cube : Cube object being solved.
+    array_of_dict_solvers : tuple of dictionaries
+        Read-only dictionaries used in each stage, assign a new array to change them.
+    solution_cache : SolutionCache
+        Cache of the moves of the cube states already solved, or None.
+
+    Solving keeps no state in the solver, the cube is passed along to each stage,
+    so one loaded solver can be shared by many threads solving different cubes.
+    An optional SolutionCache skips the stages for the cube states already solved.
     """
 
-    def __init__(self, solver_file_name=None):
+    def __init__(self, solver_file_name=None, solution_cache=None):
         """
         The constructor for the Solver class.
 
@@ -35,24 +67,38 @@ class Solver:
         ----------
         solver_file_name : str
             File name of where the array of dictionaries for solving the cube are saved.
-            If "default", attempts to load the default solver in data/default_algorithm_solver.txt.
-            Creates the default if doesn't exist.
+            If "default", attempts to load the default solver in data/default_algorithm_solver.npz.
+            Creates the default if doesn't exist, converting the older
+            data/default_algorithm_solver.txt if that is there instead.
             If None, initializes a blank array.
-            Otherwise, attempts to load the designated solver file.
+            Otherwise, attempts to load the designated solver file,
+            either in the binary format of algorithm_io.save_algorithm,
+            the memory mapped format of algorithm_io.save_mapped_algorithm
+            or in the older text format.
+            Memory mapped files are not read in, so many solver processes
+            can share one copy of the stage tables.
+        solution_cache : SolutionCache
+            Cache of the moves of the cube states already solved by solve_cube.
+            Default of None caches nothing.
         """
 
         self.array_of_dict_solvers = []
-        self.cube = None
+        self.solution_cache = solution_cache
 
         if solver_file_name is not None:
             if solver_file_name == "default":
                 solver_file_name = os.path.join(
                     os.path.dirname(os.path.realpath(__file__)),
-                    "data/default_algorithm_solver.txt",
+                    "data/default_algorithm_solver.npz",
                 )
+                text_solver_file_name = solver_file_name[: -len(".npz")] + ".txt"
 
                 # Check if the default file exists. If not, create it.
-                if not os.path.isfile(solver_file_name):
+                if not os.path.isfile(solver_file_name) and os.path.isfile(
+                    text_solver_file_name
+                ):
+                    convert_text_algorithm(text_solver_file_name, solver_file_name)
+                elif not os.path.isfile(solver_file_name):
                     # It is not typical to import functions mid-code.
                     # However, this is only used if the default solver doesn't already exist
                     # and importing here solves a cyclical import error.
@@ -65,50 +111,253 @@ class Solver:
                     raise ValueError(f"Filename given did not open: {solver_file_name}")
 
             try:
-                with open(solver_file_name, "r", encoding="utf-8") as file:
-                    self.array_of_dict_solvers = eval(file.read())
+                if is_mapped_algorithm(solver_file_name):
+                    self.array_of_dict_solvers = load_mapped_algorithm(solver_file_name)
+                elif is_binary_algorithm(solver_file_name):
+                    self.array_of_dict_solvers = load_algorithm(solver_file_name)
+                else:
+                    self.array_of_dict_solvers = load_text_algorithm(solver_file_name)
             except:
                 raise ValueError(
                     "Something wrong happened with opening the algorithm file."
                 )
 
-    def solve_cube(self, cube, output_moves=False):
+    def solve_cube(self, cube, output_moves=False, simplify=False):
         """
         Solves the given cube using the algorithm that is already loaded into the class.
 
         Parameters
         ----------
         cube : cube object
-            The cube to be solved. Is loaded into the class attribute cube.
+            The cube to be solved.
         output_moves : bool
             Returns the moves used to solve.
+        simplify : bool
+            Simplifies the moves returned, see move_optimizer.simplify_moves.
+            Only used if output_moves.
         """
 
-        self.cube = cube
+        cube_key = None
+        i_symmetry = 0
+        total_moves_to_solve = None
+        if self.solution_cache is not None:
+            if hasattr(cube, "get_cube_codes"):
+                cube_codes = cube.get_cube_codes()
+            else:
+                cube_codes = encode_cube_state(cube.get_cube_state())
+            if self.solution_cache.symmetric:
+                cube_codes, i_symmetry = canonicalize(cube_codes)
+            cube_key = cube_codes.tobytes()
+            total_moves_to_solve = self.solution_cache.get(cube_key)
 
-        if output_moves:
-            total_moves_to_solve = np.array([], dtype=np.int16)
+        if total_moves_to_solve is not None:
+            # Solved before, the stage tables are not needed.
+            # The moves solve the canonical state, transformed back for this cube
+            inverse_symmetry = get_symmetry_tables()["inverse_symmetries"][i_symmetry]
+            total_moves_to_solve = transform_moves(
+                total_moves_to_solve, inverse_symmetry
+            )
+            if hasattr(cube, "apply_moves"):
+                cube.apply_moves(total_moves_to_solve)
+            else:
+                cube.move_decoder(total_moves_to_solve)
+        else:
+            if output_moves or cube_key is not None:
+                total_moves_to_solve = np.array([], dtype=np.int16)
 
-        for i_solver_stage in range(len(self.array_of_dict_solvers)):
-            moves_to_solve = self.find_moves_to_solve_stage(i_solver_stage)
-            cube.move_decoder(moves_to_solve)
+            for i_solver_stage in range(len(self.array_of_dict_solvers)):
+                moves_to_solve = self.find_moves_to_solve_stage(cube, i_solver_stage)
+                if hasattr(cube, "apply_moves"):
+                    cube.apply_moves(moves_to_solve)
+                else:
+                    cube.move_decoder(moves_to_solve)
 
-            if output_moves:
-                total_moves_to_solve = np.append(total_moves_to_solve, moves_to_solve)
+                if total_moves_to_solve is not None:
+                    total_moves_to_solve = np.append(
+                        total_moves_to_solve, moves_to_solve
+                    )
 
-        self.cube = None
+            if cube_key is not None:
+                self.solution_cache.put(
+                    cube_key, transform_moves(total_moves_to_solve, i_symmetry)
+                )
+
+        if output_moves and simplify:
+            return simplify_moves(total_moves_to_solve)
 
         if output_moves:
             return total_moves_to_solve
 
         return None
 
-    def find_moves_to_solve_stage(self, i_solver_dict):
+    def solve_many(
+        self, cube_states, output_moves=False, simplify=False, chunk_size=65536
+    ):
+        """
+        Solves many cubes at once, stage by stage, with the algorithm already loaded.
+
+        In each stage, the keys of all cubes are looked up together
+        (see StageIndex.find_many), and the moves of each key found are compiled
+        into a single permutation (see cube_lookup.MovePermutationCache), applied
+        to all cubes in one gather.
+
+        Parameters
+        ----------
+        cube_states : CubeBatch, iterable of str or 2D array
+            The cubes to be solved. A CubeBatch is solved in place, otherwise
+            the states are loaded into a new CubeBatch, see CubeBatch.set_cube_states.
+        output_moves : bool
+            Returns the moves used to solve.
+        simplify : bool
+            Simplifies the moves returned, see move_optimizer.simplify_moves.
+            Only used if output_moves.
+        chunk_size : int
+            Number of cubes solved together, bounding the memory used.
+
+        Returns
+        -------
+        cube_batch : CubeBatch
+            The solved cubes.
+        moves_to_solve : 2D array of int16
+            Only returned if output_moves. Row i is the moves that solved cube i,
+            padded with -1 at the end, as taken by CubeBatch.move_decoder.
+        """
+
+        if isinstance(cube_states, CubeBatch):
+            cube_batch = cube_states
+        else:
+            cube_batch = CubeBatch(cube_states=cube_states)
+
+        permutation_cache = get_move_permutation_cache(cube_batch.move_array)
+
+        chunk_moves = []
+        for i_start in range(0, len(cube_batch), chunk_size):
+            cube_codes = cube_batch.cube_states[i_start : i_start + chunk_size]
+            cube_codes, moves_to_solve = self._solve_many_chunk(
+                cube_codes, permutation_cache, output_moves
+            )
+            cube_batch.cube_states[i_start : i_start + chunk_size] = cube_codes
+            chunk_moves.append(moves_to_solve)
+
+        if not output_moves:
+            return cube_batch
+
+        n_columns = max((moves.shape[1] for moves in chunk_moves), default=0)
+        moves_to_solve = np.vstack(
+            [np.empty((0, n_columns), dtype=np.int16)]
+            + [
+                np.pad(
+                    moves, ((0, 0), (0, n_columns - moves.shape[1])), constant_values=-1
+                )
+                for moves in chunk_moves
+            ]
+        )
+
+        if simplify:
+            moves_to_solve = _pad_moves(
+                [simplify_moves(row[row >= 0]) for row in moves_to_solve]
+            )
+
+        return cube_batch, moves_to_solve
+
+    def _solve_many_chunk(self, cube_codes, permutation_cache, output_moves):
+        """
+        Solves the cubes of one chunk of solve_many.
+
+        Parameters
+        ----------
+        cube_codes : 2D array of uint8
+            The color codes of the cubes, one row per cube.
+        permutation_cache : MovePermutationCache
+            Compiles the moves of each key.
+        output_moves : bool
+            Collects the moves used to solve.
+
+        Returns
+        -------
+        cube_codes : 2D array of uint8
+            The color codes of the solved cubes.
+        moves_to_solve : 2D array of int16
+            The moves of each cube, padded with -1 at the end.
+            None if not output_moves.
+        """
+
+        stage_moves = []
+        for stage_index in self._stage_indices:
+            i_keys = stage_index.find_many(cube_codes)
+            if np.any(i_keys < 0):
+                raise ValueError(
+                    "Didn't find a solution. Is the cube busted? Or a solution is missing?"
+                )
+
+            # Each key found is compiled once, then gathered for all of its cubes
+            unique_keys, i_unique_keys = np.unique(i_keys, return_inverse=True)
+            key_moves = [
+                np.asarray(stage_index.get_moves(i_key), dtype=np.int16)
+                for i_key in unique_keys
+            ]
+
+            key_permutations = np.array(
+                [permutation_cache.compile(moves) for moves in key_moves]
+            )
+            cube_codes = np.take_along_axis(
+                cube_codes, key_permutations[i_unique_keys], axis=1
+            )
+            if output_moves:
+                stage_moves.append(_pad_moves(key_moves)[i_unique_keys])
+
+        if not output_moves:
+            return cube_codes, None
+
+        moves_to_solve = np.hstack(
+            [np.empty((len(cube_codes), 0), dtype=np.int16)] + stage_moves
+        )
+
+        # Gather the padding of every stage at the end, keeping the moves in order
+        order = np.argsort(moves_to_solve < 0, axis=1, kind="stable")
+        moves_to_solve = np.take_along_axis(moves_to_solve, order, axis=1)
+        n_columns = np.max(np.sum(moves_to_solve >= 0, axis=1), initial=0)
+
+        return cube_codes, moves_to_solve[:, :n_columns]
+
+    @property
+    def array_of_dict_solvers(self):
+        """
+        Array of the dictionaries used in each stage.
+
+        Stored as a read-only tuple of read-only dictionaries, since the stages
+        are indexed when they are assigned. To change the stages,
+        assign a new array of dictionaries.
+        """
+        return self._array_of_dict_solvers
+
+    @array_of_dict_solvers.setter
+    def array_of_dict_solvers(self, array_of_dict_solvers):
+        self._array_of_dict_solvers = tuple(
+            (
+                solver_dict
+                if isinstance(solver_dict, MappedStageTable)
+                else MappingProxyType(dict(solver_dict))
+            )
+            for solver_dict in array_of_dict_solvers
+        )
+        self._stage_indices = [
+            (
+                solver_dict
+                if isinstance(solver_dict, MappedStageTable)
+                else StageIndex(solver_dict)
+            )
+            for solver_dict in self._array_of_dict_solvers
+        ]
+
+    def find_moves_to_solve_stage(self, cube, i_solver_dict):
         """
         Helper function to find the moves to solve a single stage of the solver algorithm.
 
         Parameters
         ----------
+        cube : cube object
+            The cube being solved, not moved.
         i_solver_dict : int
             Index of current stage being solved for.
 
@@ -118,22 +367,41 @@ class Solver:
             The moves needed to solve this stage of the cube.
         """
 
+        if hasattr(cube, "get_packed_cube_state"):
+            packed_state = cube.get_packed_cube_state()
+        else:
+            packed_state = pack_cube_codes(encode_cube_state(cube.get_cube_state()))
+
+        moves_to_solve = self._stage_indices[i_solver_dict].find_packed(packed_state)
+        if moves_to_solve is not None:
+            return moves_to_solve
+
+        # No key matched, prints how close each key of the stage is
         solver_dict = self.array_of_dict_solvers[i_solver_dict]
-        end_stage = self.cube.get_raw_cube_state()
-
-        for key in solver_dict:
-            if self.cube.check_match_against_key(np.array(list(key), dtype=str)):
-                return solver_dict[key]
-
-        for key in solver_dict:
-            key_cur = np.array(list(key), dtype=str)
-            print(
-                key,
-                np.sum(np.logical_and(key_cur == end_stage, key_cur != "k")),
-                np.sum(key_cur != "k"),
-                "".join(end_stage),
-            )
+        cube_codes = encode_cube_state(cube.get_cube_state())
+        cube_state = decode_cube_state(cube_codes)
+        encoded_keys = encode_cube_state("".join(solver_dict)).reshape(-1, 54)
+        is_masked = encoded_keys != BLANK_CODE
+        n_matches = np.sum(is_masked & (encoded_keys == cube_codes), axis=1)
+
+        for key, n_match, n_masked in zip(
+            solver_dict, n_matches, is_masked.sum(axis=1)
+        ):
+            print(key, n_match, n_masked, cube_state)
 
         raise ValueError(
             "Didn't find a solution. Is the cube busted? Or a solution is missing?"
         )
+
+
+def _pad_moves(move_sequences):
+    """
+    Stacks sequences of moves of different lengths into one 2D array of int16,
+    padded with -1 at the end, as taken by CubeBatch.move_decoder.
+    """
+
+    n_columns = max((len(moves) for moves in move_sequences), default=0)
+    padded_moves = np.full((len(move_sequences), n_columns), -1, dtype=np.int16)
+    for i_row, moves in enumerate(move_sequences):
+        padded_moves[i_row, : len(moves)] = moves
+    return padded_moves
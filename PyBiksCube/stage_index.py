@@ -0,0 +1,474 @@
+""" Module that defines the classes used by the Solver to look up stage keys """
+
+from collections.abc import Mapping
+import numpy as np
+
+from PyBiksCube.utilities import (
+    BLANK_CODE,
+    encode_cube_state,
+    CODE_TO_ASCII,
+    pack_cube_codes,
+)
+
+
+class MaskedKey:
+    """
+    A key of the Solver compiled for matching cubes without building arrays.
+
+    The mask, 0xFF for each face that is not 'k' and 0 otherwise,
+    and the color codes of the key under the mask, are each packed
+    into one integer, one byte per face (see utilities.pack_cube_codes).
+    A cube matches the key if its packed state, masked, equals the packed value.
+
+    Attributes
+    ----------
+    mask : int
+        The packed mask of the key.
+    value : int
+        The packed color codes of the key, 0 for the blank faces.
+    """
+
+    def __init__(self, key):
+        """
+        The constructor for the MaskedKey class.
+
+        Parameters
+        ----------
+        key : str or array of uint8
+            Either the 54 character long key, with blank faces as 'k',
+            or its 54 color codes.
+        """
+
+        encoded_key = encode_cube_state(key) if isinstance(key, str) else key
+        is_masked = encoded_key != BLANK_CODE
+        self.mask = pack_cube_codes(np.where(is_masked, 0xFF, 0).astype(np.uint8))
+        self.value = pack_cube_codes(
+            np.where(is_masked, encoded_key, 0).astype(np.uint8)
+        )
+
+    def matches(self, packed_state):
+        """
+        Checks if a cube matches the key.
+
+        Parameters
+        ----------
+        packed_state : int
+            The packed cube state, as in CubeLookup.get_packed_cube_state.
+
+        Returns
+        -------
+        match : bool
+            Boolean of whether or not the key matches the cube.
+        """
+
+        return packed_state & self.mask == self.value
+
+
+class StageIndex:
+    """
+    Index of the keys of one stage of the Solver.
+
+    The keys are grouped by their mask, the faces that are not 'k',
+    and each group is a dictionary of the keys as MaskedKey integers,
+    built when the stage is loaded. Finding the moves of a stage is then
+    one dictionary lookup per distinct mask of the stage, of the cube
+    packed once into an integer, with no arrays built.
+    When several keys match the cube, the first in solver_dict is used.
+
+    Attributes
+    ----------
+    solver_dict : dict
+        The dictionary of the stage, keys to moves.
+    mask_indices : array of ints
+        Indices of the faces used by every key of the stage.
+        None if the keys of the stage have different masks.
+    """
+
+    def __init__(self, solver_dict):
+        """
+        The constructor for the StageIndex class.
+
+        Parameters
+        ----------
+        solver_dict : dict
+            Dictionary of the stage, with 54 character keys (masks) and moves as values.
+        """
+
+        self.solver_dict = solver_dict
+        self.mask_indices = None
+
+        self._moves = list(solver_dict.values())
+        # Mask and dictionary of masked values to key indices, of each mask group
+        self._mask_groups = []
+        # Mask indices, sorted projected keys and their key indices, of each mask group
+        self._sorted_groups = []
+
+        encoded_keys = encode_cube_state("".join(solver_dict)).reshape(-1, 54)
+
+        for mask_indices, key_indices in group_keys_by_mask(encoded_keys):
+            # Keys of the group packed as in MaskedKey, with the blank faces as 0
+            group_codes = np.zeros((len(key_indices), 54), dtype=np.uint8)
+            group_codes[:, mask_indices] = encoded_keys[
+                np.ix_(key_indices, mask_indices)
+            ]
+            self._mask_groups.append(
+                (
+                    MaskedKey(encoded_keys[key_indices[0]]).mask,
+                    {
+                        pack_cube_codes(codes): i_key
+                        for codes, i_key in zip(group_codes, key_indices.tolist())
+                    },
+                )
+            )
+            self._sorted_groups.append(
+                (
+                    mask_indices,
+                    *sort_projected_keys(encoded_keys, mask_indices, key_indices),
+                )
+            )
+
+        if len(self._sorted_groups) == 1:
+            self.mask_indices = self._sorted_groups[0][0]
+
+    def find(self, cube_codes):
+        """
+        Finds the moves for the key matching the cube.
+
+        Parameters
+        ----------
+        cube_codes : array of uint8
+            The 54 color codes of the cube, as in CubeLookup.get_cube_codes.
+
+        Returns
+        -------
+        moves_to_solve : array of integers
+            The moves stored with the matching key. None if no key matches.
+        """
+
+        return self.find_packed(pack_cube_codes(cube_codes))
+
+    def find_packed(self, packed_state):
+        """
+        Finds the moves for the key matching the cube, from its packed state.
+        Only integer operations, no arrays are built.
+
+        Parameters
+        ----------
+        packed_state : int
+            The packed cube state, as in CubeLookup.get_packed_cube_state.
+
+        Returns
+        -------
+        moves_to_solve : array of integers
+            The moves stored with the matching key. None if no key matches.
+        """
+
+        i_first_key = None
+        for mask, index in self._mask_groups:
+            i_key = index.get(packed_state & mask)
+            if i_key is not None and (i_first_key is None or i_key < i_first_key):
+                i_first_key = i_key
+
+        if i_first_key is None:
+            return None
+        return self._moves[i_first_key]
+
+    def find_many(self, cube_codes):
+        """
+        Finds the key matching each of many cubes at once.
+
+        Parameters
+        ----------
+        cube_codes : 2D array of uint8
+            The color codes of the cubes, one row of 54 per cube.
+
+        Returns
+        -------
+        i_keys : array of ints
+            Index of the key matching each cube, in the order of solver_dict,
+            see get_moves. -1 for cubes that match no key.
+        """
+
+        return _find_many_in_groups(self._sorted_groups, cube_codes)
+
+    def get_moves(self, i_key):
+        """
+        Returns the moves of the i_key-th key, as found by find_many.
+
+        Parameters
+        ----------
+        i_key : int
+            Index of the key, in the order of solver_dict.
+
+        Returns
+        -------
+        moves_to_solve : array of integers
+            The moves stored with the key.
+        """
+
+        return self._moves[i_key]
+
+
+class MappedStageTable(Mapping):
+    """
+    Read-only table of the keys of one stage of the Solver,
+    backed by arrays inside a memory mapped algorithm file
+    (see algorithm_io.save_mapped_algorithm).
+
+    The keys are stored grouped by their mask, the faces that are not 'k'.
+    Each group holds only the faces under its mask, sorted, so finding
+    the moves of a stage is one binary search per distinct mask of the stage,
+    done in the mapped arrays. Nothing is copied out of the file,
+    so loading is instant and processes mapping the same file
+    share one copy of it in the page cache.
+
+    Behaves as a read-only dictionary of the stage, keys to moves,
+    so it can be used in place of a stage dictionary in Solver.array_of_dict_solvers.
+
+    Attributes
+    ----------
+    mask_indices : array of ints
+        Indices of the faces used by every key of the stage.
+        None if the keys of the stage have different masks.
+    """
+
+    def __init__(self, mask_groups, offsets, moves):
+        """
+        The constructor for the MappedStageTable class.
+
+        Parameters
+        ----------
+        mask_groups : list of tuples
+            For each distinct mask of the keys, its mask indices,
+            the faces under the mask of each of its keys in ascii, sorted,
+            and the index of each of these keys, see sort_projected_keys.
+        offsets : array of ints
+            The moves of key j are moves[offsets[j]:offsets[j+1]].
+        moves : array of int16
+            The moves of every key of the stage, concatenated.
+        """
+
+        self.mask_indices = mask_groups[0][0] if len(mask_groups) == 1 else None
+
+        self._mask_groups = mask_groups
+        self._offsets = offsets
+        self._moves = moves
+
+    def find(self, cube_codes):
+        """
+        Finds the moves for the key matching the cube.
+
+        Parameters
+        ----------
+        cube_codes : array of uint8
+            The 54 color codes of the cube, as in CubeLookup.get_cube_codes.
+
+        Returns
+        -------
+        moves_to_solve : array of integers
+            The moves stored with the matching key. None if no key matches.
+        """
+
+        i_first_key = -1
+        for mask_indices, sorted_keys, key_indices in self._mask_groups:
+            projected_key = CODE_TO_ASCII[cube_codes[mask_indices]].tobytes()
+            i_sorted = np.searchsorted(sorted_keys, projected_key)
+            if i_sorted < len(sorted_keys) and sorted_keys[i_sorted] == projected_key:
+                i_key = int(key_indices[i_sorted])
+                if i_first_key < 0 or i_key < i_first_key:
+                    i_first_key = i_key
+
+        if i_first_key < 0:
+            return None
+        return self._get_moves(i_first_key)
+
+    def find_packed(self, packed_state):
+        """
+        Finds the moves for the key matching the cube, from its packed state.
+
+        Parameters
+        ----------
+        packed_state : int
+            The packed cube state, as in CubeLookup.get_packed_cube_state.
+
+        Returns
+        -------
+        moves_to_solve : array of integers
+            The moves stored with the matching key. None if no key matches.
+        """
+
+        cube_codes = np.frombuffer(packed_state.to_bytes(54, "big"), dtype=np.uint8)
+        return self.find(cube_codes)
+
+    def find_many(self, cube_codes):
+        """
+        Finds the key matching each of many cubes at once.
+
+        Parameters
+        ----------
+        cube_codes : 2D array of uint8
+            The color codes of the cubes, one row of 54 per cube.
+
+        Returns
+        -------
+        i_keys : array of ints
+            Index of the key matching each cube, see get_moves.
+            -1 for cubes that match no key.
+        """
+
+        return _find_many_in_groups(self._mask_groups, cube_codes)
+
+    def get_moves(self, i_key):
+        """
+        Returns the moves of the i_key-th key, as found by find_many.
+
+        Parameters
+        ----------
+        i_key : int
+            Index of the key.
+
+        Returns
+        -------
+        moves_to_solve : array of int16
+            The moves stored with the key.
+        """
+
+        return self._get_moves(i_key)
+
+    def _get_moves(self, i_key):
+        """Returns the moves of the i_key-th key."""
+        return self._moves[self._offsets[i_key] : self._offsets[i_key + 1]]
+
+    def __getitem__(self, key):
+        encoded_key = encode_cube_state(key)
+        key_mask_indices = np.flatnonzero(encoded_key != BLANK_CODE)
+
+        for mask_indices, sorted_keys, key_indices in self._mask_groups:
+            if np.array_equal(mask_indices, key_mask_indices):
+                projected_key = CODE_TO_ASCII[encoded_key[mask_indices]].tobytes()
+                i_sorted = np.searchsorted(sorted_keys, projected_key)
+                if (
+                    i_sorted < len(sorted_keys)
+                    and sorted_keys[i_sorted] == projected_key
+                ):
+                    return self._get_moves(key_indices[i_sorted])
+        raise KeyError(key)
+
+    def __iter__(self):
+        # Full keys rebuilt from the groups, in the order the keys were saved
+        full_keys = [None] * len(self)
+        for mask_indices, sorted_keys, key_indices in self._mask_groups:
+            full_key = np.full(54, ord("k"), dtype=np.uint8)
+            for projected_key, i_key in zip(sorted_keys, key_indices.tolist()):
+                full_key[mask_indices] = np.frombuffer(projected_key, dtype=np.uint8)
+                full_keys[i_key] = full_key.tobytes().decode("ascii")
+        yield from full_keys
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+
+def group_keys_by_mask(encoded_keys):
+    """
+    Groups the keys of a stage by their mask, the faces that are not blank.
+
+    Parameters
+    ----------
+    encoded_keys : 2D array of uint8
+        The color codes of the keys, one row of 54 per key.
+
+    Returns
+    -------
+    mask_groups : list of tuples
+        For each distinct mask, in the order of its first key,
+        the indices of the faces under the mask and the indices
+        of the keys with that mask, increasing.
+    """
+
+    if len(encoded_keys) == 0:
+        return []
+
+    # Each mask packed into one integer, one bit per face, to find the distinct masks
+    packed_masks = np.zeros((len(encoded_keys), 8), dtype=np.uint8)
+    packed_masks[:, :7] = np.packbits(encoded_keys != BLANK_CODE, axis=1)
+    unique_masks, first_keys, i_groups = np.unique(
+        packed_masks.view(np.uint64).ravel(), return_index=True, return_inverse=True
+    )
+    unique_masks = np.unpackbits(unique_masks.view(np.uint8).reshape(-1, 8), axis=1)
+    i_groups = i_groups.ravel()
+
+    key_order = np.argsort(i_groups, kind="stable")
+    group_keys = np.split(key_order, np.cumsum(np.bincount(i_groups))[:-1])
+    return [
+        (np.flatnonzero(unique_masks[i_group]), group_keys[i_group])
+        for i_group in np.argsort(first_keys)
+    ]
+
+
+def sort_projected_keys(encoded_keys, mask_indices, key_indices):
+    """
+    Sorts the keys of a mask group by their faces under the mask, in ascii,
+    so they can be binary searched.
+
+    Parameters
+    ----------
+    encoded_keys : 2D array of uint8
+        The color codes of the keys, one row of 54 per key.
+    mask_indices : array of ints
+        Indices of the faces under the mask of the group.
+    key_indices : array of ints
+        Indices of the keys of the group.
+
+    Returns
+    -------
+    sorted_keys : array of byte strings
+        The faces under the mask of each key of the group in ascii, sorted.
+    sorted_key_indices : array of ints
+        The index of the key of each of sorted_keys.
+    """
+
+    ascii_keys = _to_byte_strings(
+        CODE_TO_ASCII[encoded_keys[np.ix_(key_indices, mask_indices)]]
+    )
+    key_order = np.argsort(ascii_keys, kind="stable")
+    return ascii_keys[key_order], np.asarray(key_indices, dtype=np.int64)[key_order]
+
+
+def _to_byte_strings(ascii_rows):
+    """Views each row of a 2D array of ascii codes as one byte string."""
+
+    ascii_rows = np.ascontiguousarray(ascii_rows, dtype=np.uint8)
+    if ascii_rows.shape[1] == 0:
+        return np.zeros(len(ascii_rows), dtype="S1")
+    return ascii_rows.view(f"S{ascii_rows.shape[1]}").ravel()
+
+
+def _search_sorted_keys(sorted_keys, masked_codes):
+    """
+    Finds each row of masked_codes, the faces of a cube under the mask of a stage,
+    in sorted_keys, the sorted keys of the stage under the same mask in ascii.
+    Returns the index of each row in sorted_keys, -1 if not there.
+    """
+
+    projected_keys = _to_byte_strings(CODE_TO_ASCII[masked_codes])
+    i_keys = np.searchsorted(sorted_keys, projected_keys)
+    i_keys = np.minimum(i_keys, len(sorted_keys) - 1)
+    return np.where(sorted_keys[i_keys] == projected_keys, i_keys, -1)
+
+
+def _find_many_in_groups(mask_groups, cube_codes):
+    """
+    Finds the first key matching each of the cube_codes, searching each
+    mask group, given as mask indices, sorted keys and their key indices.
+    Returns the index of the key of each cube, -1 if none match.
+    """
+
+    i_keys = np.full(len(cube_codes), -1, dtype=np.intp)
+
+    for mask_indices, sorted_keys, key_indices in mask_groups:
+        i_sorted = _search_sorted_keys(sorted_keys, cube_codes[:, mask_indices])
+        group_keys = np.where(i_sorted >= 0, key_indices[i_sorted], -1)
+        is_first = (group_keys >= 0) & ((i_keys < 0) | (group_keys < i_keys))
+        i_keys = np.where(is_first, group_keys, i_keys)
+
+    return i_keys
@@ -0,0 +1,323 @@
+""" Module that defines the 48 symmetries of the cube, and canonical cube states under them """
+
+from functools import lru_cache
+from itertools import permutations, product
+import numpy as np
+
+from PyBiksCube.cube_array import CUBE_STATE_INDICES, SIDE_TO_INDEX_MAP
+from PyBiksCube.cube_lookup import (
+    load_move_array,
+    get_move_permutation_cache,
+    SOLVED_CUBE_STATE,
+)
+from PyBiksCube.utilities import (
+    BLANK_CODE,
+    N_QUARTER_TURNS,
+    convert_move_command,
+    encode_cube_state,
+    decode_cube_state,
+)
+
+N_SYMMETRIES = 48
+
+# Outward normal of each side, in the axes of the CubeArray colors array
+SIDE_NORMALS = {
+    "F": (1, 0, 0),
+    "B": (-1, 0, 0),
+    "R": (0, 1, 0),
+    "L": (0, -1, 0),
+    "U": (0, 0, 1),
+    "D": (0, 0, -1),
+}
+
+# Faces in the order of the cube state, each face code is its index
+FACE_ORDER = "UFDLRB"
+
+# The 24 rotations of the whole cube, as moves: a face turned to the top, then a turn around it
+CUBE_ROTATIONS = [
+    " ".join(moves).strip()
+    for moves in product(["", "x", "x2", "x'", "z", "z'"], ["", "y", "y2", "y'"])
+]
+
+# Index of the center face of each side in the cube state
+CENTER_INDICES = np.arange(4, 54, 9)
+
+
+def _get_symmetry_matrices():
+    """
+    The 48 signed permutation matrices, the rotations and reflections of the cube.
+    The identity is first.
+    """
+
+    matrices = []
+    for axes in permutations(range(3)):
+        for signs in product([1, -1], repeat=3):
+            matrix = np.zeros((3, 3), dtype=np.int64)
+            matrix[range(3), axes] = signs
+            matrices.append(matrix)
+    return np.array(matrices)
+
+
+def get_facelet_geometry():
+    """Position from the cube center and outward normal of each of the 54 faces."""
+
+    index_to_side = {index: side for side, index in SIDE_TO_INDEX_MAP.items()}
+    x, y, z, side_indices = np.unravel_index(CUBE_STATE_INDICES, (3, 3, 3, 6))
+    positions = np.stack([x, y, z], axis=1) - 1
+    normals = np.array([SIDE_NORMALS[index_to_side[i]] for i in side_indices])
+    return positions, normals
+
+
+@lru_cache(maxsize=None)
+def get_symmetry_tables():
+    """
+    Returns the tables of the 48 symmetries, built on first use.
+
+    Returns
+    -------
+    symmetry_tables : dict of read-only arrays
+        face_permutations, (48, 54), the state transformed by symmetry i is
+        color_maps[i][cube_codes[face_permutations[i]]].
+        color_maps, (48, 7), relabels the colors so the centers are back to
+        their solved colors, keeping the blank code.
+        move_maps, (48, 12), quarter turn m on a cube is move move_maps[i][m]
+        on the transformed cube.
+        inverse_symmetries, (48,), the symmetry undoing each symmetry.
+    """
+
+    positions, normals = get_facelet_geometry()
+    facelet_lookup = {
+        (tuple(position), tuple(normal)): i_face
+        for i_face, (position, normal) in enumerate(zip(positions, normals))
+    }
+    face_normals = [SIDE_NORMALS[face] for face in FACE_ORDER]
+
+    face_permutations = []
+    color_maps = []
+    for matrix in _get_symmetry_matrices():
+        # Where each face ends up when the whole cube is transformed
+        images = np.array(
+            [
+                facelet_lookup[(tuple(matrix @ position), tuple(matrix @ normal))]
+                for position, normal in zip(positions, normals)
+            ]
+        )
+        face_permutations.append(np.argsort(images))
+
+        # The center of face f moves to the face with normal matrix @ normal_f
+        color_map = np.arange(BLANK_CODE + 1, dtype=np.uint8)
+        for face_code, normal in enumerate(face_normals):
+            color_map[face_code] = face_normals.index(tuple(matrix @ normal))
+        color_maps.append(color_map)
+
+    face_permutations = np.array(face_permutations)
+    color_maps = np.array(color_maps)
+
+    # The move of the transformed cube matching each move, found by trying them all
+    move_array = load_move_array()[:N_QUARTER_TURNS]
+    moved_states = encode_cube_state(SOLVED_CUBE_STATE)[move_array]
+    move_maps = np.empty((N_SYMMETRIES, len(move_array)), dtype=np.int16)
+    for i_symmetry in range(N_SYMMETRIES):
+        transformed_states = color_maps[i_symmetry][
+            moved_states[:, face_permutations[i_symmetry]]
+        ]
+        matches = np.all(transformed_states[:, None] == moved_states[None], axis=2)
+        move_maps[i_symmetry] = np.argmax(matches, axis=1)
+
+    inverse_symmetries = np.array(
+        [
+            np.flatnonzero(
+                np.all(face_permutation[face_permutations] == np.arange(54), axis=1)
+            )[0]
+            for face_permutation in face_permutations
+        ]
+    )
+
+    symmetry_tables = {
+        "face_permutations": face_permutations,
+        "color_maps": color_maps,
+        "move_maps": move_maps,
+        "inverse_symmetries": inverse_symmetries,
+        # Color maps flattened and offsets into them, to relabel every symmetry in one gather
+        "flat_color_maps": color_maps.ravel(),
+        "color_map_offsets": (
+            np.arange(N_SYMMETRIES, dtype=np.uint16) * color_maps.shape[1]
+        )[:, None],
+    }
+    for table in symmetry_tables.values():
+        table.flags.writeable = False
+    return symmetry_tables
+
+
+def apply_symmetry(cube_codes, i_symmetry):
+    """
+    Transforms a cube state by a symmetry: the same cube seen rotated or mirrored,
+    with its colors relabeled so the centers keep their solved colors.
+
+    Parameters
+    ----------
+    cube_codes : array of uint8
+        The 54 color codes of the cube, as in CubeLookup.get_cube_codes.
+    i_symmetry : int
+        Index of the symmetry, from 0 to 47, 0 being the identity.
+        The symmetry undoing it is get_symmetry_tables()["inverse_symmetries"][i_symmetry].
+
+    Returns
+    -------
+    transformed_codes : array of uint8
+        The 54 color codes of the transformed cube.
+    """
+
+    symmetry_tables = get_symmetry_tables()
+    face_permutation = symmetry_tables["face_permutations"][i_symmetry]
+    return symmetry_tables["color_maps"][i_symmetry][cube_codes[face_permutation]]
+
+
+def transform_moves(moves, i_symmetry):
+    """
+    Transforms moves by a symmetry, so that if moves solve a cube,
+    the transformed moves solve the cube transformed by apply_symmetry.
+
+    Parameters
+    ----------
+    moves : list or array of ints
+        Moves following the CubeLookup move integers.
+    i_symmetry : int
+        Index of the symmetry, from 0 to 47.
+
+    Returns
+    -------
+    transformed_moves : array of int16
+        The transformed moves.
+    """
+
+    move_map = get_symmetry_tables()["move_maps"][i_symmetry]
+    return move_map[np.asarray(moves, dtype=np.intp)]
+
+
+def canonicalize_many(cube_codes):
+    """
+    Finds the canonical state of many cubes at once, see canonicalize.
+
+    Parameters
+    ----------
+    cube_codes : 2D array of uint8
+        The color codes of the cubes, one row of 54 per cube.
+
+    Returns
+    -------
+    canonical_codes : 2D array of uint8
+        The color codes of the canonical state of each cube.
+    i_symmetries : array of ints
+        The symmetry transforming each cube into its canonical state.
+    """
+
+    cube_codes = np.asarray(cube_codes, dtype=np.uint8).reshape(-1, 54)
+
+    symmetry_tables = get_symmetry_tables()
+
+    # (N, 48, 54), every transformed state of every cube, in two gathers
+    transformed_codes = symmetry_tables["flat_color_maps"][
+        cube_codes[:, symmetry_tables["face_permutations"]]
+        + symmetry_tables["color_map_offsets"]
+    ]
+
+    # The smallest state, comparing the codes as bytes
+    transformed_codes = np.ascontiguousarray(transformed_codes)
+    transformed_keys = transformed_codes.view("S54")[..., 0]
+    i_symmetries = np.argmin(transformed_keys, axis=1)
+    canonical_codes = transformed_codes[np.arange(len(cube_codes)), i_symmetries]
+    return canonical_codes, i_symmetries
+
+
+def canonicalize(cube_state):
+    """
+    Finds the canonical state of a cube, the smallest of its 48 transformed
+    states (see apply_symmetry), the same for every cube related by a symmetry.
+
+    Parameters
+    ----------
+    cube_state : str or array of uint8
+        Either the 54 character long string of the cube,
+        or its 54 color codes, as in CubeLookup.get_cube_codes.
+
+    Returns
+    -------
+    canonical_state : str or array of uint8
+        The canonical state, of the same type as cube_state.
+    i_symmetry : int
+        The symmetry transforming the cube into its canonical state.
+    """
+
+    is_string = isinstance(cube_state, str)
+    cube_codes = encode_cube_state(cube_state) if is_string else cube_state
+
+    canonical_codes, i_symmetries = canonicalize_many(cube_codes)
+    canonical_codes = canonical_codes[0]
+    i_symmetry = int(i_symmetries[0])
+
+    if is_string:
+        return decode_cube_state(canonical_codes), i_symmetry
+    return canonical_codes, i_symmetry
+
+
+@lru_cache(maxsize=None)
+def get_rotation_tables():
+    """
+    Returns the tables of the 24 rotations of CUBE_ROTATIONS, built on first use.
+
+    Returns
+    -------
+    rotation_tables : dict
+        moves, the move integers of each rotation, in a list.
+        permutations, (24, 54), the cube state rotated by rotation i
+        is cube_codes[permutations[i]], with the colors unchanged.
+    """
+
+    permutation_cache = get_move_permutation_cache(load_move_array())
+    moves = [
+        np.array(
+            [convert_move_command(move) for move in rotation.split()], dtype=np.int16
+        )
+        for rotation in CUBE_ROTATIONS
+    ]
+    rotation_permutations = np.array(
+        [permutation_cache.compile(move) for move in moves]
+    )
+    rotation_permutations.flags.writeable = False
+    return {"moves": moves, "permutations": rotation_permutations}
+
+
+def orient_centers(cube_codes):
+    """
+    Rotates cubes whose centers were moved, by slice moves, wide moves or
+    rotations, so their centers are back in the place of the solved cube,
+    which the solvers expect.
+
+    Parameters
+    ----------
+    cube_codes : 2D array of uint8
+        The color codes of the cubes, one row of 54 per cube.
+
+    Returns
+    -------
+    oriented_codes : 2D array of uint8
+        The color codes of the rotated cubes.
+    i_rotations : array of ints
+        The rotation of CUBE_ROTATIONS applied to each cube,
+        its moves are get_rotation_tables()["moves"][i_rotation].
+        0, no rotation, for cubes whose centers are not a rotation of the solved ones.
+    """
+
+    cube_codes = np.asarray(cube_codes, dtype=np.uint8).reshape(-1, 54)
+    rotation_permutations = get_rotation_tables()["permutations"]
+    solved_centers = encode_cube_state(SOLVED_CUBE_STATE)[CENTER_INDICES]
+
+    # (N, 24, 6), the centers of each cube after each rotation
+    rotated_centers = cube_codes[:, rotation_permutations[:, CENTER_INDICES]]
+    i_rotations = np.argmax(np.all(rotated_centers == solved_centers, axis=2), axis=1)
+
+    oriented_codes = np.take_along_axis(
+        cube_codes, rotation_permutations[i_rotations], axis=1
+    )
+    return oriented_codes, i_rotations
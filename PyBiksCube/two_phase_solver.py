@@ -0,0 +1,582 @@
+""" Module that defines the TwoPhaseSolver class, a two-phase search solver """
+
+import os.path
+import time
+import numpy as np
+
+from PyBiksCube.cube_array import FUNDAMENTAL_MOVES
+from PyBiksCube.cube_coordinates import (
+    get_move_tables,
+    get_cubie_moves,
+    facelets_to_cubies,
+    is_solvable,
+    permutation_index,
+    permutation_from_index,
+    orientation_index,
+    ud_slice_index,
+    N_CORNER_ORIENTATION,
+    N_EDGE_ORIENTATION,
+    N_CORNER_PERMUTATION,
+)
+from PyBiksCube.utilities import encode_cube_state
+
+# The search uses 18 moves, each face turned by a quarter, a half or
+# three quarters: move 3 * face + k turns the face k + 1 quarters,
+# faces following the CubeLookup move integers U:0, F:1, D:2, L:3, R:4, B:5
+N_SEARCH_MOVES = 18
+SEARCH_MOVE_FACES = [move // 3 for move in range(N_SEARCH_MOVES)]
+
+# CubeLookup moves of each search move, half turns are two quarter turns
+SEARCH_MOVES_TO_MOVES = [
+    [[face], [face, face], [face + 6]][turn] for face in range(6) for turn in range(3)
+]
+
+# Opposite face of each face, plus -1 for no face
+OPPOSITE_FACES = [2, 5, 0, 4, 3, 1, -1]
+
+# Moves of phase 2, that keep the cube in the subgroup <U, D, R2, L2, F2, B2>
+PHASE_2_MOVES = [0, 1, 2, 6, 7, 8, 4, 10, 13, 16]
+PHASE_2_MOVE_FACES = [SEARCH_MOVE_FACES[move] for move in PHASE_2_MOVES]
+
+N_UD_EDGES = 40320
+N_SLICE_PERMUTATION = 24
+
+# Moves allowed after a move on each face, plus 6 for no move yet:
+# never the same face twice, and opposite faces, which commute, in one order only
+PHASE_1_ALLOWED_MOVES = [
+    [
+        (move, face)
+        for move, face in enumerate(SEARCH_MOVE_FACES)
+        if face != last_face
+        and not (face == OPPOSITE_FACES[last_face] and face < last_face)
+    ]
+    for last_face in range(7)
+]
+PHASE_2_ALLOWED_MOVES = [
+    [
+        (i_move, move, face)
+        for i_move, (move, face) in enumerate(zip(PHASE_2_MOVES, PHASE_2_MOVE_FACES))
+        if face != last_face
+        and not (face == OPPOSITE_FACES[last_face] and face < last_face)
+    ]
+    for last_face in range(7)
+]
+
+# God's number of the phase 2 subgroup, in its own moves
+MAX_PHASE_2_DEPTH = 18
+MAX_PHASE_1_DEPTH = 12
+
+# Phase 2 searches deeper than this are skipped while phase 1 still has
+# other paths to try, cheaper than searching phase 2 in full
+PHASE_2_DEPTH_LIMIT = 12
+
+
+def _extend_move_table(move_table):
+    """Extends a move table of the 12 quarter turns to the 18 search moves."""
+
+    extended_table = np.empty((len(move_table), N_SEARCH_MOVES), move_table.dtype)
+    for face in range(6):
+        extended_table[:, 3 * face] = move_table[:, face]
+        extended_table[:, 3 * face + 1] = move_table[move_table[:, face], face]
+        extended_table[:, 3 * face + 2] = move_table[:, face + 6]
+    return extended_table
+
+
+def _get_search_edge_moves():
+    """Returns the edge permutation of each of the 18 search moves."""
+
+    edge_moves = []
+    for face in range(6):
+        edge_move = get_cubie_moves()[face][2]
+        edge_moves += [edge_move, edge_move[edge_move], get_cubie_moves()[face + 6][2]]
+    return edge_moves
+
+
+def _build_pruning_table(move_table_a, move_table_b, moves):
+    """
+    Breadth-first search of the distance to solved of every pair of coordinates,
+    indexed by coordinate_b * len(move_table_a) + coordinate_a.
+    """
+
+    n_a = len(move_table_a)
+    distances = np.full(n_a * len(move_table_b), -1, dtype=np.int8)
+    distances[0] = 0
+
+    frontier = np.array([0])
+    depth = 0
+    while len(frontier) > 0:
+        coordinates_a = frontier % n_a
+        coordinates_b = frontier // n_a
+
+        depth += 1
+        for move in moves:
+            children = (
+                move_table_b[coordinates_b, move].astype(np.int64) * n_a
+                + move_table_a[coordinates_a, move]
+            )
+            # Duplicates are written the same depth, no need to make them unique
+            distances[children[distances[children] < 0]] = depth
+
+        frontier = np.flatnonzero(distances == depth)
+
+    return distances
+
+
+def create_two_phase_tables(output_file_name):
+    """
+    Creates the move and pruning tables of the TwoPhaseSolver.
+
+    Phase 1 brings the cube into the subgroup <U, D, R2, L2, F2, B2>, with
+    the corner orientation, edge orientation and UD slice coordinates.
+    Phase 2 solves the cube within the subgroup, with the corner permutation,
+    the permutation of the 8 U and D edges and the permutation of the 4 slice edges.
+    Each pruning table is the exact distance to solved of a pair of coordinates,
+    found by breadth-first search.
+
+    Parameters
+    ----------
+    output_file_name : str
+        File name where the tables are saved, as an uncompressed numpy .npz archive.
+    """
+
+    move_tables = get_move_tables()
+    tables = {
+        name: _extend_move_table(move_tables[name])
+        for name in [
+            "corner_orientation",
+            "edge_orientation",
+            "ud_slice",
+            "corner_permutation",
+        ]
+    }
+
+    edge_moves = [_get_search_edge_moves()[move] for move in PHASE_2_MOVES]
+    ud_edges = permutation_from_index(np.arange(N_UD_EDGES), 8)
+    slice_permutations = permutation_from_index(np.arange(N_SLICE_PERMUTATION), 4)
+    tables["ud_edges"] = np.stack(
+        [permutation_index(ud_edges[:, edge_move[:8]]) for edge_move in edge_moves],
+        axis=1,
+    ).astype(np.uint16)
+    tables["slice_permutation"] = np.stack(
+        [
+            permutation_index(slice_permutations[:, edge_move[8:] - 8])
+            for edge_move in edge_moves
+        ],
+        axis=1,
+    ).astype(np.uint16)
+    tables["phase_2_corner_permutation"] = tables["corner_permutation"][
+        :, PHASE_2_MOVES
+    ]
+
+    all_moves = np.arange(N_SEARCH_MOVES)
+    phase_2_moves = np.arange(len(PHASE_2_MOVES))
+    tables["corner_orientation_pruning"] = _build_pruning_table(
+        tables["corner_orientation"], tables["ud_slice"], all_moves
+    )
+    tables["edge_orientation_pruning"] = _build_pruning_table(
+        tables["edge_orientation"], tables["ud_slice"], all_moves
+    )
+    tables["corner_permutation_pruning"] = _build_pruning_table(
+        tables["phase_2_corner_permutation"], tables["slice_permutation"], phase_2_moves
+    )
+    tables["ud_edges_pruning"] = _build_pruning_table(
+        tables["ud_edges"], tables["slice_permutation"], phase_2_moves
+    )
+
+    with open(output_file_name, "wb") as file_out:
+        np.savez(file_out, **tables)
+
+
+def load_two_phase_tables(tables_file_name=None):
+    """
+    Loads the tables of the TwoPhaseSolver.
+
+    Parameters
+    ----------
+    tables_file_name : str
+        Location of the tables. Default of None loads data/default_two_phase_tables.npz,
+        creating it if it does not exist yet, which takes a few seconds.
+
+    Returns
+    -------
+    tables : dict of arrays
+        The move and pruning tables, see create_two_phase_tables.
+    """
+
+    if tables_file_name is None:
+        tables_file_name = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)),
+            "data/default_two_phase_tables.npz",
+        )
+
+        # Check if the default file exists. If not, create it.
+        if not os.path.isfile(tables_file_name):
+            create_two_phase_tables(tables_file_name)
+    else:
+        # Check if the selected file exists. If not, throw error.
+        if not os.path.isfile(tables_file_name):
+            raise ValueError(f"Filename given did not open: {tables_file_name}")
+
+    with np.load(tables_file_name, allow_pickle=False) as tables:
+        return dict(tables)
+
+
+def _rank(permutation):
+    """Rank of a short permutation, as permutation_index, in pure python."""
+
+    index = 0
+    n_elements = len(permutation)
+    for i in range(n_elements - 1):
+        n_smaller = 0
+        for element in permutation[i + 1 :]:
+            if element < permutation[i]:
+                n_smaller += 1
+        index = index * (n_elements - i) + n_smaller
+    return index
+
+
+class _TwoPhaseSearch:
+    """State of one search of the TwoPhaseSolver, so searches share nothing."""
+
+    def __init__(self, solver, cube_codes, max_length, timeout):
+        self.solver = solver
+        self.max_length = max_length
+        self.deadline = time.perf_counter() + timeout
+
+        (
+            corner_permutation,
+            corner_orientation,
+            edge_permutation,
+            edge_orientation,
+        ) = facelets_to_cubies(cube_codes)
+        if not is_solvable(
+            corner_permutation, corner_orientation, edge_permutation, edge_orientation
+        ):
+            raise ValueError("Not a solvable cube state, pieces are twisted or swapped")
+        self.corner_permutation = corner_permutation.tolist()
+        self.edge_permutation = edge_permutation.tolist()
+        self.corner_orientation = int(orientation_index(corner_orientation, 3))
+        self.edge_orientation = int(orientation_index(edge_orientation, 2))
+        self.ud_slice = int(ud_slice_index(edge_permutation))
+
+        self.path = []
+        self.best_path = None
+        self.done = False
+        self.phase_2_depth_limit = PHASE_2_DEPTH_LIMIT
+
+    def run(self):
+        """Runs phase 1 with increasing depths until a solution is good enough."""
+
+        solver = self.solver
+        min_depth = max(
+            solver.corner_orientation_pruning[
+                self.ud_slice * N_CORNER_ORIENTATION + self.corner_orientation
+            ],
+            solver.edge_orientation_pruning[
+                self.ud_slice * N_EDGE_ORIENTATION + self.edge_orientation
+            ],
+        )
+
+        # Only if no phase 1 path leads to a short phase 2, phase 2 is searched in full
+        for self.phase_2_depth_limit in [PHASE_2_DEPTH_LIMIT, MAX_PHASE_2_DEPTH]:
+            for depth in range(min_depth, MAX_PHASE_1_DEPTH + 1):
+                if self.best_path is not None and depth >= len(self.best_path):
+                    break
+                self._phase_1(
+                    self.corner_orientation,
+                    self.edge_orientation,
+                    self.ud_slice,
+                    depth,
+                    6,
+                )
+                if self.done:
+                    break
+
+            if self.best_path is not None:
+                break
+
+        return self.best_path
+
+    def _phase_1(self, corner_orientation, edge_orientation, ud_slice, togo, last_face):
+        """Depth first search of phase 1, with exactly togo moves left."""
+
+        if togo == 0:
+            # A solution ending with a phase 2 move was already found with fewer moves
+            if len(self.path) == 0 or self.path[-1] not in PHASE_2_MOVES:
+                self._start_phase_2()
+            return
+
+        if self.best_path is not None and time.perf_counter() > self.deadline:
+            self.done = True
+            return
+
+        solver = self.solver
+        corner_orientations = solver.corner_orientation_table[corner_orientation]
+        edge_orientations = solver.edge_orientation_table[edge_orientation]
+        ud_slices = solver.ud_slice_table[ud_slice]
+        corner_orientation_pruning = solver.corner_orientation_pruning
+        edge_orientation_pruning = solver.edge_orientation_pruning
+
+        for move, face in PHASE_1_ALLOWED_MOVES[last_face]:
+            next_corner_orientation = corner_orientations[move]
+            next_ud_slice = ud_slices[move]
+            if (
+                corner_orientation_pruning[
+                    next_ud_slice * N_CORNER_ORIENTATION + next_corner_orientation
+                ]
+                >= togo
+            ):
+                continue
+
+            next_edge_orientation = edge_orientations[move]
+            if (
+                edge_orientation_pruning[
+                    next_ud_slice * N_EDGE_ORIENTATION + next_edge_orientation
+                ]
+                >= togo
+            ):
+                continue
+
+            self.path.append(move)
+            self._phase_1(
+                next_corner_orientation,
+                next_edge_orientation,
+                next_ud_slice,
+                togo - 1,
+                face,
+            )
+            self.path.pop()
+            if self.done:
+                return
+
+    def _start_phase_2(self):
+        """Runs phase 2 from the end of the current phase 1 path."""
+
+        solver = self.solver
+        corner_permutation = self.corner_permutation
+        edge_permutation = self.edge_permutation
+        for move in self.path:
+            corner_permutation = [
+                corner_permutation[i] for i in solver.corner_moves[move]
+            ]
+            edge_permutation = [edge_permutation[i] for i in solver.edge_moves[move]]
+
+        corner_permutation = _rank(corner_permutation)
+        ud_edges = _rank(edge_permutation[:8])
+        slice_permutation = _rank([edge - 8 for edge in edge_permutation[8:]])
+
+        max_depth = self.phase_2_depth_limit
+        if self.best_path is not None:
+            max_depth = min(max_depth, len(self.best_path) - 1 - len(self.path))
+
+        min_depth = max(
+            solver.corner_permutation_pruning[
+                slice_permutation * N_CORNER_PERMUTATION + corner_permutation
+            ],
+            solver.ud_edges_pruning[slice_permutation * N_UD_EDGES + ud_edges],
+        )
+
+        last_face = SEARCH_MOVE_FACES[self.path[-1]] if self.path else 6
+        phase_1_length = len(self.path)
+        for depth in range(min_depth, max_depth + 1):
+            if self._phase_2(
+                corner_permutation, ud_edges, slice_permutation, depth, last_face
+            ):
+                self.best_path = list(self.path)
+                del self.path[phase_1_length:]
+                if (
+                    self.max_length is not None
+                    and len(self.best_path) <= self.max_length
+                ):
+                    self.done = True
+                elif time.perf_counter() > self.deadline:
+                    self.done = True
+                return
+
+    def _phase_2(
+        self, corner_permutation, ud_edges, slice_permutation, togo, last_face
+    ):
+        """Depth first search of phase 2, with exactly togo moves left."""
+
+        if togo == 0:
+            return corner_permutation == 0 and ud_edges == 0 and slice_permutation == 0
+
+        solver = self.solver
+        corner_permutations = solver.phase_2_corner_permutation_table[
+            corner_permutation
+        ]
+        ud_edges_ = solver.ud_edges_table[ud_edges]
+        slice_permutations = solver.slice_permutation_table[slice_permutation]
+        corner_permutation_pruning = solver.corner_permutation_pruning
+        ud_edges_pruning = solver.ud_edges_pruning
+
+        for i_move, move, face in PHASE_2_ALLOWED_MOVES[last_face]:
+            next_corner_permutation = corner_permutations[i_move]
+            next_slice_permutation = slice_permutations[i_move]
+            if (
+                corner_permutation_pruning[
+                    next_slice_permutation * N_CORNER_PERMUTATION
+                    + next_corner_permutation
+                ]
+                >= togo
+            ):
+                continue
+
+            next_ud_edges = ud_edges_[i_move]
+            if (
+                ud_edges_pruning[next_slice_permutation * N_UD_EDGES + next_ud_edges]
+                >= togo
+            ):
+                continue
+
+            self.path.append(move)
+            if self._phase_2(
+                next_corner_permutation,
+                next_ud_edges,
+                next_slice_permutation,
+                togo - 1,
+                face,
+            ):
+                return True
+            self.path.pop()
+
+        return False
+
+
+class TwoPhaseSolver:
+    """
+    Solver for the Rubik's Cube with a two-phase search, in the style of Kociemba's
+    algorithm, as an alternative to the stage dictionaries of the Solver class.
+
+    Phase 1 searches for moves that bring the cube into the subgroup
+    <U, D, R2, L2, F2, B2>, phase 2 for moves that solve it from there.
+    Both are iterative deepening searches pruned by exact distance tables
+    of pairs of coordinates (see CubeCoordinates). Phase 1 keeps going
+    with longer subgroup paths, each solution found lowering the length
+    allowed for the next, until timeout or until no shorter solution is left,
+    returning the shortest solution found. Short scrambles are solved
+    in their fewest moves well before the timeout, random ones take
+    the timeout, or longer until a first solution is found.
+
+    Lengths count a half turn as one move, as is usual for two-phase solvers.
+    The moves returned follow the CubeLookup move integers, a half turn
+    being two quarter turns.
+
+    Attributes
+    ----------
+    max_length : int
+        Solutions of at most max_length moves are returned as soon as found.
+        None to keep searching for shorter solutions until timeout.
+    timeout : float
+        Seconds after which the shortest solution found so far is returned.
+    """
+
+    def __init__(self, tables_file_name=None, max_length=None, timeout=0.1):
+        """
+        The constructor for the TwoPhaseSolver class.
+
+        Parameters
+        ----------
+        tables_file_name : str
+            Location of the tables, see load_two_phase_tables.
+            Default of None loads data/default_two_phase_tables.npz,
+            creating it if it does not exist yet.
+        max_length : int
+            Solutions of at most max_length moves, half turns counting as one,
+            are returned as soon as found.
+            Default of None keeps searching for shorter solutions until timeout.
+        timeout : float
+            Seconds after which the shortest solution found so far is returned.
+            The search only stops once it has found a solution.
+        """
+
+        self.max_length = max_length
+        self.timeout = timeout
+
+        tables = load_two_phase_tables(tables_file_name)
+
+        # Plain lists and bytes, much faster to index one element at a time
+        self.corner_orientation_table = tables["corner_orientation"].tolist()
+        self.edge_orientation_table = tables["edge_orientation"].tolist()
+        self.ud_slice_table = tables["ud_slice"].tolist()
+        self.phase_2_corner_permutation_table = tables[
+            "phase_2_corner_permutation"
+        ].tolist()
+        self.ud_edges_table = tables["ud_edges"].tolist()
+        self.slice_permutation_table = tables["slice_permutation"].tolist()
+
+        self.corner_orientation_pruning = tables["corner_orientation_pruning"].tobytes()
+        self.edge_orientation_pruning = tables["edge_orientation_pruning"].tobytes()
+        self.corner_permutation_pruning = tables["corner_permutation_pruning"].tobytes()
+        self.ud_edges_pruning = tables["ud_edges_pruning"].tobytes()
+
+        self.corner_moves = []
+        for face in range(6):
+            corner_move = get_cubie_moves()[face][0]
+            self.corner_moves += [
+                corner_move,
+                corner_move[corner_move],
+                get_cubie_moves()[face + 6][0],
+            ]
+        self.corner_moves = [corner_move.tolist() for corner_move in self.corner_moves]
+        self.edge_moves = [edge_move.tolist() for edge_move in _get_search_edge_moves()]
+
+    def find_moves_to_solve(self, cube):
+        """
+        Finds the moves that solve the cube, without moving it.
+
+        Parameters
+        ----------
+        cube : cube object
+            The cube to be solved, a CubeLookup or any cube with get_cube_state.
+
+        Returns
+        -------
+        moves_to_solve : array of int16
+            The moves that solve the cube, following the CubeLookup move integers.
+        """
+
+        if hasattr(cube, "get_cube_codes"):
+            cube_codes = cube.get_cube_codes()
+        else:
+            cube_codes = encode_cube_state(cube.get_cube_state())
+
+        search_path = _TwoPhaseSearch(
+            self, cube_codes, self.max_length, self.timeout
+        ).run()
+
+        return np.array(
+            [
+                move
+                for search_move in search_path
+                for move in SEARCH_MOVES_TO_MOVES[search_move]
+            ],
+            dtype=np.int16,
+        )
+
+    def solve_cube(self, cube, output_moves=False):
+        """
+        Solves the given cube with the two-phase search.
+
+        Parameters
+        ----------
+        cube : cube object
+            The cube to be solved, a CubeLookup, a Cube or a CubeArray.
+        output_moves : bool
+            Returns the moves used to solve.
+        """
+
+        moves_to_solve = self.find_moves_to_solve(cube)
+
+        if hasattr(cube, "apply_moves"):
+            cube.apply_moves(moves_to_solve)
+        elif hasattr(cube, "get_cube_codes"):
+            cube.move_decoder(moves_to_solve)
+        else:
+            # Cube and CubeArray take moves in UFDLRB notation
+            cube.move_decoder([FUNDAMENTAL_MOVES[move] for move in moves_to_solve])
+
+        if output_moves:
+            return moves_to_solve
+
+        return None
@@ -1,5 +1,7 @@
 """ Module of utilities useful for interacting with the Cube """
 
+import numpy as np
+
 
 def side_type_converter(side, reverse=False):
     """
@@ -44,21 +46,121 @@ def side_type_converter(side, reverse=False):
     return side_map[side]
 
 
+# Names of the moves, in the order of the rows of the CubeLookup move table,
+# the index of a name is its move integer. The quarter turns of the faces first,
+# then the half turns, the slice moves, the wide moves and the cube rotations.
+N_QUARTER_TURNS = 12
+MOVE_NAMES = (
+    ["U", "F", "D", "L", "R", "B", "U'", "F'", "D'", "L'", "R'", "B'"]
+    + [face + "2" for face in "UFDLRB"]
+    + ["M", "E", "S", "M'", "E'", "S'", "M2", "E2", "S2"]
+    + [face + "w" + suffix for suffix in ["", "'", "2"] for face in "UFDLRB"]
+    + ["x", "y", "z", "x'", "y'", "z'", "x2", "y2", "z2"]
+)
+_MOVE_COMMAND_DICT = {name: i_move for i_move, name in enumerate(MOVE_NAMES)}
+
+
 def convert_move_command(move_command):
     """Converts from UFDLRB notation to their indices, useful for CubeLookup"""
     move_command = move_command.strip()
-    move_command_dict = {
-        "U": 0,
-        "F": 1,
-        "D": 2,
-        "L": 3,
-        "R": 4,
-        "B": 5,
-        "U'": 6,
-        "F'": 7,
-        "D'": 8,
-        "L'": 9,
-        "R'": 10,
-        "B'": 11,
-    }
-    return move_command_dict[move_command]
+    return _MOVE_COMMAND_DICT[move_command]
+
+
+# Sticker colors and their uint8 codes, the index in the palette.
+# 'k' is a blank sticker, used for masks and keys.
+COLOR_PALETTE = "rymgbwk"
+BLANK_CODE = COLOR_PALETTE.index("k")
+
+_COLOR_ARRAY = np.array(list(COLOR_PALETTE), dtype=str)
+CODE_TO_ASCII = np.frombuffer(COLOR_PALETTE.encode("ascii"), dtype=np.uint8)
+ASCII_TO_CODE = np.full(256, 255, dtype=np.uint8)
+ASCII_TO_CODE[CODE_TO_ASCII] = np.arange(len(COLOR_PALETTE), dtype=np.uint8)
+
+
+def encode_cube_state(cube_state):
+    """
+    Converts a cube state of color characters into uint8 codes,
+    the index of each color in COLOR_PALETTE.
+
+    Parameters
+    ----------
+    cube_state : str or array of str
+        Colors of the faces of one or more cubes, e.g. a 54 character long string.
+
+    Returns
+    -------
+    cube_codes : array of uint8
+        Codes of each face, same length as cube_state.
+    """
+
+    if not isinstance(cube_state, str):
+        cube_state = "".join(np.asarray(cube_state, dtype=str).ravel())
+
+    try:
+        ascii_state = np.frombuffer(cube_state.encode("ascii"), dtype=np.uint8)
+    except UnicodeEncodeError as error:
+        raise ValueError(
+            f"Cube state has colors not in palette: {cube_state}"
+        ) from error
+
+    cube_codes = ASCII_TO_CODE[ascii_state]
+    if np.any(cube_codes == 255):
+        raise ValueError(f"Cube state has colors not in palette: {cube_state}")
+
+    return cube_codes
+
+
+def decode_cube_state(cube_codes):
+    """
+    Converts uint8 codes back into a string of color characters.
+
+    Parameters
+    ----------
+    cube_codes : array of uint8
+        Codes of each face, the index of each color in COLOR_PALETTE.
+
+    Returns
+    -------
+    cube_state : str
+        Colors of the faces, e.g. a 54 character long string.
+    """
+
+    return CODE_TO_ASCII[cube_codes].tobytes().decode("ascii")
+
+
+def decode_cube_colors(cube_codes):
+    """
+    Converts uint8 codes back into an array of color strings.
+
+    Parameters
+    ----------
+    cube_codes : array of uint8
+        Codes of each face, the index of each color in COLOR_PALETTE.
+
+    Returns
+    -------
+    cube_colors : array of str
+        Colors of the faces, same shape as cube_codes.
+    """
+
+    return _COLOR_ARRAY[cube_codes]
+
+
+def pack_cube_codes(cube_codes):
+    """
+    Packs the color codes of a cube into one integer, one byte per face,
+    the first face in the highest byte. Masked keys are matched against it
+    with integer operations, see stage_index.MaskedKey.
+
+    Parameters
+    ----------
+    cube_codes : array of uint8
+        The 54 color codes of the cube, as in CubeLookup.get_cube_codes.
+
+    Returns
+    -------
+    packed_state : int
+        The packed cube state.
+    """
+
+    return int.from_bytes(cube_codes.tobytes(), "big")
@@ -0,0 +1,194 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+from PyBiksCube import CubeLookup, CubeBatch, Solver
+from PyBiksCube.stage_index import StageIndex
+from PyBiksCube.algorithm_io import (save_algorithm, load_algorithm, load_text_algorithm,
+                                     convert_text_algorithm, is_binary_algorithm,
+                                     save_mapped_algorithm, load_mapped_algorithm,
+                                     is_mapped_algorithm)
+
+
+@pytest.fixture
+def array_of_dict_solvers():
+    return [{"krkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkwkkkkkkk": np.array([], dtype=np.int16),
+             "kkkkkrkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkwkkkkkkkkkkkkkkkk": [6]},
+            {"rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww": [],
+             "wbbwrrwrrbyyryyryyymmymmyggrrrggggggbbmbbmbbmwwgwwmwwm": [9, 11]}]
+
+
+def assert_same_algorithm(expected_algorithm, actual_algorithm):
+    assert len(expected_algorithm) == len(actual_algorithm)
+    for expected_dict, actual_dict in zip(expected_algorithm, actual_algorithm):
+        assert list(expected_dict) == list(actual_dict)
+        for key in expected_dict:
+            npt.assert_array_equal(expected_dict[key], actual_dict[key])
+
+
+def test_binary_round_trip(tmp_path, array_of_dict_solvers):
+    # Arrange
+    file_name = str(tmp_path / "algorithm.bin")
+
+    # Act
+    save_algorithm(file_name, array_of_dict_solvers)
+    actual_algorithm = load_algorithm(file_name)
+
+    # Assert
+    assert is_binary_algorithm(file_name)
+    assert_same_algorithm(array_of_dict_solvers, actual_algorithm)
+
+
+def test_convert_text_algorithm(tmp_path, array_of_dict_solvers):
+    # Arrange
+    text_file_name = str(tmp_path / "algorithm.txt")
+    file_name = str(tmp_path / "algorithm.npz")
+    with open(text_file_name, "w", encoding="utf-8") as file_out:
+        file_out.write(str(array_of_dict_solvers))
+
+    # Act
+    convert_text_algorithm(text_file_name, file_name)
+
+    # Assert
+    assert not is_binary_algorithm(text_file_name)
+    assert_same_algorithm(array_of_dict_solvers, load_algorithm(file_name))
+
+
+def test_text_algorithm_is_not_evaluated(tmp_path):
+    # Arrange
+    text_file_name = str(tmp_path / "algorithm.txt")
+    with open(text_file_name, "w", encoding="utf-8") as file_out:
+        file_out.write("[{'k': __import__('os').getcwd()}]")
+
+    # Act and Assert
+    with pytest.raises(ValueError):
+        load_text_algorithm(text_file_name)
+
+
+def test_mapped_round_trip(tmp_path, array_of_dict_solvers):
+    # Arrange
+    file_name = str(tmp_path / "algorithm.mapped")
+    array_of_dict_solvers.append({"rkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [1],
+                                  "mmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmm": [2]})
+
+    # Act
+    save_mapped_algorithm(file_name, array_of_dict_solvers)
+    actual_algorithm = load_mapped_algorithm(file_name)
+
+    # Assert
+    assert is_mapped_algorithm(file_name)
+    assert not is_binary_algorithm(file_name)
+    assert len(actual_algorithm) == len(array_of_dict_solvers)
+    for expected_dict, actual_dict in zip(array_of_dict_solvers, actual_algorithm):
+        assert sorted(expected_dict) == sorted(actual_dict)
+        for key in expected_dict:
+            npt.assert_array_equal(expected_dict[key], actual_dict[key])
+
+
+@pytest.mark.parametrize("cube_state", ["rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww",
+                                        "wbbwrrwrrbyyryyryyymmymmyggrrrggggggbbmbbmbbmwwgwwmwwm",
+                                        "rrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr"])
+def test_mapped_find_packed(tmp_path, array_of_dict_solvers, cube_state):
+    # Arrange
+    file_name = str(tmp_path / "algorithm.mapped")
+    array_of_dict_solvers.append({"rkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [1],
+                                  "mkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [2]})
+    save_mapped_algorithm(file_name, array_of_dict_solvers)
+    cube = CubeLookup(cube_state=cube_state)
+
+    # Act
+    mapped_algorithm = load_mapped_algorithm(file_name)
+
+    # Assert
+    for stage_table in mapped_algorithm:
+        expected_moves = stage_table.find(cube.get_cube_codes())
+        actual_moves = stage_table.find_packed(cube.get_packed_cube_state())
+        if expected_moves is None:
+            assert actual_moves is None
+        else:
+            npt.assert_array_equal(expected_moves, actual_moves)
+
+
+def test_mapped_mixed_masks_are_not_copied(tmp_path, array_of_dict_solvers):
+    # Arrange
+    file_name = str(tmp_path / "algorithm.mapped")
+    save_mapped_algorithm(file_name, array_of_dict_solvers)
+
+    # Act
+    mapped_algorithm = load_mapped_algorithm(file_name)
+
+    # Assert
+    stage_table = mapped_algorithm[0]
+    assert stage_table.mask_indices is None
+    assert len(stage_table._mask_groups) == 2
+    for _, sorted_keys, key_indices in stage_table._mask_groups:
+        assert not sorted_keys.flags.owndata and not sorted_keys.flags.writeable
+        assert not key_indices.flags.owndata and not key_indices.flags.writeable
+    npt.assert_array_equal(stage_table.find_packed(CubeLookup().get_packed_cube_state()), [])
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 5)))
+def test_mapped_matches_stage_index(tmp_path, random_seed):
+    # Arrange
+    file_name = str(tmp_path / "algorithm.mapped")
+    solver = Solver("default")
+    save_mapped_algorithm(file_name, solver.array_of_dict_solvers)
+    np.random.seed(random_seed)
+    cubes = CubeBatch(64)
+    cubes.randomize(20)
+    cube_codes = cubes.cube_states
+
+    # Act
+    mapped_algorithm = load_mapped_algorithm(file_name)
+
+    # Assert
+    for dict_solver, stage_table in zip(solver.array_of_dict_solvers, mapped_algorithm):
+        stage_index = StageIndex(dict_solver)
+        npt.assert_array_equal(stage_index.find_many(cube_codes), stage_table.find_many(cube_codes))
+        for one_cube_codes in cube_codes:
+            expected_moves = stage_index.find(one_cube_codes)
+            actual_moves = stage_table.find(one_cube_codes)
+            if expected_moves is None:
+                assert actual_moves is None
+            else:
+                npt.assert_array_equal(expected_moves, actual_moves)
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 20)))
+def test_mapped_solver(tmp_path, random_seed):
+    # Arrange
+    file_name = str(tmp_path / "algorithm.mapped")
+    solver = Solver("default")
+    save_mapped_algorithm(file_name, solver.array_of_dict_solvers)
+    mapped_solver = Solver(file_name)
+    np.random.seed(random_seed)
+    cube = CubeLookup()
+    cube.randomize()
+    mapped_cube = CubeLookup(cube_state=cube.get_cube_state())
+
+    # Act
+    expected_moves = solver.solve_cube(cube, output_moves=True)
+    actual_moves = mapped_solver.solve_cube(mapped_cube, output_moves=True)
+
+    # Assert
+    assert mapped_cube.check_solved()
+    npt.assert_array_equal(expected_moves, actual_moves)
+
+
+def test_mapped_solve_many(tmp_path):
+    # Arrange
+    file_name = str(tmp_path / "algorithm.mapped")
+    solver = Solver("default")
+    save_mapped_algorithm(file_name, solver.array_of_dict_solvers)
+    mapped_solver = Solver(file_name)
+    np.random.seed(3)
+    cubes = CubeBatch(50)
+    cubes.randomize(30)
+    cube_states = cubes.get_cube_states()
+
+    # Act
+    _, expected_moves = solver.solve_many(cube_states, output_moves=True)
+    mapped_cubes, actual_moves = mapped_solver.solve_many(cube_states, output_moves=True)
+
+    # Assert
+    assert np.all(mapped_cubes.check_solved())
+    npt.assert_array_equal(expected_moves, actual_moves)
@@ -0,0 +1,113 @@
+import pytest
+
+import asyncio
+import numpy as np
+from PyBiksCube import CubeBatch, CubeLookup, Solver
+from PyBiksCube.async_solver import AsyncSolver
+from PyBiksCube.serve import create_worker_pool
+
+
+@pytest.fixture(scope="module")
+def solver():
+    return Solver("default")
+
+
+def scramble_states(n_cubes, random_seed):
+    np.random.seed(random_seed)
+    cubes = CubeBatch(n_cubes)
+    cubes.randomize(30)
+    return cubes.get_cube_states()
+
+
+def assert_solves(cube_state, moves):
+    cube = CubeLookup(cube_state=cube_state)
+    cube.apply_moves(moves)
+    assert cube.check_solved()
+
+
+@pytest.mark.parametrize("max_batch_size", [1, 8, 256])
+def test_solve_batched(solver, max_batch_size):
+    # Arrange
+    cube_states = scramble_states(40, 1)
+    async_solver = AsyncSolver(solver, max_batch_size=max_batch_size)
+
+    async def solve_all():
+        return await asyncio.gather(*[async_solver.solve(cube_state) for cube_state in cube_states])
+
+    # Act
+    all_moves = asyncio.run(solve_all())
+    async_solver.close()
+
+    # Assert
+    for cube_state, moves in zip(cube_states, all_moves):
+        assert_solves(cube_state, moves)
+    assert async_solver.stats["calls"] == 40
+    assert async_solver.stats["batches"] == -(-40 // max_batch_size)
+
+
+def test_coalescing(solver):
+    # Arrange
+    cube_states = scramble_states(5, 2) * 4
+    async_solver = AsyncSolver(solver)
+
+    async def solve_all():
+        return await asyncio.gather(*[async_solver.solve(cube_state) for cube_state in cube_states])
+
+    # Act
+    all_moves = asyncio.run(solve_all())
+    async_solver.close()
+
+    # Assert
+    for cube_state, moves in zip(cube_states, all_moves):
+        assert_solves(cube_state, moves)
+    assert async_solver.stats["coalesced"] == 15
+    assert async_solver.stats["batches"] == 1
+
+
+def test_busted_cube(solver):
+    # Arrange
+    cube_states = scramble_states(3, 3) + ["r" * 54]
+    async_solver = AsyncSolver(solver)
+
+    async def solve_all():
+        return await asyncio.gather(*[async_solver.solve(cube_state) for cube_state in cube_states],
+                                    return_exceptions=True)
+
+    # Act
+    results = asyncio.run(solve_all())
+    async_solver.close()
+
+    # Assert
+    for cube_state, moves in zip(cube_states[:3], results[:3]):
+        assert_solves(cube_state, moves)
+    assert isinstance(results[3], ValueError)
+
+
+@pytest.mark.parametrize("cube_state", ["rrr", "x" * 54, None])
+def test_invalid_state(solver, cube_state):
+    # Arrange
+    async_solver = AsyncSolver(solver)
+
+    # Act and Assert
+    with pytest.raises(ValueError):
+        asyncio.run(async_solver.solve(cube_state))
+    async_solver.close()
+
+
+def test_process_pool():
+    # Arrange
+    cube_states = scramble_states(20, 4)
+    executor = create_worker_pool(n_workers=2)
+    async_solver = AsyncSolver(executor=executor, max_batch_size=5)
+
+    async def solve_all():
+        return await asyncio.gather(*[async_solver.solve(cube_state) for cube_state in cube_states])
+
+    # Act
+    all_moves = asyncio.run(solve_all())
+    executor.shutdown()
+
+    # Assert
+    for cube_state, moves in zip(cube_states, all_moves):
+        assert_solves(cube_state, moves)
+    assert async_solver.stats["batches"] == 4
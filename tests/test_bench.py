@@ -0,0 +1,39 @@
+import pytest
+
+import json
+from PyBiksCube.bench import run_benchmarks, BENCHMARKS
+
+
+@pytest.mark.parametrize("benchmark_name", ["moves", "state_io", "solve"])
+def test_run_benchmark(benchmark_name):
+    # Arrange
+    scale = 0.01
+
+    # Act
+    results = run_benchmarks([benchmark_name], scale=scale, seed=1)
+
+    # Assert
+    assert list(results["benchmarks"]) == [benchmark_name]
+    assert results["scale"] == scale
+    assert json.loads(json.dumps(results)) == results
+
+
+def test_invalid_benchmark():
+    # Arrange
+    benchmark_name = "not_a_benchmark"
+
+    # Act / Assert
+    assert benchmark_name not in BENCHMARKS
+    with pytest.raises(ValueError):
+        run_benchmarks([benchmark_name])
+
+
+def test_import_without_matplotlib():
+    # Arrange
+    benchmark_name = "import"
+
+    # Act
+    results = run_benchmarks([benchmark_name], scale=0.2)
+
+    # Assert
+    assert not results["benchmarks"][benchmark_name]["import_loads_matplotlib"]
@@ -1,5 +1,6 @@
 import pytest
-from PyBiksCube.utilities import side_type_converter
+import numpy as np
+from PyBiksCube.utilities import side_type_converter, encode_cube_state, decode_cube_state
 
 
 @pytest.mark.parametrize("initial_side, expected_side",
@@ -37,3 +38,22 @@ def test_notation_converter_valueerror(initial_side):
         side_type_converter(initial_side)
 
 
+
+
+@pytest.mark.parametrize("cube_state",
+                         [("rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww"),
+                          ("krkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkwkkkkkkk")])
+def test_encode_decode_cube_state(cube_state):
+    # Act
+    cube_codes = encode_cube_state(cube_state)
+
+    # Assert
+    assert cube_codes.dtype == np.uint8
+    assert len(cube_codes) == 54
+    assert decode_cube_state(cube_codes) == cube_state
+
+
+@pytest.mark.parametrize("cube_state", [("rrrX"), ("rré")])
+def test_encode_cube_state_valueerror(cube_state):
+    with pytest.raises(ValueError):
+        encode_cube_state(cube_state)
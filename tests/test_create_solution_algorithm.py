@@ -0,0 +1,96 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+from PyBiksCube import CubeLookup, Solver, create_solution_algorithm
+from PyBiksCube.create_solution_algorithm import run_mc_samples, run_bfs_search, DEFAULT_STAGES
+
+
+@pytest.fixture(scope="module")
+def stages():
+    return DEFAULT_STAGES[0:3]
+
+
+def assert_same_algorithm(expected_algorithm, actual_algorithm):
+    assert len(expected_algorithm) == len(actual_algorithm)
+    for expected_dict, actual_dict in zip(expected_algorithm, actual_algorithm):
+        assert list(expected_dict) == list(actual_dict)
+        for key in expected_dict:
+            npt.assert_array_equal(expected_dict[key], actual_dict[key])
+
+
+def test_seeded_is_deterministic(stages):
+    # Act
+    first_algorithm = run_mc_samples(1200, stages, seed=7)
+    second_algorithm = run_mc_samples(1200, stages, seed=7)
+
+    # Assert
+    assert_same_algorithm(first_algorithm, second_algorithm)
+
+
+def test_parallel_matches_serial(stages):
+    # Act
+    serial_algorithm = run_mc_samples(1200, stages, seed=7)
+    parallel_algorithm = run_mc_samples(1200, stages, workers=2, seed=7)
+
+    # Assert
+    assert_same_algorithm(serial_algorithm, parallel_algorithm)
+
+
+def test_parallel_algorithm_solves_stages(stages):
+    # Arrange
+    solver = Solver()
+    solver.array_of_dict_solvers = run_mc_samples(1200, stages, workers=2, seed=7)
+    cube = CubeLookup()
+
+    for solver_dict, stage in zip(solver.array_of_dict_solvers, stages):
+        for key in solver_dict:
+            cube.set_cube_state(key)
+
+            # Act
+            cube.move_decoder(np.asarray(solver_dict[key], dtype=np.int16))
+
+            # Assert
+            assert cube.check_match_against_key(stage)
+
+
+def test_bfs_covers_monte_carlo(stages):
+    # Arrange
+    mc_algorithm = run_mc_samples(1200, stages, seed=7)
+
+    # Act
+    bfs_algorithm = run_bfs_search(stages, n_mc_cubes=0)
+
+    # Assert
+    for mc_dict, bfs_dict in zip(mc_algorithm, bfs_algorithm):
+        assert set(mc_dict) <= set(bfs_dict)
+        for key in mc_dict:
+            assert len(bfs_dict[key]) <= len(mc_dict[key])
+
+
+def test_bfs_algorithm_solves_stages(stages):
+    # Arrange
+    bfs_algorithm = run_bfs_search(stages, n_mc_cubes=0)
+    cube = CubeLookup()
+
+    for solver_dict, stage in zip(bfs_algorithm, stages):
+        for key in solver_dict:
+            cube.set_cube_state(key)
+
+            # Act
+            cube.move_decoder(solver_dict[key])
+
+            # Assert
+            assert cube.check_match_against_key(stage)
+
+
+def test_bfs_with_hash_collisions(stages, monkeypatch):
+    # Arrange
+    expected_algorithm = run_bfs_search(stages, n_mc_cubes=0)
+    monkeypatch.setattr(create_solution_algorithm, "_hash_states",
+                        lambda packed_states: np.zeros(len(packed_states), dtype=np.uint64))
+
+    # Act
+    actual_algorithm = run_bfs_search(stages, n_mc_cubes=0)
+
+    # Assert
+    assert_same_algorithm(expected_algorithm, actual_algorithm)
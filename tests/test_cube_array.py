@@ -0,0 +1,65 @@
+import pytest
+
+import numpy as np
+import numpy.testing as npt
+from PyBiksCube import Cube, CubeArray
+
+
+@pytest.mark.parametrize("move_command", ["  ", "U ", "U'", "F ", "F'", "R ", "R'",
+                                          "L ", "L'", "D ", "D'", "B ", "B'", "B2"])
+def test_single_move_matches_cube(move_command):
+    # Arrange
+    cube = Cube()
+    cube_array = CubeArray()
+
+    # Act
+    cube.move_decoder(move_command)
+    cube_array.move_decoder(move_command)
+
+    # Assert
+    assert cube_array.get_cube_state() == cube.get_cube_state()
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 10)))
+def test_random_moves_match_cube(random_seed):
+    # Arrange
+    np.random.seed(random_seed)
+    move_commands = np.random.choice(["U", "F", "D", "L", "R", "B", "U'", "F'",
+                                      "D'", "L'", "R'", "B'", "U2", "R2"], 30)
+    cube = Cube()
+    cube_array = CubeArray()
+
+    # Act
+    cube.move_decoder(move_commands)
+    cube_array.move_decoder(move_commands)
+
+    # Assert
+    assert cube_array.get_cube_state() == cube.get_cube_state()
+    assert cube_array.check_solved() == cube.check_solved()
+    for face in "UFDLRB":
+        npt.assert_array_equal(cube_array.get_face_colors(face), cube.get_face_colors(face))
+
+
+@pytest.mark.parametrize("cube_state, expected_solved",
+                         [("rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", True),
+                          ("wbbwrrwrrbyyryyryyymmymmyggrrrggggggbbmbbmbbmwwgwwmwwm", False)])
+def test_set_cube_state(cube_state, expected_solved):
+    # Arrange
+    cube_array = CubeArray()
+
+    # Act
+    cube_array.set_cube_state(cube_state)
+
+    # Assert
+    assert cube_array.get_cube_state() == cube_state
+    assert cube_array.check_solved() == expected_solved
+
+
+@pytest.mark.parametrize("move_command", ["X", "U3", 4])
+def test_invalid_move(move_command):
+    # Arrange
+    cube_array = CubeArray()
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        cube_array.move_decoder(move_command)
@@ -0,0 +1,79 @@
+import pytest
+
+import numpy as np
+import numpy.testing as npt
+from PyBiksCube import CubeBatch, CubeLookup
+
+
+@pytest.fixture
+def cubes():
+    return CubeBatch(3)
+
+
+def test_default_states(cubes):
+    # Arrange
+    expected_state = "rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww"
+
+    # Act
+    actual_states = cubes.get_cube_states()
+
+    # Assert
+    assert actual_states == [expected_state] * 3
+    assert np.all(cubes.check_solved())
+
+
+def test_set_cube_states(cubes):
+    # Arrange
+    cube_states = ["rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww",
+                   "wbbwrrwrrbyyryyryyymmymmyggrrrggggggbbmbbmbbmwwgwwmwwm"]
+
+    # Act
+    cubes.set_cube_states(cube_states)
+
+    # Assert
+    assert len(cubes) == 2
+    assert cubes.get_cube_states() == cube_states
+    npt.assert_array_equal(cubes.check_solved(), [True, False])
+
+
+def test_move_one_per_cube(cubes):
+    # Arrange
+    move_commands = [0, 4, -1]
+    expected_states = ["rrrrrrrrrbbbyyyyyymmmmmmmmmyyyggggggwwwbbbbbbgggwwwwww",
+                       "rryrryrryyymyymyymmmwmmwmmwgggggggggbbbbbbbbbrwwrwwrww",
+                       "rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww"]
+
+    # Act
+    cubes.move(move_commands)
+
+    # Assert
+    assert cubes.get_cube_states() == expected_states
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 10)))
+def test_matches_cube_lookup(random_seed):
+    # Arrange
+    np.random.seed(random_seed)
+    cubes = CubeBatch(50)
+
+    # Act
+    mc_moves = cubes.randomize(20)
+
+    # Assert
+    for cube_state, cube_moves in zip(cubes.get_cube_states(), mc_moves):
+        cube = CubeLookup()
+        cube.move_decoder(cube_moves)
+        assert cube.get_cube_state() == cube_state
+
+
+def test_padded_move_decoder(cubes):
+    # Arrange
+    move_commands = np.array([[5, 3], [5, -1], [-1, -1]])
+
+    # Act
+    cubes.move_decoder(move_commands)
+
+    # Assert
+    assert cubes.get_cube_states()[0] == "wbbwrrwrrbyyryyryyymmymmyggrrrggggggbbmbbmbbmwwgwwmwwm"
+    assert cubes.get_cube_states()[1] == "bbbrrrrrryyyyyyyyymmmmmmgggrggrggrggbbmbbmbbmwwwwwwwww"
+    npt.assert_array_equal(cubes.check_solved(), [False, False, True])
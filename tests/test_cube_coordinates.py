@@ -0,0 +1,128 @@
+import pytest
+
+import numpy as np
+import numpy.testing as npt
+from PyBiksCube import CubeCoordinates, CubeLookup
+from PyBiksCube.cube_coordinates import (
+    permutation_index,
+    permutation_from_index,
+    orientation_index,
+    orientation_from_index,
+    get_move_tables,
+    is_solvable,
+    N_CORNER_PERMUTATION,
+)
+
+
+def test_solved_cube():
+    # Arrange
+    cube = CubeCoordinates()
+
+    # Act
+    coordinates = cube.get_coordinates()
+
+    # Assert
+    assert coordinates == (0, 0, 0, 0)
+    assert cube.ud_slice == 0
+    assert cube.check_solved()
+    assert cube.get_cube_state() == CubeLookup().get_cube_state()
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 10)))
+def test_matches_cube_lookup(random_seed):
+    # Arrange
+    np.random.seed(random_seed)
+    cube_lookup = CubeLookup()
+    cube = CubeCoordinates()
+
+    # Act
+    mc_moves = cube_lookup.randomize(30)
+    cube.move_decoder(mc_moves)
+
+    # Assert
+    expected_cube = CubeCoordinates(cube_lookup.get_cube_state())
+    assert cube.get_coordinates() == expected_cube.get_coordinates()
+    assert cube.ud_slice == expected_cube.ud_slice
+    assert cube.get_cube_state() == cube_lookup.get_cube_state()
+    assert not cube.check_solved()
+
+
+@pytest.mark.parametrize("move_command", list(range(12)))
+def test_move_and_inverse(move_command):
+    # Arrange
+    cube = CubeCoordinates()
+
+    # Act
+    cube.move_decoder(move_command)
+    cube.move_decoder((move_command + 6) % 12)
+
+    # Assert
+    assert cube.check_solved()
+
+
+def test_permutation_index_round_trip():
+    # Arrange
+    indices = np.arange(N_CORNER_PERMUTATION)
+
+    # Act
+    permutations = permutation_from_index(indices, 8)
+
+    # Assert
+    npt.assert_array_equal(permutation_index(permutations), indices)
+    assert len(np.unique(permutations, axis=0)) == N_CORNER_PERMUTATION
+
+
+@pytest.mark.parametrize("n_orientations, n_pieces", [(3, 8), (2, 12)])
+def test_orientation_index_round_trip(n_orientations, n_pieces):
+    # Arrange
+    indices = np.arange(n_orientations ** (n_pieces - 1))
+
+    # Act
+    orientations = orientation_from_index(indices, n_orientations, n_pieces)
+
+    # Assert
+    npt.assert_array_equal(orientation_index(orientations, n_orientations), indices)
+    npt.assert_array_equal(np.sum(orientations, axis=1) % n_orientations, 0)
+
+
+@pytest.mark.parametrize("table_name", ["corner_orientation", "edge_orientation",
+                                        "corner_permutation", "ud_slice"])
+def test_move_tables_are_permutations(table_name):
+    # Arrange
+    move_table = get_move_tables()[table_name]
+
+    # Act
+    inverse_moves = move_table[move_table[:, :6], np.arange(6, 12)]
+
+    # Assert
+    npt.assert_array_equal(inverse_moves, np.tile(np.arange(len(move_table))[:, None], 6))
+
+
+def test_invalid_cube_state():
+    # Arrange
+    cube_state = "rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwwr"
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        CubeCoordinates(cube_state)
+
+
+@pytest.mark.parametrize("swap_edges, twist_corner, expected_solvable",
+                         [(False, False, True), (True, False, False),
+                          (False, True, False), (True, True, False)])
+def test_is_solvable(swap_edges, twist_corner, expected_solvable):
+    # Arrange
+    np.random.seed(3)
+    cube = CubeCoordinates()
+    cube.randomize(30)
+    corner_permutation, corner_orientation, edge_permutation, edge_orientation = cube.get_cubies()
+
+    # Act
+    if swap_edges:
+        edge_permutation[[0, 1]] = edge_permutation[[1, 0]]
+    if twist_corner:
+        corner_orientation[0] = (corner_orientation[0] + 1) % 3
+
+    # Assert
+    assert is_solvable(corner_permutation, corner_orientation,
+                       edge_permutation, edge_orientation) == expected_solvable
@@ -3,7 +3,11 @@ import pytest
 import numpy as np
 import numpy.testing as npt
 from PyBiksCube import CubeLookup
-from PyBiksCube.utilities import convert_move_command
+from PyBiksCube.cube_lookup import load_move_array
+from PyBiksCube.create_lookup_table import (create_lookup_table, calc_lookup_table_for_move,
+                                             calc_layer_lookup_table)
+from PyBiksCube.stage_index import MaskedKey
+from PyBiksCube.utilities import convert_move_command, MOVE_NAMES
 
 
 @pytest.fixture
@@ -160,14 +164,164 @@ def test_check_solved(cube, cube_state, expected_solved):
 @pytest.mark.parametrize("cube_state, key, expected_match",
                          [("rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", "rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", True),
                           ("rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", "kkkkkkkkkyyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", True),
-                          ("rrrrrrrrryyyykyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", "kkkkkkkkkyyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", False),
+                          ("rrrrrrrrryyyyryyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", "kkkkkkkkkyyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", False),
                           ("wbbwrrwrrbyyryyryyymmymmyggrrrggggggbbmbbmbbmwwgwwmwwm", "wbbwrrwrrbyyryyryyymmymmkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk", True)])
-def check_match_against_key(cube, cube_state, key, expected_match):
+def test_check_match_against_key(cube, cube_state, key, expected_match):
     # Arrange
-    cube.set_state(cube_state)
+    cube.set_cube_state(cube_state)
 
     # Act
     actual_match = cube.check_match_against_key(key)
 
     # Assert
     assert expected_match == actual_match
+
+
+def test_compact_cube_state(cube):
+    # Arrange
+    cube_state = "wbbwrrwrrbyyryyryyymmymmyggrrrggggggbbmbbmbbmwwgwwmwwm"
+    cube.set_cube_state(cube_state)
+
+    # Act
+    compact_state = cube.get_compact_cube_state()
+    other_cube = CubeLookup(cube_state=compact_state)
+
+    # Assert
+    assert len(compact_state) == 54
+    assert other_cube.get_cube_state() == cube_state
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 20)))
+def test_apply_moves(cube, random_seed):
+    # Arrange
+    np.random.seed(random_seed)
+    move_sequence = np.random.choice(np.arange(12, dtype=np.int16), 25)
+    expected_cube = CubeLookup()
+    expected_cube.move_decoder(move_sequence)
+
+    # Act
+    cube.apply_moves(move_sequence)
+
+    # Assert
+    assert cube.get_cube_state() == expected_cube.get_cube_state()
+
+
+def test_compiled_moves_are_cached(cube):
+    # Act
+    first_permutation = cube.compile_moves([5, 3])
+    second_permutation = CubeLookup().compile_moves(np.array([5, 3], dtype=np.int16))
+    cube.apply_permutation(first_permutation)
+
+    # Assert
+    assert first_permutation is second_permutation
+    assert cube.get_cube_state() == "wbbwrrwrrbyyryyryyymmymmyggrrrggggggbbmbbmbbmwwgwwmwwm"
+
+
+@pytest.mark.parametrize("cube_state, key, expected_match",
+                         [("rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", "rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", True),
+                          ("rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", "kkkkkkkkkyyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", True),
+                          ("rrrrrrrrryyyyryyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", "kkkkkkkkkyyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", False),
+                          ("wbbwrrwrrbyyryyryyymmymmyggrrrggggggbbmbbmbbmwwgwwmwwm", "wbbwrrwrrbyyryyryyymmymmkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk", True),
+                          ("wbbwrrwrrbyyryyryyymmymmyggrrrggggggbbmbbmbbmwwgwwmwwm", "kkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkr", False)])
+def test_check_match_against_masked_key(cube, cube_state, key, expected_match):
+    # Arrange
+    cube.set_cube_state(cube_state)
+    masked_key = MaskedKey(key)
+
+    # Act
+    actual_match = cube.check_match_against_key(masked_key)
+
+    # Assert
+    assert expected_match == actual_match
+    assert cube.check_match_against_key(key) == actual_match
+
+
+def test_move_array_is_shared(cube):
+    # Act
+    other_cube = CubeLookup()
+
+    # Assert
+    assert other_cube.move_array is cube.move_array
+    assert not cube.move_array.flags.writeable
+    with pytest.raises(ValueError):
+        cube.move_array[0, 0] = 1
+
+
+@pytest.mark.parametrize("file_name", ["lookup_table.npy", "lookup_table.txt"])
+def test_lookup_table_formats(tmp_path, cube, file_name):
+    # Arrange
+    lookup_table_file_name = str(tmp_path / file_name)
+    create_lookup_table(lookup_table_file_name)
+
+    # Act
+    move_array = load_move_array(lookup_table_file_name)
+
+    # Assert
+    npt.assert_array_equal(move_array, cube.move_array)
+    assert move_array.dtype == np.int16
+    assert load_move_array(lookup_table_file_name) is move_array
+
+
+def test_permutation_cache_shared():
+    # Arrange
+    other_cube = CubeLookup()
+
+    # Act
+    cube = CubeLookup()
+
+    # Assert
+    assert cube.move_array is other_cube.move_array
+    assert cube.permutation_cache is other_cube.permutation_cache
+
+
+@pytest.mark.parametrize("move_command, equivalent_moves",
+                         [("U2", "U U"), ("F2", "F F"), ("D2", "D D"),
+                          ("L2", "L L"), ("R2", "R R"), ("B2", "B B"),
+                          ("x", "R M' L'"), ("y", "U E' D'"), ("z", "F S B'"),
+                          ("Uw", "U E'"), ("Dw", "D E"), ("Fw", "F S"),
+                          ("Bw", "B S'"), ("Lw", "L M"), ("Rw", "R M'"),
+                          ("M2", "M M"), ("x'", "x x x"), ("Rw2", "Rw Rw"),
+                          ("x2", "L2 R2 M2")])
+def test_extended_move(cube, move_command, equivalent_moves):
+    # Arrange
+    other_cube = CubeLookup()
+    cube.randomize(20)
+    other_cube.set_cube_state(cube.get_cube_state())
+
+    # Act
+    cube.move_decoder(convert_move_command(move_command))
+    for move in equivalent_moves.split():
+        other_cube.move_decoder(convert_move_command(move))
+
+    # Assert
+    assert cube.get_cube_state() == other_cube.get_cube_state()
+
+
+@pytest.mark.parametrize("move_command", MOVE_NAMES)
+def test_extended_move_inverse(cube, move_command):
+    # Arrange
+    inverse_command = {"'": move_command[:-1], "2": move_command}.get(move_command[-1],
+                                                                       move_command + "'")
+
+    # Act
+    cube.move_decoder(convert_move_command(move_command))
+    cube.move_decoder(convert_move_command(inverse_command))
+
+    # Assert
+    assert len(cube.move_array) == len(MOVE_NAMES)
+    assert cube.check_solved()
+
+
+@pytest.mark.parametrize("move_command", MOVE_NAMES[:12])
+def test_layer_lookup_table(move_command):
+    # Act
+    actual_map = calc_layer_lookup_table(move_command)
+
+    # Assert
+    npt.assert_array_equal(actual_map, calc_lookup_table_for_move(move_command))
+
+
+def test_move_command_out_of_range(cube):
+    # Act, Assert
+    with pytest.raises(ValueError):
+        cube.move_decoder(len(MOVE_NAMES))
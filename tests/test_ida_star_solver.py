@@ -0,0 +1,107 @@
+import pytest
+
+import numpy as np
+from PyBiksCube import Cube, CubeLookup, IDAStarSolver
+from PyBiksCube.ida_star_solver import (
+    pack_nibbles,
+    unpack_nibbles,
+    edge_group_index,
+    edge_group_from_index,
+)
+
+
+@pytest.fixture(scope="module")
+def solver():
+    return IDAStarSolver()
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 10)))
+def test_solve_cube_lookup(solver, random_seed):
+    # Arrange
+    rng = np.random.default_rng(random_seed)
+    moves = rng.integers(0, 12, 8).astype(np.int16)
+    cube = CubeLookup()
+    cube.apply_moves(moves)
+
+    # Act
+    moves_to_solve = solver.solve_cube(cube, output_moves=True)
+
+    # Assert
+    assert cube.check_solved()
+    assert len(moves_to_solve) <= len(moves)
+
+
+def test_solve_cube(solver):
+    # Arrange
+    cube = Cube()
+    cube.move_decoder(["R", "U", "F'", "L", "D2"])
+
+    # Act
+    moves_to_solve = solver.solve_cube(cube, output_moves=True)
+
+    # Assert
+    assert cube.check_solved()
+    assert len(moves_to_solve) <= 6
+
+
+def test_find_moves_to_solve_report(solver):
+    # Arrange
+    cube = CubeLookup()
+    cube.apply_moves(np.array([4, 0, 10, 6], dtype=np.int16))
+    cube_state = cube.get_cube_state()
+
+    # Act
+    moves_to_solve, search_report = solver.find_moves_to_solve(cube)
+
+    # Assert
+    assert cube.get_cube_state() == cube_state
+    assert len(moves_to_solve) == 4
+    assert search_report["depth"] == 4
+    assert search_report["nodes"] >= 4
+    assert not search_report["timed_out"]
+
+
+def test_solved_cube(solver):
+    # Act
+    moves_to_solve, search_report = solver.find_moves_to_solve(CubeLookup())
+
+    # Assert
+    assert len(moves_to_solve) == 0
+    assert search_report["depth"] == 0
+
+
+def test_max_depth_too_small():
+    # Arrange
+    solver = IDAStarSolver(max_depth=3)
+    cube = CubeLookup()
+    cube.apply_moves(np.array([4, 0, 10, 6], dtype=np.int16))
+
+    # Act
+    moves_to_solve, search_report = solver.find_moves_to_solve(cube)
+
+    # Assert
+    assert moves_to_solve is None
+    assert search_report["depth"] > solver.max_depth
+    assert not search_report["timed_out"]
+    with pytest.raises(ValueError):
+        solver.solve_cube(cube)
+
+
+def test_pack_nibbles():
+    # Arrange
+    distances = np.array([0, 1, 15, 7, 3, 12, 9], dtype=np.uint8)
+
+    # Act
+    unpacked_distances = unpack_nibbles(pack_nibbles(distances))
+
+    # Assert
+    assert np.array_equal(unpacked_distances[: len(distances)], distances)
+
+
+@pytest.mark.parametrize("index", [0, 1, 12345, 190079])
+def test_edge_group_index(index):
+    # Act
+    positions, orientations = edge_group_from_index(index)
+
+    # Assert
+    assert edge_group_index(positions, orientations) == index
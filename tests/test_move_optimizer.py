@@ -0,0 +1,68 @@
+import pytest
+import numpy as np
+import numpy.testing as npt
+from PyBiksCube import CubeLookup
+from PyBiksCube.move_optimizer import simplify_moves
+
+
+@pytest.mark.parametrize("move_sequence, expected_sequence",
+                         [([], []),
+                          ([0, 6], []),
+                          ([0, 0, 0], [6]),
+                          ([0, 0, 0, 0], []),
+                          ([6, 6], [12]),
+                          ([0, 0], [12]),
+                          ([12], [12]),
+                          ([12, 12], []),
+                          ([0, 12], [6]),
+                          ([12, 2, 6], [0, 2]),
+                          ([0, 2, 6], [2]),
+                          ([4, 3, 10, 9], []),
+                          ([1, 0, 6, 7], []),
+                          ([1, 0, 2, 6, 8, 7, 5], [5]),
+                          ([0, 1, 0], [0, 1, 0]),
+                          ([0, 18, 6], [0, 18, 6]),
+                          ([0, 0, 45, 6, 6], [12, 45, 12]),
+                          ([0, 27, 33, 6], [0, 27, 33, 6])])
+def test_simplify_moves(move_sequence, expected_sequence):
+    # Act
+    actual_sequence = simplify_moves(move_sequence)
+
+    # Assert
+    npt.assert_array_equal(actual_sequence, expected_sequence)
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 50)))
+def test_simplify_keeps_cube_state(random_seed):
+    # Arrange
+    np.random.seed(random_seed)
+    move_sequence = np.random.choice(np.array([0, 2, 3, 6, 8, 9], dtype=np.int16), 30)
+    expected_cube = CubeLookup()
+    expected_cube.move_decoder(move_sequence)
+    actual_cube = CubeLookup()
+
+    # Act
+    simplified_sequence = simplify_moves(move_sequence)
+    actual_cube.move_decoder(simplified_sequence)
+
+    # Assert
+    assert len(simplified_sequence) <= len(move_sequence)
+    assert actual_cube.get_cube_state() == expected_cube.get_cube_state()
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 20)))
+def test_simplify_any_move_keeps_cube_state(random_seed):
+    # Arrange
+    np.random.seed(random_seed)
+    move_sequence = np.random.choice(np.array([0, 2, 6, 8, 12, 14, 18, 45], dtype=np.int16), 30)
+    expected_cube = CubeLookup()
+    expected_cube.move_decoder(move_sequence)
+    actual_cube = CubeLookup()
+
+    # Act
+    simplified_sequence = simplify_moves(move_sequence)
+    actual_cube.move_decoder(simplified_sequence)
+
+    # Assert
+    assert len(simplified_sequence) <= len(move_sequence)
+    assert actual_cube.get_cube_state() == expected_cube.get_cube_state()
@@ -0,0 +1,101 @@
+import pytest
+
+import io
+import json
+import numpy as np
+from PyBiksCube import CubeLookup, CubeBatch, Solver
+from PyBiksCube.pipeline import (parse_record, parse_scramble, read_records, generate_scrambles,
+                                 solve_records, run_pipeline, main)
+
+
+@pytest.fixture(scope="module")
+def solver():
+    return Solver("default")
+
+
+@pytest.mark.parametrize("line, input_format, expected_record",
+                         [("rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww", "text",
+                           {"cube_state": "rrrrrrrrryyyyyyyyymmmmmmmmmgggggggggbbbbbbbbbwwwwwwwww"}),
+                          ("U F' R\n", "text", {"scramble": [0, 7, 4]}),
+                          ("U2 Rw x'", "text", {"scramble": [12, 31, 48]}),
+                          ("U X", "text", {"error": "Not a valid move: X"}),
+                          ('{"id": 3, "scramble": [1, 11]}', "ndjson", {"id": 3, "scramble": [1, 11]}),
+                          ('"B D"', "ndjson", {"scramble": [5, 2]}),
+                          ('{"id": 4}', "ndjson", {"id": 4, "error": "Object has neither a cube_state nor a scramble"})])
+def test_parse_record(line, input_format, expected_record):
+    # Act
+    actual_record = parse_record(line, input_format)
+
+    # Assert
+    assert expected_record == actual_record
+
+
+def test_solve_records(solver):
+    # Arrange
+    np.random.seed(5)
+    cube = CubeLookup()
+    cube.randomize(30)
+    lines = ["U F' R", "", cube.get_cube_state(), "rrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr", "U Q"]
+
+    # Act
+    actual_records = list(solve_records(read_records(lines), solver, chunk_size=2))
+
+    # Assert
+    assert len(actual_records) == 4
+    assert [("error" in record) for record in actual_records] == [False, False, True, True]
+    for record in actual_records[:2]:
+        cube.set_cube_state(record["cube_state"])
+        cube.move_decoder(np.array(record["moves"], dtype=np.int16))
+        assert cube.check_solved()
+
+
+@pytest.mark.parametrize("scramble", ["R U x", "M U", "Rw z' S2 E", "U2 Rw x'", "y", "Dw F E' B2 M'"])
+def test_solve_moved_centers(solver, scramble):
+    # Act
+    record = next(solve_records([parse_record(scramble)], solver))
+
+    # Assert
+    assert "error" not in record
+    cube_batch = CubeBatch()
+    cube_batch.move_decoder(np.array(record["scramble"] + record["moves"]))
+    assert cube_batch.check_solved()[0]
+
+
+@pytest.mark.parametrize("output_format", ["text", "ndjson"])
+def test_run_pipeline(solver, output_format):
+    # Arrange
+    file_out = io.StringIO()
+    scrambles = list(generate_scrambles(50, seed=1, chunk_size=16))
+
+    # Act
+    counts = run_pipeline(generate_scrambles(50, seed=1, chunk_size=16), file_out,
+                          output_format, solver, chunk_size=16)
+    lines = file_out.getvalue().splitlines()
+
+    # Assert
+    assert counts == {"n_records": 50, "n_solved": 50, "n_errors": 0}
+    assert len(lines) == 50
+    for scramble, line in zip(scrambles, lines):
+        cube = CubeLookup()
+        cube.move_decoder(np.array(scramble["scramble"], dtype=np.int16))
+        if output_format == "ndjson":
+            moves = json.loads(line)["moves"]
+        else:
+            moves = parse_scramble(line)
+        cube.move_decoder(np.array(moves, dtype=np.int16))
+        assert cube.check_solved()
+
+
+def test_main(tmp_path):
+    # Arrange
+    input_file_name = tmp_path / "states.txt"
+    output_file_name = tmp_path / "moves.ndjson"
+    input_file_name.write_text("U F' R\nB B D'\n")
+
+    # Act
+    main([str(input_file_name), "-o", str(output_file_name), "--simplify"])
+    records = [json.loads(line) for line in output_file_name.read_text().splitlines()]
+
+    # Assert
+    assert [record["scramble"] for record in records] == [[0, 7, 4], [5, 5, 8]]
+    assert all(len(record["moves"]) > 0 for record in records)
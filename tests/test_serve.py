@@ -0,0 +1,126 @@
+import pytest
+
+import json
+import os
+import signal
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+from PyBiksCube import CubeBatch, CubeLookup
+from PyBiksCube.serve import SolveService, SolveServer
+from PyBiksCube.load_generator import run_load
+
+
+@pytest.fixture(scope="module")
+def url():
+    service = SolveService(n_workers=1)
+    server = SolveServer(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def post_json(url, content):
+    request = urllib.request.Request(url, data=json.dumps(content).encode("utf-8"))
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 4)))
+def test_solve(url, random_seed):
+    # Arrange
+    np.random.seed(random_seed)
+    cube = CubeLookup()
+    cube.randomize(30)
+
+    # Act
+    status, answer = post_json(f"{url}/solve", {"cube_state": cube.get_cube_state()})
+    cube.move_decoder(np.array(answer["moves"], dtype=np.int16))
+
+    # Assert
+    assert status == 200
+    assert cube.check_solved()
+
+
+def test_solve_many(url):
+    # Arrange
+    np.random.seed(4)
+    cubes = CubeBatch(10)
+    cubes.randomize(30)
+
+    # Act
+    status, answer = post_json(f"{url}/solve", {"cube_states": cubes.get_cube_states()})
+
+    # Assert
+    assert status == 200
+    assert len(answer["moves"]) == 10
+    for cube_state, moves in zip(cubes.get_cube_states(), answer["moves"]):
+        cube = CubeLookup(cube_state=cube_state)
+        cube.move_decoder(np.array(moves, dtype=np.int16))
+        assert cube.check_solved()
+
+
+@pytest.mark.parametrize("content, expected_status", [({"cube_state": "rrr"}, 400),
+                                                      ({"cube_state": "x" * 54}, 400),
+                                                      ({"not_a_cube_state": ""}, 400),
+                                                      ({"cube_state": "r" * 54}, 422)])
+def test_invalid_requests(url, content, expected_status):
+    # Act
+    status, answer = post_json(f"{url}/solve", content)
+
+    # Assert
+    assert status == expected_status
+    assert "error" in answer
+
+
+def test_load_generator(url):
+    # Act
+    results = run_load(url, n_requests=40, concurrency=8, cubes_per_request=2, seed=1)
+
+    # Assert
+    assert results["n_errors"] == 0
+    assert results["n_unsolved"] == 0
+    assert results["server_metrics"]["cubes"] >= 80
+    assert results["server_metrics"]["batches"] >= 1
+
+
+def test_worker_killed():
+    # Arrange
+    service = SolveService(n_workers=1)
+    cube = CubeLookup()
+    cube.randomize(30)
+    service.solve([cube.get_cube_state()])
+
+    # Act
+    os.kill(service.get_worker_pid(), signal.SIGKILL)
+    results = [service.solve([cube.get_cube_state()])[0] for _ in range(3)]
+    is_healthy = service.is_healthy()
+    service.close()
+
+    # Assert
+    assert is_healthy
+    assert not isinstance(results[-1], str)
+    cube.move_decoder(np.array(results[-1], dtype=np.int16))
+    assert cube.check_solved()
+
+
+def test_request_timeout():
+    # Arrange
+    service = SolveService(n_workers=1, request_timeout=0.0)
+    cube = CubeLookup()
+    cube.randomize(30)
+
+    # Act, Assert
+    with pytest.raises(TimeoutError):
+        service.solve([cube.get_cube_state()])
+    assert service.is_healthy()
+    service.close()
@@ -0,0 +1,163 @@
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import numpy.testing as npt
+from PyBiksCube import CubeLookup, CubeBatch, Solver, SolutionCache
+from PyBiksCube.solution_cache import ENTRY_OVERHEAD_BYTES
+from PyBiksCube.symmetry import apply_symmetry, N_SYMMETRIES
+
+
+def make_key(i_key):
+    return bytes([i_key % 6] * 54)
+
+
+def entry_bytes(moves):
+    return 54 + 2 * len(moves) + ENTRY_OVERHEAD_BYTES
+
+
+def test_get_and_put():
+    # Arrange
+    cache = SolutionCache()
+
+    # Act
+    missing_moves = cache.get(make_key(0))
+    cache.put(make_key(0), [1, 2, 3])
+    actual_moves = cache.get(make_key(0))
+
+    # Assert
+    assert missing_moves is None
+    npt.assert_array_equal(actual_moves, [1, 2, 3])
+    assert cache.get_stats() == {"hits": 1, "misses": 1, "evictions": 0,
+                                 "entries": 1, "n_bytes": entry_bytes([1, 2, 3])}
+
+
+def test_least_recently_used_eviction():
+    # Arrange
+    cache = SolutionCache(max_bytes=3 * entry_bytes([1]))
+    for i_key in range(3):
+        cache.put(make_key(i_key), [i_key])
+
+    # Act
+    cache.get(make_key(0))
+    cache.put(make_key(3), [3])
+
+    # Assert
+    assert cache.get(make_key(1)) is None
+    for i_key in [0, 2, 3]:
+        npt.assert_array_equal(cache.get(make_key(i_key)), [i_key])
+    assert cache.evictions == 1
+    assert cache.n_bytes <= cache.max_bytes
+
+
+def test_entry_too_big():
+    # Arrange
+    cache = SolutionCache(max_bytes=entry_bytes([1]))
+
+    # Act
+    cache.put(make_key(0), [1, 2])
+
+    # Assert
+    assert len(cache) == 0
+    assert cache.n_bytes == 0
+
+
+def test_persistence(tmp_path):
+    # Arrange
+    file_name = str(tmp_path / "cache.npz")
+    cache = SolutionCache(file_name=file_name)
+    cache.put(bytes([1] * 53 + [0]), [])
+    cache.put(make_key(2), [4, 10, 11])
+    cache.put(make_key(0), [0])
+
+    # Act
+    cache.save()
+    loaded_cache = SolutionCache(file_name=file_name)
+
+    # Assert
+    assert len(loaded_cache) == 3
+    npt.assert_array_equal(loaded_cache.get(bytes([1] * 53 + [0])), [])
+    npt.assert_array_equal(loaded_cache.get(make_key(2)), [4, 10, 11])
+    npt.assert_array_equal(loaded_cache.get(make_key(0)), [0])
+    assert loaded_cache.n_bytes == cache.n_bytes
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 5)))
+def test_solver_cache_hit(random_seed):
+    # Arrange
+    solver = Solver("default", solution_cache=SolutionCache())
+    np.random.seed(random_seed)
+    cube = CubeLookup()
+    cube.randomize(30)
+    cube_state = cube.get_cube_state()
+    expected_moves = solver.solve_cube(cube, output_moves=True)
+
+    # Act
+    solver.array_of_dict_solvers = []
+    cube = CubeLookup(cube_state=cube_state)
+    actual_moves = solver.solve_cube(cube, output_moves=True)
+
+    # Assert
+    assert cube.check_solved()
+    npt.assert_array_equal(actual_moves, expected_moves)
+    assert solver.solution_cache.hits == 1
+    assert solver.solution_cache.misses == 1
+
+
+def test_shared_cache():
+    # Arrange
+    solver = Solver("default", solution_cache=SolutionCache(max_bytes=20 * entry_bytes(range(200))))
+    np.random.seed(5)
+    cubes = CubeBatch(50)
+    cubes.randomize(30)
+    cube_states = cubes.get_cube_states() * 4
+
+    def solve(cube_state):
+        cube = CubeLookup(cube_state=cube_state)
+        solver.solve_cube(cube)
+        return cube.check_solved()
+
+    # Act
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        solved = list(executor.map(solve, cube_states))
+
+    # Assert
+    assert all(solved)
+    stats = solver.solution_cache.get_stats()
+    assert stats["hits"] + stats["misses"] == 200
+    assert stats["n_bytes"] <= solver.solution_cache.max_bytes
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 5)))
+def test_symmetric_cache(random_seed):
+    # Arrange
+    solver = Solver("default", solution_cache=SolutionCache(symmetric=True))
+    np.random.seed(random_seed)
+    cube = CubeLookup()
+    cube.randomize(30)
+    cube_codes = cube.get_cube_codes().copy()
+    solver.solve_cube(cube)
+
+    # Act
+    solver.array_of_dict_solvers = []
+    symmetric_cubes = [CubeLookup(cube_state=bytes(apply_symmetry(cube_codes, i_symmetry)))
+                       for i_symmetry in range(N_SYMMETRIES)]
+    for symmetric_cube in symmetric_cubes:
+        solver.solve_cube(symmetric_cube)
+
+    # Assert
+    assert all(symmetric_cube.check_solved() for symmetric_cube in symmetric_cubes)
+    assert len(solver.solution_cache) == 1
+    assert solver.solution_cache.hits == N_SYMMETRIES
+
+
+def test_symmetric_persistence_mismatch(tmp_path):
+    # Arrange
+    file_name = str(tmp_path / "cache.npz")
+    cache = SolutionCache(symmetric=True)
+    cache.put(make_key(0), [1])
+    cache.save(file_name)
+
+    # Act and Assert
+    with pytest.raises(ValueError):
+        SolutionCache(file_name=file_name)
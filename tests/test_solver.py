@@ -1,7 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import numpy as np
 import numpy.testing as npt
-from PyBiksCube import CubeLookup, Solver
+from PyBiksCube import CubeLookup, CubeBatch, Solver
+from PyBiksCube.stage_index import StageIndex
 
 
 @pytest.fixture
@@ -33,10 +36,200 @@ def test_moves_to_solve_stage(cube, solver, cube_state, expected_moves):
                    "mmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmm": [2]}
     solver.array_of_dict_solvers = [solver_dict]
     cube.set_cube_state(cube_state)
-    solver.cube = cube
     
     # Act
-    actual_moves = solver.find_moves_to_solve_stage(0)
+    actual_moves = solver.find_moves_to_solve_stage(cube, 0)
     
     # Assert
     npt.assert_array_equal(actual_moves, expected_moves)
+
+
+@pytest.mark.parametrize("cube_state, expected_moves", [("rrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr", [1]),
+                                                        ("mrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr", [2]),
+                                                        ("wrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr", None)])
+def test_indexed_stage(cube, cube_state, expected_moves):
+    # Arrange
+    solver_dict = {"rkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [1],
+                   "mkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [2]}
+    stage_index = StageIndex(solver_dict)
+    cube.set_cube_state(cube_state)
+
+    # Act
+    actual_moves = stage_index.find(cube.get_cube_codes())
+
+    # Assert
+    npt.assert_array_equal(stage_index.mask_indices, [0])
+    assert actual_moves == expected_moves
+
+
+@pytest.mark.parametrize("cube_state, expected_moves", [("rrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr", [1]),
+                                                        ("mrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrm", [2]),
+                                                        ("wrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrm", [3]),
+                                                        ("wrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrw", None)])
+def test_mask_group_stage(cube, cube_state, expected_moves):
+    # Arrange
+    solver_dict = {"rkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [1],
+                   "mkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkm": [2],
+                   "kkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkm": [3]}
+    stage_index = StageIndex(solver_dict)
+    cube.set_cube_state(cube_state)
+
+    # Act
+    actual_moves = stage_index.find_packed(cube.get_packed_cube_state())
+
+    # Assert
+    assert stage_index.mask_indices is None
+    assert actual_moves == expected_moves
+    assert stage_index.find(cube.get_cube_codes()) == expected_moves
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 20)))
+def test_simplified_solve(solver, random_seed):
+    # Arrange
+    np.random.seed(random_seed)
+    cube = CubeLookup()
+    cube.randomize()
+    cube_state = cube.get_cube_state()
+
+    # Act
+    moves = solver.solve_cube(cube, output_moves=True)
+    other_cube = CubeLookup(cube_state=cube_state)
+    simplified_moves = solver.solve_cube(other_cube, output_moves=True, simplify=True)
+    replayed_cube = CubeLookup(cube_state=cube_state)
+    replayed_cube.move_decoder(simplified_moves)
+
+    # Assert
+    assert len(simplified_moves) <= len(moves)
+    assert replayed_cube.check_solved()
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 5)))
+def test_solve_many(solver, random_seed):
+    # Arrange
+    np.random.seed(random_seed)
+    cubes = CubeBatch(50)
+    cubes.randomize(30)
+    cube_states = cubes.get_cube_states()
+
+    # Act
+    solved_cubes, moves = solver.solve_many(cube_states, output_moves=True, chunk_size=16)
+
+    # Assert
+    assert np.all(solved_cubes.check_solved())
+    for cube_state, cube_moves in zip(cube_states, moves):
+        cube = CubeLookup(cube_state=cube_state)
+        npt.assert_array_equal(cube_moves[cube_moves >= 0], solver.solve_cube(cube, output_moves=True))
+
+
+def test_solve_many_in_place(solver):
+    # Arrange
+    np.random.seed(5)
+    cubes = CubeBatch(20)
+    cubes.randomize(30)
+
+    # Act
+    solved_cubes = solver.solve_many(cubes)
+
+    # Assert
+    assert solved_cubes is cubes
+    assert np.all(cubes.check_solved())
+
+
+def test_solve_many_simplified(solver):
+    # Arrange
+    np.random.seed(6)
+    cubes = CubeBatch(20)
+    cubes.randomize(30)
+    cube_states = cubes.get_cube_states()
+
+    # Act
+    _, moves = solver.solve_many(cube_states, output_moves=True)
+    _, simplified_moves = solver.solve_many(cube_states, output_moves=True, simplify=True)
+    replayed_cubes = CubeBatch(cube_states=cube_states)
+    replayed_cubes.move_decoder(simplified_moves)
+
+    # Assert
+    assert np.all(np.sum(simplified_moves >= 0, axis=1) <= np.sum(moves >= 0, axis=1))
+    assert np.all(replayed_cubes.check_solved())
+
+
+def test_solve_many_missing_solution(solver):
+    # Arrange
+    solver.array_of_dict_solvers = [{"rkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [1]}]
+
+    # Act and Assert
+    with pytest.raises(ValueError):
+        solver.solve_many(["mrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr"])
+
+
+def test_stages_are_read_only(solver, cube):
+    # Arrange
+    solver_dict = {"rkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [1]}
+    solver.array_of_dict_solvers = [solver_dict]
+    cube.set_cube_state("mrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr")
+
+    # Act
+    solver_dict["mkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk"] = [2]
+    with pytest.raises(ValueError):
+        solver.find_moves_to_solve_stage(cube, 0)
+    solver.array_of_dict_solvers = [solver_dict]
+    actual_moves = solver.find_moves_to_solve_stage(cube, 0)
+
+    # Assert
+    with pytest.raises(TypeError):
+        solver.array_of_dict_solvers[0]["mkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk"] = [2]
+    with pytest.raises(TypeError):
+        solver.array_of_dict_solvers[0] = solver_dict
+    assert actual_moves == [2]
+
+
+@pytest.mark.parametrize("cube_states, expected_keys", [(["rrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr",
+                                                          "mrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr",
+                                                          "wrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrrr"], [0, 1, -1]),
+                                                        (["mmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmm",
+                                                          "rmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmm",
+                                                          "wwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwwww"], [2, 0, -1])])
+def test_find_many(cube_states, expected_keys):
+    # Arrange
+    indexed_stage = StageIndex({"rkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [1],
+                                "mkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [2]})
+    scanned_stage = StageIndex({"rkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [1],
+                                "mrkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkkk": [2],
+                                "mmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmmm": [3]})
+    cube_codes = CubeBatch(cube_states=cube_states).get_cube_codes()
+
+    # Act
+    actual_scanned_keys = scanned_stage.find_many(cube_codes)
+    actual_indexed_keys = indexed_stage.find_many(cube_codes)
+
+    # Assert
+    npt.assert_array_equal(actual_scanned_keys, expected_keys)
+    for cube_code, i_key in zip(cube_codes, actual_indexed_keys):
+        expected_moves = indexed_stage.find(cube_code)
+        assert (expected_moves is None) == (i_key < 0)
+        if i_key >= 0:
+            assert indexed_stage.get_moves(i_key) == expected_moves
+
+
+def test_concurrent_solves(solver):
+    # Arrange
+    np.random.seed(7)
+    cubes = CubeBatch(400)
+    cubes.randomize(30)
+    cube_states = cubes.get_cube_states()
+    expected_moves = [solver.solve_cube(CubeLookup(cube_state=cube_state), output_moves=True)
+                      for cube_state in cube_states]
+
+    def solve(cube_state):
+        cube = CubeLookup(cube_state=cube_state)
+        moves = solver.solve_cube(cube, output_moves=True)
+        return cube.check_solved(), moves
+
+    # Act
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(solve, cube_states))
+
+    # Assert
+    for (solved, actual_moves), moves in zip(results, expected_moves):
+        assert solved
+        npt.assert_array_equal(actual_moves, moves)
@@ -0,0 +1,119 @@
+import pytest
+
+import numpy as np
+import numpy.testing as npt
+from PyBiksCube import CubeLookup, CubeBatch
+from PyBiksCube.symmetry import (apply_symmetry, transform_moves, canonicalize, canonicalize_many,
+                                 get_symmetry_tables, N_SYMMETRIES, orient_centers,
+                                 get_rotation_tables, CENTER_INDICES)
+from PyBiksCube.utilities import convert_move_command
+
+
+def scrambled_cube(random_seed, n_moves=20):
+    rng = np.random.default_rng(random_seed)
+    moves = rng.integers(0, 12, n_moves)
+    cube = CubeLookup()
+    cube.apply_moves(moves)
+    return cube, moves
+
+
+def test_symmetry_tables():
+    # Act
+    symmetry_tables = get_symmetry_tables()
+
+    # Assert
+    npt.assert_array_equal(symmetry_tables["face_permutations"][0], np.arange(54))
+    npt.assert_array_equal(symmetry_tables["move_maps"][0], np.arange(12))
+    assert len({face_permutation.tobytes() for face_permutation in symmetry_tables["face_permutations"]}) == N_SYMMETRIES
+    for move_map in symmetry_tables["move_maps"]:
+        assert sorted(move_map) == list(range(12))
+
+
+@pytest.mark.parametrize("i_symmetry", list(range(N_SYMMETRIES)))
+def test_solved_is_symmetric(i_symmetry):
+    # Arrange
+    cube = CubeLookup()
+
+    # Act
+    transformed_codes = apply_symmetry(cube.get_cube_codes(), i_symmetry)
+
+    # Assert
+    npt.assert_array_equal(transformed_codes, cube.get_cube_codes())
+
+
+@pytest.mark.parametrize("i_symmetry", list(range(N_SYMMETRIES)))
+def test_transform_moves(i_symmetry):
+    # Arrange
+    cube, moves = scrambled_cube(i_symmetry)
+    inverse_symmetry = get_symmetry_tables()["inverse_symmetries"][i_symmetry]
+
+    # Act
+    transformed_cube = CubeLookup()
+    transformed_cube.apply_moves(transform_moves(moves, i_symmetry))
+    transformed_codes = apply_symmetry(cube.get_cube_codes(), i_symmetry)
+
+    # Assert
+    npt.assert_array_equal(transformed_cube.get_cube_codes(), transformed_codes)
+    npt.assert_array_equal(apply_symmetry(transformed_codes, inverse_symmetry), cube.get_cube_codes())
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 6)))
+def test_canonicalize(random_seed):
+    # Arrange
+    cube, _ = scrambled_cube(random_seed)
+    cube_codes = cube.get_cube_codes()
+
+    # Act
+    canonical_codes, i_symmetry = canonicalize(cube_codes)
+    canonical_states = [canonicalize(apply_symmetry(cube_codes, i))[0] for i in range(N_SYMMETRIES)]
+
+    # Assert
+    npt.assert_array_equal(apply_symmetry(cube_codes, i_symmetry), canonical_codes)
+    for canonical_state in canonical_states:
+        npt.assert_array_equal(canonical_state, canonical_codes)
+
+
+def test_canonicalize_string():
+    # Arrange
+    cube, _ = scrambled_cube(7)
+
+    # Act
+    canonical_state, i_symmetry = canonicalize(cube.get_cube_state())
+    canonical_codes, expected_symmetry = canonicalize(cube.get_cube_codes())
+
+    # Assert
+    assert canonical_state == CubeLookup(cube_state=bytes(canonical_codes)).get_cube_state()
+    assert i_symmetry == expected_symmetry
+
+
+def test_canonicalize_many():
+    # Arrange
+    np.random.seed(8)
+    cubes = CubeBatch(30)
+    cubes.randomize(20)
+
+    # Act
+    canonical_codes, i_symmetries = canonicalize_many(cubes.get_cube_codes())
+
+    # Assert
+    for cube_codes, expected_codes, i_symmetry in zip(cubes.get_cube_codes(), canonical_codes, i_symmetries):
+        actual_codes, actual_symmetry = canonicalize(cube_codes)
+        npt.assert_array_equal(actual_codes, expected_codes)
+        assert actual_symmetry == i_symmetry
+
+
+@pytest.mark.parametrize("rotation", ["x", "y'", "z2", "x y", "M E' S", "Rw Uw'"])
+def test_orient_centers(rotation):
+    # Arrange
+    cube, _ = scrambled_cube(4)
+    expected_codes = cube.get_cube_codes().copy()
+    for move in rotation.split():
+        cube.move_decoder(convert_move_command(move))
+
+    # Act
+    oriented_codes, i_rotations = orient_centers(cube.get_cube_codes())
+
+    # Assert
+    npt.assert_array_equal(oriented_codes[0][CENTER_INDICES], expected_codes[CENTER_INDICES])
+    cube.move_decoder(get_rotation_tables()["moves"][i_rotations[0]])
+    npt.assert_array_equal(cube.get_cube_codes(), oriented_codes[0])
@@ -0,0 +1,92 @@
+import pytest
+
+import numpy as np
+from PyBiksCube import Cube, CubeLookup, TwoPhaseSolver
+
+
+@pytest.fixture(scope="module")
+def solver():
+    return TwoPhaseSolver()
+
+
+@pytest.mark.parametrize("random_seed", list(range(1, 10)))
+def test_solve_cube_lookup(solver, random_seed):
+    # Arrange
+    np.random.seed(random_seed)
+    cube = CubeLookup()
+    cube.randomize(40)
+
+    # Act
+    moves_to_solve = solver.solve_cube(cube, output_moves=True)
+
+    # Assert
+    assert cube.check_solved()
+    # Half turns are returned as two quarter turns
+    assert len(moves_to_solve) <= 2 * 24
+
+
+def test_solve_cube(solver):
+    # Arrange
+    np.random.seed(2)
+    cube = Cube()
+    cube.randomize(30)
+
+    # Act
+    solver.solve_cube(cube)
+
+    # Assert
+    assert cube.check_solved()
+
+
+def test_solve_solved_cube(solver):
+    # Arrange
+    cube = CubeLookup()
+
+    # Act
+    moves_to_solve = solver.solve_cube(cube, output_moves=True)
+
+    # Assert
+    assert len(moves_to_solve) == 0
+    assert cube.check_solved()
+
+
+@pytest.mark.parametrize("move_sequence", [[0], [4, 4], [1, 3, 7], [0, 5, 2, 10]])
+def test_short_scrambles(move_sequence):
+    # Arrange
+    solver = TwoPhaseSolver(max_length=len(move_sequence), timeout=60)
+    cube = CubeLookup()
+    cube.move_decoder(np.array(move_sequence, dtype=np.int16))
+
+    # Act
+    moves_to_solve = solver.solve_cube(cube, output_moves=True)
+
+    # Assert
+    assert cube.check_solved()
+    assert len(moves_to_solve) == len(move_sequence)
+
+
+@pytest.mark.parametrize("move_sequence", [[4, 0, 7, 2, 2], [0, 0, 4, 4, 1, 1]])
+def test_finds_shorter_solutions(solver, move_sequence):
+    # Arrange
+    cube = CubeLookup()
+    cube.move_decoder(np.array(move_sequence, dtype=np.int16))
+
+    # Act
+    moves_to_solve = solver.solve_cube(cube, output_moves=True)
+
+    # Assert
+    assert cube.check_solved()
+    assert len(moves_to_solve) == len(move_sequence)
+
+
+def test_unsolvable_cube(solver):
+    # Arrange
+    cube = CubeLookup()
+    # Twist a single corner, URF, in place
+    cube_state = list(cube.get_cube_state())
+    cube_state[8], cube_state[36], cube_state[11] = "y", "r", "b"
+    cube.set_cube_state("".join(cube_state))
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        solver.solve_cube(cube)